@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+PERF-20: Benchmark del SQL de reservas e inventario base (DataManager).
+
+Construye un warehouse.db sintetico (tabla inventory con N ubicaciones, en un
+directorio temporal; inventory_baseline la crea el primer restore) y mide los
+dos caminos de:
+
+    commit_reservations         reset + un UPDATE por ubicacion (historico)
+                                vs executemany a tabla temporal + UPDATE join
+    restore_inventory_baseline  subconsulta correlacionada por fila (historico)
+                                vs UPDATE ... FROM inventory_baseline
+
+(performance.bulk_inventory_sql). Verifica que ambos caminos dejan la tabla
+inventory IDENTICA (si no, sale con codigo 1).
+
+Uso:
+    python scripts/bench_inventory_sql.py
+    python scripts/bench_inventory_sql.py --locations 20000 --reserved 0.3 --repeats 5
+
+Regla: solo ASCII en la salida (consola Windows cp1252).
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+sys.path.insert(0, PROJECT_ROOT)
+
+from subsystems.simulation.data_manager import DataManager  # noqa: E402
+
+
+def _crear_db(path, n, seed):
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""
+        CREATE TABLE inventory (
+            location_id TEXT PRIMARY KEY,
+            sku_code TEXT NOT NULL,
+            qty_available INTEGER NOT NULL DEFAULT 0,
+            qty_reserved INTEGER NOT NULL DEFAULT 0,
+            last_updated REAL,
+            CHECK (qty_available >= 0),
+            CHECK (qty_reserved >= 0)
+        )""")
+    conn.executemany(
+        "INSERT INTO inventory VALUES (?, ?, ?, 0, NULL)",
+        [("LOC-%06d" % i, "SKU-%05d" % (i % 5000), rng.randint(10, 500)) for i in range(n)])
+    conn.commit()
+    conn.close()
+
+
+def _reservas(n, fraccion, seed):
+    """Reservas en orden de asignacion (por SKU), no de location_id."""
+    rng = random.Random(seed)
+    locs = ["LOC-%06d" % i for i in range(n) if rng.random() < fraccion]
+    rng.shuffle(locs)
+    return {loc: rng.randint(1, 9) for loc in locs}
+
+
+def _dm(path, bulk):
+    dm = DataManager.__new__(DataManager)
+    dm.db_path = path
+    dm.inventory_ledger = None
+    dm.bulk_inventory_sql = bulk
+    return dm
+
+
+def _tabla(path):
+    conn = sqlite3.connect(path)
+    filas = conn.execute("SELECT location_id, qty_available, qty_reserved "
+                         "FROM inventory ORDER BY location_id").fetchall()
+    conn.close()
+    return filas
+
+
+def _medir(dm, reservas):
+    with contextlib.redirect_stdout(io.StringIO()):
+        t0 = time.perf_counter()
+        dm.commit_reservations(reservas)
+        t1 = time.perf_counter()
+        dm.restore_inventory_baseline()
+        t2 = time.perf_counter()
+        dm.commit_reservations(reservas)  # deja reservas para comparar tablas
+    return t1 - t0, t2 - t1
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--locations", type=int, default=100000,
+                    help="ubicaciones en inventory (default 100000)")
+    ap.add_argument("--reserved", type=float, default=0.5,
+                    help="fraccion de ubicaciones con reserva (default 0.5)")
+    ap.add_argument("--repeats", type=int, default=5)
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="bench_inventory_sql_")
+    try:
+        base = os.path.join(tmp, "base.db")
+        _crear_db(base, args.locations, 1)
+        reservas = _reservas(args.locations, args.reserved, 2)
+        print(f"Inventario sintetico: {args.locations} ubicaciones, "
+              f"{len(reservas)} con reserva, repeticiones={args.repeats} (mejor de N)")
+
+        res, tablas = {}, {}
+        for modo, bulk in (("loop", False), ("bulk", True)):
+            commits, restores = [], []
+            for r in range(args.repeats):
+                path = os.path.join(tmp, f"{modo}_{r}.db")
+                shutil.copy(base, path)
+                c, b = _medir(_dm(path, bulk), reservas)
+                commits.append(c)
+                restores.append(b)
+                tablas[modo] = _tabla(path)
+            res[modo] = (min(commits), min(restores))
+
+        print(f"{'camino':<6} {'commit_reservations_s':>22} {'restore_baseline_s':>19}")
+        for modo in ("loop", "bulk"):
+            print(f"{modo:<6} {res[modo][0]:22.4f} {res[modo][1]:19.4f}")
+        if tablas["loop"] != tablas["bulk"]:
+            print("[FAIL] los dos caminos dejan inventory distinto")
+            return 1
+        print(f"[OK] inventory identico; speedup commit={res['loop'][0] / res['bulk'][0]:.1f}x "
+              f"restore={res['loop'][1] / res['bulk'][1]:.1f}x")
+        return 0
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+PERF-22: Benchmark del movimiento grueso (performance.coarse_movement).
+
+Corre la simulacion real (EventGenerator, config.json del proyecto, seed 42,
+capa de congestion APAGADA) en tres modos y mide solo el bucle SimPy (sin
+exportar replay ni Excel):
+
+    per_cell  historico: un env.timeout y un estado_agente por celda
+    segment   movement_events = "segment" (PERF-21), timeouts por celda
+    coarse    segment + coarse_movement: UN env.timeout por tramo
+
+Reporta wall-clock, eventos SimPy procesados (env.step) y eventos
+registrados. Verifica que los tres terminan en el MISMO instante de SIM con
+las mismas WOs completadas (si no, sale con codigo 1).
+
+Uso:
+    python scripts/bench_movement.py
+    python scripts/bench_movement.py --layout layouts/WH1.tmx --repeats 3
+
+Nota: layouts/Almacen_Grande.tmx del repo es un placeholder de una fila (no
+carga); usar un layout navegable.
+
+Regla: solo ASCII en la salida (consola Windows cp1252).
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+sys.path.insert(0, PROJECT_ROOT)
+
+from engines.event_generator import EventGenerator, compute_stall_limit  # noqa: E402
+
+MODOS = {
+    "per_cell": {},
+    "segment": {"movement_events": "segment"},
+    "coarse": {"movement_events": "segment", "coarse_movement": True},
+}
+
+
+def _config(tmp, layout, modo):
+    with open(os.path.join(PROJECT_ROOT, "config.json"), encoding="utf-8") as f:
+        cfg = json.load(f)
+    if layout:
+        cfg["layout_file"] = layout
+    cfg.setdefault("congestion", {})["enabled"] = False
+    perf = cfg.setdefault("performance", {}) or {}
+    perf.update(MODOS[modo])
+    cfg["performance"] = perf
+    path = os.path.join(tmp, f"config_{modo}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(cfg, f)
+    return path
+
+
+def _correr(config_path):
+    """(wall_s, env_steps, eventos, t_fin, wos_completadas) del bucle SimPy."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        gen = EventGenerator(config_path=config_path)
+        if not gen.crear_simulacion():
+            raise RuntimeError("no se pudo crear la simulacion (layout?)")
+        env = gen.env
+        pasos = [0]
+        step = env.step
+
+        def _contar():
+            pasos[0] += 1
+            step()
+
+        env.step = _contar
+        t0 = time.perf_counter()
+        gen._ejecutar_por_tramos(compute_stall_limit(
+            getattr(gen.almacen, "inbound_schedule", [])))
+        wall = time.perf_counter() - t0
+    shutil.rmtree(os.path.join(PROJECT_ROOT, gen.session_output_dir), ignore_errors=True)
+    d = gen.almacen.dispatcher
+    return (wall, pasos[0], len(gen.almacen.event_log), env.now,
+            len(d.work_orders_completados))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--layout", default=None,
+                    help="layout_file a usar (default: el de config.json)")
+    ap.add_argument("--repeats", type=int, default=3)
+    args = ap.parse_args()
+
+    os.environ.setdefault("WAREHOUSE_SEED", "42")
+    logging.disable(logging.INFO)
+    os.chdir(PROJECT_ROOT)
+    tmp = tempfile.mkdtemp(prefix="bench_movement_")
+    try:
+        res = {}
+        for modo in MODOS:
+            path = _config(tmp, args.layout, modo)
+            corridas = [_correr(path) for _ in range(args.repeats)]
+            mejor = min(corridas, key=lambda r: r[0])
+            res[modo] = mejor
+        print(f"Layout: {args.layout or 'config.json'}; congestion off; "
+              f"repeticiones={args.repeats} (mejor de N)")
+        print(f"{'modo':<9} {'wall_s':>8} {'env_steps':>10} {'eventos':>8} "
+              f"{'t_fin':>10} {'wos':>5}")
+        for modo, (wall, pasos, eventos, t_fin, wos) in res.items():
+            print(f"{modo:<9} {wall:8.3f} {pasos:10d} {eventos:8d} {t_fin:10.2f} {wos:5d}")
+        fines = {(round(r[3], 6), r[4]) for r in res.values()}
+        if len(fines) != 1:
+            print("[FAIL] los modos terminan distinto (t_fin / WOs)")
+            return 1
+        base, grueso = res["per_cell"], res["coarse"]
+        print(f"[OK] mismo fin; coarse vs per_cell: wall {base[0] / grueso[0]:.2f}x, "
+              f"env_steps {base[1] / grueso[1]:.1f}x menos")
+        return 0
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+PERF-4: Benchmark de motores de pathfinding sobre layouts reales.
+
+Mide, para pares aleatorios (semilla fija) de puntos de picking, el tiempo por
+consulta y los nodos EXPANDIDOS (cerrados) por consulta de cada motor de
+subsystems/simulation/pathfinder_engines.py:
+
+    astar        Pathfinder historico (expansiones = las de astar_array: mismo
+                 orden de expansion por contrato PERF-3)
+    astar_array  A* array-backed (PERF-3)
+    jps          Jump Point Search con tie_break="jps" (PERF-4); ademas de
+                 expansiones reporta celdas recorridas por los saltos
+
+Verifica que JPS devuelve el MISMO coste optimo que A* en cada par (si no,
+sale con codigo 1).
+
+Uso:
+    python scripts/bench_pathfinding.py
+    python scripts/bench_pathfinding.py --layouts layouts/WH1.tmx --pairs 500 --seed 7
+
+Regla: solo ASCII en la salida (consola Windows cp1252).
+"""
+import argparse
+import io
+import math
+import os
+import random
+import sys
+import time
+from contextlib import redirect_stdout
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+
+from subsystems.simulation.layout_manager import LayoutManager  # noqa: E402
+from subsystems.simulation.pathfinder import Pathfinder  # noqa: E402
+from subsystems.simulation.pathfinder_engines import (  # noqa: E402
+    ArrayPathfinder, JPSPathfinder)
+
+DEFAULT_LAYOUTS = [
+    os.path.join("layouts", "WH1.tmx"),
+    os.path.join("layouts", "Layout_Corredor_Central.tmx"),
+]
+
+
+def _coste(path):
+    return sum(math.hypot(x2 - x1, y2 - y1)
+               for (x1, y1), (x2, y2) in zip(path, path[1:]))
+
+
+def _pares(layout_manager, n, seed):
+    puntos = [p["grid_position"] for p in layout_manager.picking_points]
+    if len(puntos) < 2:
+        libres = [(x, y) for y, row in enumerate(layout_manager.collision_matrix)
+                  for x, v in enumerate(row) if v]
+        puntos = libres
+    rng = random.Random(seed)
+    return [(rng.choice(puntos), rng.choice(puntos)) for _ in range(n)]
+
+
+def _medir(pf, pares, contar=None):
+    """(ms por consulta, expansiones por consulta, celdas saltadas, costes)."""
+    costes = []
+    expansiones = 0
+    saltadas = 0
+    sink = io.StringIO()
+    t0 = time.perf_counter()
+    with redirect_stdout(sink):  # el Pathfinder historico imprime por camino
+        for a, b in pares:
+            path = pf.find_path(a, b)
+            costes.append(_coste(path) if path else None)
+            if contar is not None:
+                expansiones += contar.last_expansions
+                saltadas += getattr(contar, "last_scanned", 0)
+    dt = time.perf_counter() - t0
+    n = max(1, len(pares))
+    return dt * 1000.0 / n, expansiones / n, saltadas / n, costes
+
+
+def bench_layout(tmx, n_pairs, seed):
+    sink = io.StringIO()
+    with redirect_stdout(sink):
+        lm = LayoutManager(os.path.join(PROJECT_ROOT, tmx), headless=True)
+    matrix = lm.collision_matrix
+    pares = _pares(lm, n_pairs, seed)
+
+    historico = Pathfinder(matrix)
+    arr = ArrayPathfinder(matrix)
+    jps = JPSPathfinder(matrix, tie_break="jps")
+
+    ms_ref, _, _, c_ref = _medir(historico, pares)
+    ms_arr, exp_arr, _, c_arr = _medir(arr, pares, contar=arr)
+    ms_jps, exp_jps, scan_jps, c_jps = _medir(jps, pares, contar=jps)
+
+    mismatches = 0
+    for ref, otro_a, otro_j in zip(c_ref, c_arr, c_jps):
+        for otro in (otro_a, otro_j):
+            if (ref is None) != (otro is None) or \
+                    (ref is not None and not math.isclose(ref, otro, abs_tol=1e-9)):
+                mismatches += 1
+
+    print("")
+    print("Layout: %s  (grid %dx%d, %d pares, seed %d)"
+          % (tmx, lm.grid_width, lm.grid_height, len(pares), seed))
+    print("  %-12s %10s %14s %14s %9s" % ("motor", "ms/consulta", "expansiones", "celdas_salto", "speedup"))
+    filas = [
+        ("astar", ms_ref, exp_arr, None),
+        ("astar_array", ms_arr, exp_arr, None),
+        ("jps", ms_jps, exp_jps, scan_jps),
+    ]
+    for nombre, ms, exp, scan in filas:
+        print("  %-12s %10.3f %14.1f %14s %8.2fx"
+              % (nombre, ms, exp, "-" if scan is None else "%.1f" % scan,
+                 ms_ref / ms if ms > 0 else 0.0))
+    if mismatches:
+        print("  [FAIL] %d pares con coste distinto al A* historico" % mismatches)
+    else:
+        print("  [OK] costes identicos al A* historico en todos los pares")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="PERF-4: benchmark de motores de pathfinding (tiempo y expansiones).",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--layouts", nargs="+", default=DEFAULT_LAYOUTS,
+                        help="TMX a medir (relativos a la raiz del proyecto)")
+    parser.add_argument("--pairs", type=int, default=300, help="Pares origen/destino por layout (default 300)")
+    parser.add_argument("--seed", type=int, default=42, help="Semilla de los pares (default 42)")
+    args = parser.parse_args()
+
+    total_mismatches = 0
+    for tmx in args.layouts:
+        try:
+            total_mismatches += bench_layout(tmx, args.pairs, args.seed)
+        except Exception as e:  # layout ilegible con el pytmx instalado
+            print("")
+            print("[SKIP] %s: %s" % (tmx, e))
+    return 1 if total_mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
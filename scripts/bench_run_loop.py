@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+PERF-14: Benchmark del driver de la corrida (EventGenerator).
+
+Compara, sobre un modelo SimPy sintetico (N agentes que reintentan cada 0.5 s
+y WOs que se cierran a lo largo de H segundos de SIM), el coste de los dos
+drivers de EventGenerator:
+
+    sliced  bucle historico: env.run(until=now+1) + terminacion y watchdog
+            chequeados desde Python tras cada segundo de SIM
+    single  avance evento a evento (env.peek/env.step); terminacion y
+            watchdog en cada segundo entero (performance.run_mode = "single")
+
+Reporta tiempo total y overhead de bucle = total - env.run() pelado del mismo
+modelo hasta el mismo t final. Verifica que ambos drivers cortan en el MISMO
+instante (si no, sale con codigo 1).
+
+Uso:
+    python scripts/bench_run_loop.py
+    python scripts/bench_run_loop.py --horizon 50000 --agents 8 --repeats 3
+
+Regla: solo ASCII en la salida (consola Windows cp1252).
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+sys.path.insert(0, PROJECT_ROOT)
+
+from tests.run_loop_fakes import fake_generator  # noqa: E402
+
+
+def _modelo(horizonte, agentes):
+    """EventGenerator minimo (sin layout ni almacen real) sobre el modelo."""
+    total = int(horizonte // 10)
+    gen = fake_generator(total)
+    env = gen.env
+    d = gen.almacen.dispatcher
+
+    def cerrador(env):
+        for _ in range(total):
+            yield env.timeout(10.0)
+            d.work_orders_completados.append(env.now)
+
+    def ocioso(env):
+        while True:
+            yield env.timeout(0.5)
+
+    env.process(cerrador(env))
+    for _ in range(agentes):
+        env.process(ocioso(env))
+    return gen
+
+
+def _medir(modo, horizonte, agentes):
+    gen = _modelo(horizonte, agentes)
+    t0 = time.perf_counter()
+    if modo == "single":
+        gen._ejecutar_run_unico(float("inf"), progreso_s=3600.0)
+    elif modo == "sliced":
+        gen._ejecutar_por_tramos(float("inf"))
+    else:
+        gen.env.run(until=horizonte + 1.0)
+    return time.perf_counter() - t0, gen.env.now
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--horizon", type=float, default=200000.0,
+                    help="segundos de SIM del modelo (default 200000)")
+    ap.add_argument("--agents", type=int, default=1)
+    ap.add_argument("--repeats", type=int, default=5)
+    args = ap.parse_args()
+    logging.disable(logging.INFO)
+
+    print(f"Modelo: horizonte={args.horizon:.0f}s SIM, agentes={args.agents}, "
+          f"repeticiones={args.repeats} (mejor de N)")
+    res = {}
+    for modo in ("bare", "sliced", "single"):
+        tiempos, fines = [], set()
+        for _ in range(args.repeats):
+            dt, fin = _medir(modo, args.horizon, args.agents)
+            tiempos.append(dt)
+            fines.add(fin)
+        res[modo] = (min(tiempos), fines)
+
+    base = res["bare"][0]
+    print(f"{'driver':<8} {'total_s':>9} {'overhead_s':>11} {'us/tick':>9} {'t_fin':>9}")
+    for modo in ("bare", "sliced", "single"):
+        dt, fines = res[modo]
+        ticks = max(1.0, max(fines))
+        print(f"{modo:<8} {dt:9.3f} {dt - base:11.3f} "
+              f"{(dt - base) / ticks * 1e6:9.2f} {max(fines):9.1f}")
+
+    if res["sliced"][1] != res["single"][1]:
+        print("[FAIL] sliced y single cortan en instantes distintos")
+        return 1
+    ov_s, ov_u = res["sliced"][0] - base, res["single"][0] - base
+    if ov_u > 0:
+        print(f"[OK] mismo t final; overhead de bucle sliced/single = {ov_s / ov_u:.1f}x")
+    else:
+        print("[OK] mismo t final; overhead de single no medible")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+PERF-7: Convierte replays .jsonl existentes al formato columnar .replaycol
+(core/replay_columnar.py) que el visor web carga sin un json.loads por linea.
+
+Uso:
+    python scripts/convert_replay.py output/simulation_X/replay_X.jsonl
+    python scripts/convert_replay.py a.jsonl b.jsonl --compress
+    python scripts/convert_replay.py a.jsonl --out /tmp/a.replaycol --verify
+
+--verify re-expande el .replaycol a lineas .jsonl y compara byte a byte
+contra el original (sale con codigo 1 si difiere).
+
+Regla: solo ASCII en la salida (consola Windows cp1252).
+"""
+import argparse
+import os
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+
+from core.replay_columnar import (  # noqa: E402
+    columnar_to_jsonl_lines, convert_jsonl_to_columnar)
+
+
+def _verify(jsonl_path, col_path):
+    with open(jsonl_path, "r", encoding="utf-8") as f:
+        original = [line for line in f if line.strip()]
+    return original == list(columnar_to_jsonl_lines(col_path))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="PERF-7: convierte replays .jsonl a columnar .replaycol.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("inputs", nargs="+", help="Archivos .jsonl a convertir")
+    parser.add_argument("--out", type=str, default=None,
+                        help="Destino (solo con un unico input; default: mismo nombre .replaycol)")
+    parser.add_argument("--compress", action="store_true", help="Comprimir el contenedor (deflate)")
+    parser.add_argument("--verify", action="store_true", help="Verificar round-trip byte a byte")
+    args = parser.parse_args()
+
+    if args.out and len(args.inputs) > 1:
+        print("[FAIL] --out solo admite un archivo de entrada")
+        return 1
+
+    rc = 0
+    for src in args.inputs:
+        if not os.path.exists(src):
+            print("[FAIL] no existe: %s" % src)
+            rc = 1
+            continue
+        t0 = time.perf_counter()
+        dst = convert_jsonl_to_columnar(src, args.out, compress=args.compress)
+        dt = time.perf_counter() - t0
+        print("[OK] %s -> %s (%d -> %d bytes, %.2f s)"
+              % (src, dst, os.path.getsize(src), os.path.getsize(dst), dt))
+        if args.verify:
+            if _verify(src, dst):
+                print("[OK] round-trip identico")
+            else:
+                print("[FAIL] round-trip difiere del original")
+                rc = 1
+    return rc
+
+
+if __name__ == "__main__":
+    sys.exit(main())
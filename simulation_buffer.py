@@ -9,7 +9,10 @@ Autor: Claude Code Assistant
 Fecha: 2025-09-11
 """
 
-from typing import List, Dict, Any
+import json
+import os
+import shutil
+from typing import Any, Callable, Dict, Iterator, List, Optional
 
 
 class ReplayBuffer:
@@ -70,4 +73,221 @@ class ReplayBuffer:
         Returns:
             str: Representación del estado actual del buffer
         """
-        return f"ReplayBuffer(events={len(self._events)})"
\ No newline at end of file
+        return f"ReplayBuffer(events={len(self._events)})"
+
+
+class StreamingReplayBuffer(ReplayBuffer):
+    """
+    PERF-8: buffer de replay en modo streaming (memoria acotada).
+
+    Cada evento se serializa al llegar (json.dumps, mismo formato que el
+    volcado) y se acumula en un lote de a lo sumo `batch_size` lineas; al
+    llenarse el lote se escribe de una vez al archivo de cuerpo
+    (`body_path`, tipicamente replay_<ts>.jsonl.part). Nunca se retiene la
+    lista completa de eventos.
+
+    La metadata (SIMULATION_START) solo se conoce al final de la corrida:
+    volcar_replay_a_archivo escribe el header y luego copia el cuerpo en
+    bloques (write_body_to), asi el .jsonl final conserva el layout canonico
+    (header, eventos, SIMULATION_END).
+
+    Attributes:
+        body_path (str): Archivo temporal con el cuerpo del replay
+        batch_size (int): Lineas por escritura (cota de memoria del lote)
+        last_timestamp: Timestamp del ultimo evento recibido
+    """
+
+    is_streaming = True
+
+    def __init__(self, body_path: str, batch_size: int = 1000):
+        """
+        Args:
+            body_path (str): Ruta del archivo de cuerpo (se crea al primer flush)
+            batch_size (int): Eventos serializados por lote antes de escribir
+        """
+        super().__init__()
+        self.body_path = body_path
+        self.batch_size = max(1, int(batch_size))
+        self.last_timestamp = None
+        self.flushes = 0
+        self._pending: List[str] = []
+        self._count = 0
+        self._counts_by_type: Dict[Any, int] = {}
+        self._file = None
+
+    def add_event(self, event: Dict[str, Any]) -> None:
+        """Serializa el evento y lo encola en el lote actual."""
+        self._pending.append(json.dumps(event, ensure_ascii=False))
+        self._count += 1
+        tipo = event.get('type')
+        self._counts_by_type[tipo] = self._counts_by_type.get(tipo, 0) + 1
+        self.last_timestamp = event.get('timestamp')
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Escribe el lote pendiente al archivo de cuerpo."""
+        if not self._pending:
+            return
+        if self._file is None:
+            directory = os.path.dirname(self.body_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(self.body_path, 'w', encoding='utf-8', newline='\n')
+        self._file.write('\n'.join(self._pending) + '\n')
+        self._pending.clear()
+        self.flushes += 1
+
+    def count_by_type(self, tipo: str) -> int:
+        """Eventos recibidos con event['type'] == tipo."""
+        return self._counts_by_type.get(tipo, 0)
+
+    def write_body_to(self, out) -> None:
+        """Copia el cuerpo completo (en bloques) a un archivo de texto abierto."""
+        self.flush()
+        if self._file is None:
+            return
+        self._file.flush()
+        with open(self.body_path, 'r', encoding='utf-8', newline='') as body:
+            shutil.copyfileobj(body, out, 1024 * 1024)
+
+    def iter_events(self) -> Iterator[Dict[str, Any]]:
+        """Relee los eventos del cuerpo uno por uno (sin materializar la lista)."""
+        self.flush()
+        if self._file is None:
+            return
+        self._file.flush()
+        with open(self.body_path, 'r', encoding='utf-8') as body:
+            for line in body:
+                yield json.loads(line)
+
+    def get_events(self) -> List[Dict[str, Any]]:
+        """Compatibilidad con ReplayBuffer: MATERIALIZA todo (evitar en corridas largas)."""
+        return list(self.iter_events())
+
+    def close(self, remove: bool = True) -> None:
+        """Cierra el archivo de cuerpo y (por defecto) lo borra."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if remove and os.path.exists(self.body_path):
+            os.remove(self.body_path)
+
+    def clear(self) -> None:
+        self.close(remove=True)
+        self._pending.clear()
+        self._count = 0
+        self._counts_by_type.clear()
+        self.last_timestamp = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __repr__(self) -> str:
+        return (f"StreamingReplayBuffer(events={self._count}, "
+                f"batch_size={self.batch_size}, body={self.body_path})")
+
+
+def _replay_evento_default(timestamp, tipo: str, datos: Dict[str, Any]) -> Dict[str, Any]:
+    """Forma de replay de un evento generico (la de registrar_evento)."""
+    return {'type': tipo, 'timestamp': timestamp, **datos}
+
+
+class UnifiedEventLog(ReplayBuffer):
+    """
+    PERF-10: log unico de eventos (modo single-log).
+
+    En lugar de guardar cada evento dos veces (dict para analiticas en
+    almacen.event_log + dict para el replay), se guarda UNA representacion
+    unificada por evento: la tupla (timestamp, tipo, datos). Las dos formas
+    se derivan al consumirlas:
+
+    - replay: iter_events() aplica `replay_builder(timestamp, tipo, datos)`
+      (AlmacenMejorado lo enlaza a su constructor de eventos de replay), que
+      es lo que consume volcar_replay_a_archivo.
+    - analiticas: analytics_events() devuelve una vista iterable que produce
+      {'timestamp', 'tipo', **datos}, el mismo dict que antes se acumulaba en
+      event_log (AnalyticsEngine / AnalyticsExporter).
+
+    Los eventos de replay que llegan ya armados por add_event (no pasan por
+    registrar_evento) se guardan tal cual y no aparecen en las analiticas,
+    igual que antes.
+
+    Attributes:
+        replay_builder: Callable (timestamp, tipo, datos) -> evento de replay
+        last_timestamp: Timestamp del ultimo evento recibido
+    """
+
+    is_unified = True
+
+    def __init__(self, replay_builder: Optional[Callable[..., Dict[str, Any]]] = None):
+        super().__init__()
+        self.replay_builder = replay_builder or _replay_evento_default
+        self.last_timestamp = None
+        self._n_analytics = 0
+        self._counts_by_type: Dict[Any, int] = {}
+
+    def add_record(self, timestamp, tipo: str, datos: Dict[str, Any]) -> None:
+        """Registra un evento en su forma unificada (sin copiar `datos`)."""
+        self._events.append((timestamp, tipo, datos))
+        self._n_analytics += 1
+        self._counts_by_type[tipo] = self._counts_by_type.get(tipo, 0) + 1
+        self.last_timestamp = timestamp
+
+    def add_event(self, event: Dict[str, Any]) -> None:
+        """Evento de replay ya armado: solo va al replay."""
+        timestamp = event.get('timestamp')
+        self._events.append((timestamp, None, event))
+        tipo = event.get('type')
+        self._counts_by_type[tipo] = self._counts_by_type.get(tipo, 0) + 1
+        self.last_timestamp = timestamp
+
+    def count_by_type(self, tipo: str) -> int:
+        """Eventos de replay con event['type'] == tipo."""
+        return self._counts_by_type.get(tipo, 0)
+
+    def iter_events(self) -> Iterator[Dict[str, Any]]:
+        """Eventos de replay, derivados uno por uno."""
+        builder = self.replay_builder
+        for timestamp, tipo, datos in self._events:
+            yield datos if tipo is None else builder(timestamp, tipo, datos)
+
+    def get_events(self) -> List[Dict[str, Any]]:
+        """Compatibilidad con ReplayBuffer: MATERIALIZA todo (evitar en corridas largas)."""
+        return list(self.iter_events())
+
+    def analytics_events(self) -> 'AnalyticsEventView':
+        """Vista de analiticas (reemplaza a almacen.event_log)."""
+        return AnalyticsEventView(self)
+
+    def clear(self) -> None:
+        super().clear()
+        self._n_analytics = 0
+        self._counts_by_type.clear()
+        self.last_timestamp = None
+
+    def __repr__(self) -> str:
+        return f"UnifiedEventLog(events={len(self._events)}, analytics={self._n_analytics})"
+
+
+class AnalyticsEventView:
+    """
+    PERF-10: vista de solo lectura de un UnifiedEventLog con la forma de
+    evento de analiticas ({'timestamp', 'tipo', **datos}). Soporta len(),
+    bool() e iteracion, que es lo que usan SimulationContext y
+    AnalyticsEngine (pd.DataFrame materializa la vista una sola vez).
+    """
+
+    def __init__(self, log: UnifiedEventLog):
+        self._log = log
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for timestamp, tipo, datos in self._log._events:
+            if tipo is not None:
+                yield {'timestamp': timestamp, 'tipo': tipo, **datos}
+
+    def __len__(self) -> int:
+        return self._log._n_analytics
+
+    def __repr__(self) -> str:
+        return f"AnalyticsEventView(events={len(self)})"
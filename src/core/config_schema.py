@@ -19,7 +19,7 @@ Politica:
 
 Ley #4: ASCII puro en mensajes.
 """
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from pydantic import BaseModel, ConfigDict, ValidationError
 
@@ -174,6 +174,116 @@ class WavesConfig(BaseModel):
     release_times: Optional[Dict[str, float]] = None
 
 
+class PerformanceConfig(BaseModel):
+    """
+    Bloque 'performance' (PERF-x): optimizaciones de CPU/memoria del motor.
+    Opt-in: NO esta en el canonico; bloque ausente => motor historico
+    byte-identico. Cada clave anota su lector.
+    """
+    model_config = ConfigDict(extra="allow")
+    # PERF-1: oraculo de distancias precalculadas (distance_oracle.py).
+    # Lectores: EventGenerator.crear_simulacion -> AssignmentCostCalculator,
+    # RouteCalculator.
+    distance_oracle: Optional[bool] = None
+    # PERF-2: cache persistente por hash del TMX (layout_cache.py).
+    # Lectores: EventGenerator.crear_simulacion -> LayoutManager, Pathfinder,
+    # build_distance_oracle. layout_cache_dir: raiz alternativa (default:
+    # <dir del TMX>/.layout_cache).
+    layout_cache: Optional[bool] = None
+    layout_cache_dir: Optional[str] = None
+    # PERF-3: motor de pathfinding (pathfinder_engines.create_pathfinder):
+    # astar (default historico) | astar_array | jps (PERF-4). Lector: EventGenerator.
+    pathfinder_engine: Optional[str] = None
+    # PERF-4: desempate de jps: astar (default; caminos del A*, JPS solo para
+    # costes) | jps (caminos JPS: mismo coste, el .jsonl puede cambiar).
+    jps_tie_break: Optional[str] = None
+    # PERF-7: ademas del .jsonl, escribe replay_<ts>.replaycol (columnar
+    # binario, core/replay_columnar.py). Lector: EventGenerator / visor web.
+    replay_columnar: Optional[bool] = None
+    # PERF-8: replay en streaming (simulation_buffer.StreamingReplayBuffer):
+    # cuerpo por lotes de replay_stream_batch eventos (default 1000) a un
+    # .part; el .jsonl final queda igual. Lector: EventGenerator.
+    replay_streaming: Optional[bool] = None
+    replay_stream_batch: Optional[int] = None
+    # PERF-9: estado_agente compacto en el replay (omite los campos legacy
+    # constantes/redundantes: accion, direccion_x, tour_total_tasks, carga...).
+    # El visor web solo lee position/status/x/y. Lector: AlmacenMejorado.
+    replay_compact_estado: Optional[bool] = None
+    # PERF-10: single-log. Cada evento se guarda una sola vez (UnifiedEventLog)
+    # y almacen.event_log / el replay son vistas derivadas. Con
+    # replay_streaming activo no aplica (el replay ya vive en disco).
+    # Lector: EventGenerator.
+    single_event_log: Optional[bool] = None
+    # PERF-13: despertar de operarios ociosos: poll (default historico,
+    # reintento cada 0.5 s) | event (evento SimPy del dispatcher).
+    # idle_wakeup_timeout: red de seguridad en s (default 30; 0 = sin).
+    # Lector: DispatcherV11.
+    idle_wakeups: Optional[str] = None
+    idle_wakeup_timeout: Optional[float] = None
+    # PERF-14: sliced (default historico: env.run en tramos de 1 s) | single
+    # (avance evento a evento con env.peek/env.step; terminacion y watchdog
+    # en cada segundo entero, mismo replay). progress_log_seconds: log de progreso por reloj de pared
+    # (default 5). Lector: EventGenerator.ejecutar.
+    run_mode: Optional[str] = None
+    progress_log_seconds: Optional[float] = None
+    # PERF-15: asignacion por lote en Optimizacion Global: con varios ociosos,
+    # la primera WO de cada uno sale de una asignacion lineal (Hungaro, scipy)
+    # en vez de N elecciones greedy. batch_window: ventana (s) en la que se
+    # juntan los pedidos de ociosos antes de resolver (default 0.5; 0 = solo
+    # los del mismo instante). Lector: DispatcherV11.
+    batch_assignment: Optional[bool] = None
+    batch_window: Optional[float] = None
+    # PERF-17: motor de orden de visita del tour: "sequence" (default
+    # historico) | "local_search" (2-opt/Or-opt sobre la matriz del oraculo),
+    # o dict por estrategia {"Cercania": "local_search", "*": "sequence"}.
+    # route_engine_max_moves: presupuesto DETERMINISTA por tour en
+    # movimientos evaluados (default 20000); route_engine_budget_ms: tope
+    # opcional por reloj de pared (default 0 = sin tope; rompe la
+    # reproducibilidad si salta);
+    # route_engine_or_opt: habilita Or-opt (default true). Lector: DispatcherV11.
+    route_engine: Optional[Union[str, Dict[str, str]]] = None
+    route_engine_budget_ms: Optional[float] = None
+    route_engine_max_moves: Optional[int] = None
+    route_engine_or_opt: Optional[bool] = None
+    # PERF-18: cache LRU en memoria de caminos A* por tramo (start, goal),
+    # compartida por rutas, costos y putaway; maximo de tramos (0 = sin).
+    # Contadores en path_cache_report_<ts>.json. Lector: EventGenerator.
+    path_cache_size: Optional[int] = None
+    # PERF-19: inventario en memoria (consume_stock/add_stock sin SQLite por
+    # movimiento); se vuelca con un executemany al final de la corrida o cada
+    # inventory_flush_every movimientos (0 = solo al final). Lector: EventGenerator.
+    inventory_ledger: Optional[bool] = None
+    inventory_flush_every: Optional[int] = None
+    # PERF-20: commit_reservations / restore_inventory_baseline en bloque
+    # (executemany a tabla temporal + UPDATE con join, pragmas WAL de
+    # DatabaseManager). Lector: EventGenerator -> DataManager.
+    bulk_inventory_sql: Optional[bool] = None
+    # PERF-21: per_cell (default historico: un estado_agente por celda) |
+    # segment (primer paso igual + UN segment_started con el camino RLE;
+    # core/replay_movement.py). Solo tramos sin congestion/timewindow.
+    # Lector: AlmacenMejorado / operators._recorrer_tramo.
+    movement_events: Optional[str] = None
+    # PERF-22: sin capa de congestion activa, cada tramo avanza con UN
+    # env.timeout (posicion interpolada a demanda) en vez de uno por celda.
+    # Tramos que deben emitir eventos por celda (movement_events = per_cell)
+    # siguen paso a paso. Lector: AlmacenMejorado / operators._recorrer_tramo.
+    coarse_movement: Optional[bool] = None
+    # PERF-23: work_order_update en delta (replay v2: header con
+    # wo_update_schema = 2 + work_order_static; core/replay_wo_delta.py).
+    # No aplica con single_event_log. Lector: AlmacenMejorado.
+    wo_update_delta: Optional[bool] = None
+    # PERF-24: ReservationTable indexada (bisect en is_free / earliest_free /
+    # can_swap e interval_id SIPP en O(log k)); mismas respuestas que el
+    # barrido lineal. Lector: AlmacenMejorado (timewindow).
+    reservation_index: Optional[bool] = None
+    # PERF-25: indice inverso agente -> celdas y heap de vencimientos en la
+    # ReservationTable (release_agent O(intervalos propios), purge_before
+    # incremental). reservation_purge_horizon: margen en segundos de la purga
+    # automatica por tramo (default 1.0; nunca menor que clearance).
+    reservation_expiry_index: Optional[bool] = None
+    reservation_purge_horizon: Optional[float] = None
+
+
 class AgentTypeConfig(BaseModel):
     """Un grupo de agentes de la flota (agent_types[])."""
     model_config = ConfigDict(extra="allow")
@@ -249,6 +359,9 @@ class WarehouseConfig(BaseModel):
     # --- Tiempos (operators.py / C5 / INIT-4 C1) ---
     tiempos: Optional[TiemposConfig] = None
 
+    # --- Rendimiento (PERF-x, opt-in) ---
+    performance: Optional[PerformanceConfig] = None
+
 
 def _extras_of(model: Optional[BaseModel]) -> Dict[str, Any]:
     if model is None:
@@ -298,7 +411,7 @@ def validate_config_schema(config: Dict[str, Any]) -> Tuple[List[str], List[str]
         if model.congestion.timewindow is not None:
             for key in _extras_of(model.congestion.timewindow):
                 warnings.append("clave DESCONOCIDA: 'congestion.timewindow.%s'" % key)
-    for block_name in ("outbound", "tiempos", "waves", "inbound"):
+    for block_name in ("outbound", "tiempos", "waves", "inbound", "performance"):
         block = getattr(model, block_name)
         if block is not None:
             for key in _extras_of(block):
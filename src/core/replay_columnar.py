@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+"""
+PERF-7: Formato de replay COLUMNAR binario (.replaycol), junto al .jsonl.
+
+El .jsonl (una linea json.dumps por evento) sigue siendo el formato canonico
+(gate byte-identico, analytics, herramientas). El .replaycol guarda EXACTAMENTE
+los mismos registros en columnas tipadas para que el visor web los cargue sin
+un json.loads por linea:
+
+- Contenedor: zip de arrays NumPy (np.savez, sin dependencias nuevas; no hay
+  pyarrow en el entorno). Se lee con np.load (lazy por entrada).
+- `header.json`: el registro SIMULATION_START (metadata) tal cual.
+- `t`: indice de tiempo float64 de todos los registros (en orden de archivo).
+- Los registros se agrupan por ESQUEMA (tupla de claves, con un nivel de dict
+  anidado aplanado: `data.x`, `data.status`, ...). Cada esquema es una tabla:
+  filas (posicion en el archivo) + una columna por clave.
+- Tipos de columna: int64 / float64 / bool / num (int o float mezclados: float64
+  + mascara es_entero) / str (codigos int32 sobre un diccionario de strings
+  global) / json (codigos sobre un diccionario de valores JSON: posiciones,
+  listas, dicts). None -> mascara de nulos.
+
+Reconstruccion exacta: mismas claves, mismo orden, mismos tipos => re-serializar
+con json.dumps da el .jsonl original byte a byte (ver `columnar_to_jsonl_lines`).
+Los valores JSON repetidos (p.ej. la misma posicion [3, 29]) se reconstruyen
+como UN objeto compartido entre eventos: tratarlos como solo lectura.
+
+Ley #4: ASCII puro en prints/logs.
+"""
+
+import io
+import json
+import zipfile
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+COLUMNAR_EXTENSION = ".replaycol"
+FORMAT_VERSION = 1
+
+# Enteros por encima de 2**53 no caben exactos en float64 (columna 'num').
+_MAX_EXACT_INT = 2 ** 53
+
+_KIND_NULL = "null"
+_KIND_BOOL = "bool"
+_KIND_INT = "int"
+_KIND_FLOAT = "float"
+_KIND_NUM = "num"
+_KIND_STR = "str"
+_KIND_JSON = "json"
+
+
+def _schema_of(record: Dict[str, Any]) -> Tuple:
+    """Esquema = claves en orden; dicts NO vacios de primer nivel se aplanan."""
+    return tuple(
+        (k, tuple(v.keys())) if isinstance(v, dict) and v else (k, None)
+        for k, v in record.items())
+
+
+def _paths(schema: Tuple) -> List[Tuple[str, Optional[str]]]:
+    out = []
+    for key, sub in schema:
+        if sub is None:
+            out.append((key, None))
+        else:
+            out.extend((key, s) for s in sub)
+    return out
+
+
+def _kind_of(values: List[Any]) -> str:
+    kinds = set()
+    for v in values:
+        if v is None:
+            continue
+        tv = type(v)
+        if tv is bool:
+            kinds.add(_KIND_BOOL)
+        elif tv is int:
+            kinds.add(_KIND_INT if -_MAX_EXACT_INT <= v <= _MAX_EXACT_INT else _KIND_JSON)
+        elif tv is float:
+            kinds.add(_KIND_FLOAT)
+        elif tv is str:
+            kinds.add(_KIND_STR)
+        else:
+            kinds.add(_KIND_JSON)
+        if len(kinds) > 2:
+            return _KIND_JSON
+    if not kinds:
+        return _KIND_NULL
+    if len(kinds) == 1:
+        return kinds.pop()
+    if kinds == {_KIND_INT, _KIND_FLOAT}:
+        return _KIND_NUM
+    return _KIND_JSON
+
+
+class _Dictionary:
+    """Diccionario string -> codigo int32 (orden de aparicion)."""
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def code(self, s: str) -> int:
+        c = self.codes.get(s)
+        if c is None:
+            c = self.codes[s] = len(self.values)
+            self.values.append(s)
+        return c
+
+
+def _npy_bytes(arr: np.ndarray) -> bytes:
+    buf = io.BytesIO()
+    np.save(buf, arr, allow_pickle=False)
+    return buf.getvalue()
+
+
+def write_columnar_replay(path: str, header: Optional[Dict[str, Any]],
+                          records: Iterable[Dict[str, Any]],
+                          compress: bool = False) -> int:
+    """
+    Escribe `header` (registro SIMULATION_START) + `records` (resto de lineas
+    del .jsonl, en orden) a `path`. Devuelve la cantidad de registros.
+    """
+    groups: Dict[Tuple, List[int]] = {}
+    group_records: Dict[Tuple, List[Dict[str, Any]]] = {}
+    times: List[float] = []
+    n = 0
+    for rec in records:
+        schema = _schema_of(rec)
+        rows = groups.get(schema)
+        if rows is None:
+            rows = groups[schema] = []
+            group_records[schema] = []
+        rows.append(n)
+        group_records[schema].append(rec)
+        ts = rec.get('timestamp', 0)
+        times.append(float(ts) if isinstance(ts, (int, float)) and not isinstance(ts, bool) else 0.0)
+        n += 1
+
+    strings = _Dictionary()
+    jsons = _Dictionary()
+    arrays: Dict[str, np.ndarray] = {
+        't': np.asarray(times, dtype=np.float64),
+    }
+    schemas_meta = []
+    for si, (schema, rows) in enumerate(groups.items()):
+        recs = group_records[schema]
+        arrays[f"s{si}_rows"] = np.asarray(rows, dtype=np.int64)
+        cols_meta = []
+        for ci, (key, sub) in enumerate(_paths(schema)):
+            if sub is None:
+                values = [r[key] for r in recs]
+            else:
+                values = [r[key][sub] for r in recs]
+            kind = _kind_of(values)
+            prefix = f"s{si}_c{ci}"
+            has_null = any(v is None for v in values)
+            if has_null and kind not in (_KIND_NULL, _KIND_STR, _KIND_JSON):
+                arrays[prefix + "_null"] = np.fromiter(
+                    (v is None for v in values), dtype=np.bool_, count=len(values))
+            if kind == _KIND_BOOL:
+                arrays[prefix] = np.fromiter((bool(v) for v in values), dtype=np.bool_, count=len(values))
+            elif kind == _KIND_INT:
+                arrays[prefix] = np.fromiter((0 if v is None else v for v in values),
+                                             dtype=np.int64, count=len(values))
+            elif kind in (_KIND_FLOAT, _KIND_NUM):
+                arrays[prefix] = np.fromiter((0.0 if v is None else v for v in values),
+                                             dtype=np.float64, count=len(values))
+                if kind == _KIND_NUM:
+                    arrays[prefix + "_isint"] = np.fromiter(
+                        (type(v) is int for v in values), dtype=np.bool_, count=len(values))
+            elif kind == _KIND_STR:
+                arrays[prefix] = np.fromiter((-1 if v is None else strings.code(v) for v in values),
+                                             dtype=np.int32, count=len(values))
+            elif kind == _KIND_JSON:
+                arrays[prefix] = np.fromiter(
+                    (-1 if v is None else jsons.code(json.dumps(v, ensure_ascii=False))
+                     for v in values), dtype=np.int32, count=len(values))
+            cols_meta.append(kind)
+        schemas_meta.append({
+            'keys': [[k, list(sub) if sub is not None else None] for k, sub in schema],
+            'kinds': cols_meta,
+        })
+
+    meta = {
+        'format': 'replaycol',
+        'version': FORMAT_VERSION,
+        'n_records': n,
+        'schemas': schemas_meta,
+        'strings': strings.values,
+        'jsons': jsons.values,
+    }
+    mode = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+    with zipfile.ZipFile(path, 'w', compression=mode) as zf:
+        zf.writestr('meta.json', json.dumps(meta, ensure_ascii=False))
+        zf.writestr('header.json', json.dumps(header, ensure_ascii=False)
+                    if header is not None else 'null')
+        for name, arr in arrays.items():
+            zf.writestr(name + '.npy', _npy_bytes(arr))
+    return n
+
+
+def _load_npy(zf: zipfile.ZipFile, name: str) -> Optional[np.ndarray]:
+    try:
+        data = zf.read(name + '.npy')
+    except KeyError:
+        return None
+    return np.load(io.BytesIO(data), allow_pickle=False)
+
+
+def _column_values(zf, prefix: str, kind: str, n: int,
+                   strings_obj: np.ndarray, jsons_obj: np.ndarray) -> List[Any]:
+    if kind == _KIND_NULL:
+        return [None] * n
+    arr = _load_npy(zf, prefix)
+    if kind == _KIND_STR:
+        return strings_obj[arr].tolist()
+    if kind == _KIND_JSON:
+        return jsons_obj[arr].tolist()
+    values = arr.tolist()
+    if kind == _KIND_NUM:
+        isint = _load_npy(zf, prefix + "_isint").tolist()
+        values = [int(v) if i else v for v, i in zip(values, isint)]
+    null = _load_npy(zf, prefix + "_null")
+    if null is not None:
+        values = [None if m else v for v, m in zip(values, null.tolist())]
+    return values
+
+
+def read_columnar_replay(path: str) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+    """(header, registros en orden de archivo) de un .replaycol."""
+    with zipfile.ZipFile(path, 'r') as zf:
+        meta = json.loads(zf.read('meta.json').decode('utf-8'))
+        if meta.get('format') != 'replaycol' or meta.get('version') != FORMAT_VERSION:
+            raise ValueError(f"[REPLAY-COLUMNAR] formato no soportado: "
+                             f"{meta.get('format')} v{meta.get('version')}")
+        header = json.loads(zf.read('header.json').decode('utf-8'))
+        # Indice -1 (None) al final de cada diccionario.
+        strings_obj = np.empty(len(meta['strings']) + 1, dtype=object)
+        strings_obj[:-1] = meta['strings']
+        strings_obj[-1] = None
+        jsons_obj = np.empty(len(meta['jsons']) + 1, dtype=object)
+        jsons_obj[:-1] = [json.loads(s) for s in meta['jsons']]
+        jsons_obj[-1] = None
+
+        records = np.empty(meta['n_records'], dtype=object)
+        for si, schema in enumerate(meta['schemas']):
+            rows = _load_npy(zf, f"s{si}_rows")
+            n = len(rows)
+            kinds = schema['kinds']
+            ci = 0
+            top_keys = []
+            top_cols = []
+            for key, sub in schema['keys']:
+                if sub is None:
+                    top_cols.append(_column_values(zf, f"s{si}_c{ci}", kinds[ci], n,
+                                                   strings_obj, jsons_obj))
+                    ci += 1
+                else:
+                    sub_cols = []
+                    for _ in sub:
+                        sub_cols.append(_column_values(zf, f"s{si}_c{ci}", kinds[ci], n,
+                                                       strings_obj, jsons_obj))
+                        ci += 1
+                    top_cols.append([dict(zip(sub, vals)) for vals in zip(*sub_cols)])
+                top_keys.append(key)
+            built = np.empty(n, dtype=object)
+            built[:] = [dict(zip(top_keys, vals)) for vals in zip(*top_cols)] if top_keys \
+                else [{} for _ in range(n)]
+            records[rows] = built
+    return header, records.tolist()
+
+
+def read_columnar_times(path: str) -> np.ndarray:
+    """Solo el indice de tiempo (float64, orden de archivo)."""
+    with zipfile.ZipFile(path, 'r') as zf:
+        return _load_npy(zf, 't')
+
+
+def columnar_to_jsonl_lines(path: str) -> Iterable[str]:
+    """Lineas .jsonl equivalentes (header + registros); para verificar/exportar."""
+    header, records = read_columnar_replay(path)
+    if header is not None:
+        yield json.dumps(header, ensure_ascii=False) + '\n'
+    for rec in records:
+        yield json.dumps(rec, ensure_ascii=False) + '\n'
+
+
+def convert_jsonl_to_columnar(jsonl_path: str, out_path: Optional[str] = None,
+                              compress: bool = False) -> str:
+    """
+    Convierte un .jsonl existente. La primera linea se toma como header si es
+    SIMULATION_START; lineas vacias/ilegibles se saltean (igual que el visor).
+    """
+    if out_path is None:
+        base = jsonl_path[:-len('.jsonl')] if jsonl_path.endswith('.jsonl') else jsonl_path
+        out_path = base + COLUMNAR_EXTENSION
+    header = None
+    records: List[Dict[str, Any]] = []
+    with open(jsonl_path, 'r', encoding='utf-8') as f:
+        for i, line in enumerate(f):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rec = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if header is None and not records and \
+                    (rec.get('event_type') == 'SIMULATION_START' or rec.get('type') == 'SIMULATION_START'):
+                header = rec
+            else:
+                records.append(rec)
+    n = write_columnar_replay(out_path, header, records, compress=compress)
+    print(f"[REPLAY-COLUMNAR] {n} registros -> {out_path}")
+    return out_path
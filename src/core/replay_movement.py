@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+PERF-21: codificacion compacta del movimiento en el replay.
+
+Historico (performance.movement_events = "per_cell"): por cada celda que un
+agente recorre en un tramo se emite un estado_agente (y, en el tour de
+picks, un work_order_update 'in_progress' de 20 campos identico al
+anterior). Con "segment" el primer paso se emite igual y el resto del tramo
+viaja en UN evento:
+
+    {"type": "segment_started", "timestamp": t0, "agent_id": ...,
+     "origin": [x, y], "steps": [[dx, dy, n], ...],
+     "time_per_cell": dt, "n_cells": N}
+
+`steps` es el camino en direcciones run-length (pasillos rectos = una
+entrada; [0, 0, n] = n esperas en la misma celda, plan time-window). Una
+entrada con cuarto elemento [dx, dy, n, dt_run] usa dt_run en vez de
+time_per_cell (esperas/velocidades distintas dentro del plan).
+
+La celda i del camino (0 = origin) se ocupa desde t0 + dt_1 + ... + dt_(i-1)
+(la 1 desde t0, igual que el per_cell; sumado en el mismo orden que el reloj
+de SimPy, asi los bordes coinciden con los timestamps per_cell); la ultima
+queda hasta el siguiente evento del agente.
+
+Lo usan el motor (encode_segment / encode_timed_segment) y el visor /
+analitica (decode_path, cell_times, position_at). ASCII puro.
+"""
+
+import bisect
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+Cell = Tuple[int, int]
+
+SEGMENT_EVENT = 'segment_started'
+# Holgura al agrupar duraciones de pasos del plan en un run.
+_EPS_T = 1e-9
+# Holgura de position_at: entrar a una celda "ahora" o 1e-7 s despues es lo
+# mismo para el visor (el plan time-window cuantiza a 1e-6 s y la suma de
+# duraciones difiere del reloj de SimPy en el ultimo bit).
+_EPS_SEEK = 1e-7
+
+
+def encode_path(path: Sequence[Sequence[int]],
+                dts: Optional[Sequence[float]] = None,
+                time_per_cell: float = 0.0) -> List[List]:
+    """Camino de celdas -> [[dx, dy, n(, dt)], ...] (pasos unitarios run-length).
+
+    dts[i] = duracion del paso i+1 (None = todos time_per_cell); un run solo
+    agrupa pasos con la misma direccion y la misma duracion.
+    """
+    steps: List[List] = []
+    for i, ((x0, y0), (x1, y1)) in enumerate(zip(path, path[1:])):
+        dx, dy = int(x1) - int(x0), int(y1) - int(y0)
+        dt = time_per_cell if dts is None else float(dts[i])
+        if steps and steps[-1][0] == dx and steps[-1][1] == dy \
+                and abs(_dt_run(steps[-1], time_per_cell) - dt) <= _EPS_T:
+            steps[-1][2] += 1
+            continue
+        step = [dx, dy, 1]
+        if abs(dt - time_per_cell) > _EPS_T:
+            step.append(round(dt, 9))  # sin ruido de restar tiempos del plan
+        steps.append(step)
+    return steps
+
+
+def _dt_run(step: Sequence, time_per_cell: float) -> float:
+    return float(step[3]) if len(step) > 3 else time_per_cell
+
+
+def decode_path(origin: Sequence[int], steps: Sequence[Sequence]) -> List[Cell]:
+    """Inversa de encode_path: celdas desde origin (incluido)."""
+    x, y = int(origin[0]), int(origin[1])
+    cells = [(x, y)]
+    for step in steps:
+        dx, dy, n = step[0], step[1], step[2]
+        for _ in range(int(n)):
+            x += dx
+            y += dy
+            cells.append((x, y))
+    return cells
+
+
+def cell_times(steps: Sequence[Sequence], time_per_cell: float,
+               t0: float) -> List[float]:
+    """times[j] = instante en que se entra a la celda j+1 (times[0] = t0)."""
+    times: List[float] = []
+    t = float(t0)
+    for step in steps:
+        dt = _dt_run(step, time_per_cell)
+        for _ in range(int(step[2])):
+            times.append(t)
+            t += dt
+    return times
+
+
+def encode_segment(path: Sequence[Sequence[int]], time_per_cell: float,
+                   **campos: Any) -> Dict[str, Any]:
+    """Datos del evento segment_started (campos extra: agent_id, status...)."""
+    datos = dict(campos)
+    datos['origin'] = [int(path[0][0]), int(path[0][1])]
+    datos['steps'] = encode_path(path, time_per_cell=float(time_per_cell))
+    datos['time_per_cell'] = float(time_per_cell)
+    datos['n_cells'] = len(path) - 1
+    return datos
+
+
+def encode_timed_segment(plan: Sequence[Tuple[Sequence[int], float]],
+                         time_per_cell: float, **campos: Any) -> Dict[str, Any]:
+    """Como encode_segment pero desde un plan [(celda, t), ...] (time-window):
+    la celda i se ocupa plan[i].t - plan[i-1].t (como _timewindow_execute_plan)."""
+    path = [cell for cell, _ in plan]
+    dts = [max(0.0, float(plan[i][1]) - float(plan[i - 1][1]))
+           for i in range(1, len(plan))]
+    datos = dict(campos)
+    datos['origin'] = [int(path[0][0]), int(path[0][1])]
+    datos['steps'] = encode_path(path, dts, float(time_per_cell))
+    datos['time_per_cell'] = float(time_per_cell)
+    datos['n_cells'] = len(path) - 1
+    return datos
+
+
+def position_at(cells: Sequence[Cell], times: Sequence[float], t: float) -> Cell:
+    """Celda ocupada en t (cells[0] = origen, times de cell_times)."""
+    n = len(cells) - 1
+    if n <= 0:
+        return cells[0]
+    k = bisect.bisect_right(times, t + _EPS_SEEK)
+    return cells[min(n, max(1, k))]
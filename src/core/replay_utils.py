@@ -252,17 +252,38 @@ def agregar_evento_replay(buffer, evento):
     buffer.add_event(evento)
 
 
-def volcar_replay_a_archivo(buffer, archivo_salida, configuracion, almacen=None, initial_work_orders_snapshot=None):
-    """Vuelca el bufer completo a un archivo .jsonl"""
+def volcar_replay_a_archivo(buffer, archivo_salida, configuracion, almacen=None, initial_work_orders_snapshot=None,
+                            archivo_columnar=None):
+    """Vuelca el bufer completo a un archivo .jsonl
+
+    PERF-7: con archivo_columnar ademas escribe los MISMOS registros en
+    formato columnar binario (core/replay_columnar.py) para el visor web.
+    PERF-8: con un StreamingReplayBuffer los eventos ya estan serializados en
+    su archivo de cuerpo; aca solo se escribe el header (recien ahora se
+    conoce la metadata), se copia el cuerpo en bloques y se cierra con
+    SIMULATION_END. Mismo archivo resultante, sin la lista en memoria.
+    PERF-10: con un UnifiedEventLog (single-log) los eventos de replay se
+    derivan uno por uno al escribir, tambien sin materializar la lista.
+    """
+    streaming = getattr(buffer, 'is_streaming', False)
+    unified = getattr(buffer, 'is_unified', False)
 
     # REFACTOR: Usar la instancia de ReplayBuffer recibida como parametro
-    eventos_a_volcar = buffer.get_events()
-    print(f"[VOLCADO-REFACTOR] Usando ReplayBuffer con {len(eventos_a_volcar)} eventos")
+    if streaming or unified:
+        eventos_a_volcar = None
+        total_eventos = len(buffer)
+        n_wo_events = buffer.count_by_type('work_order_update')
+        n_estado_events = buffer.count_by_type('estado_agente')
+        print(f"[VOLCADO-REFACTOR] Usando {type(buffer).__name__} con {total_eventos} eventos")
+    else:
+        eventos_a_volcar = buffer.get_events()
+        total_eventos = len(eventos_a_volcar)
+        print(f"[VOLCADO-REFACTOR] Usando ReplayBuffer con {len(eventos_a_volcar)} eventos")
+        n_wo_events = sum(1 for e in eventos_a_volcar if e.get('type') == 'work_order_update')
+        n_estado_events = sum(1 for e in eventos_a_volcar if e.get('type') == 'estado_agente')
 
     # Contar eventos para volcado (logging minimo)
-    wo_events = [e for e in eventos_a_volcar if e.get('type') == 'work_order_update']
-    estado_events = [e for e in eventos_a_volcar if e.get('type') == 'estado_agente']
-    print(f"[REPLAY-EXPORT] Volcando {len(wo_events)} work_order_update + {len(estado_events)} estado_agente de {len(eventos_a_volcar)} total")
+    print(f"[REPLAY-EXPORT] Volcando {n_wo_events} work_order_update + {n_estado_events} estado_agente de {total_eventos} total")
 
     # ELIMINADO: Sistema de respaldo artificial que causaba replay erratico
     # Los eventos reales del headless son de alta fidelidad y ya no necesitan respaldo sintetico
@@ -274,7 +295,7 @@ def volcar_replay_a_archivo(buffer, archivo_salida, configuracion, almacen=None,
                 'event_type': 'SIMULATION_START',
                 'timestamp': 0,
                 'config': configuracion,
-                'total_events_captured': len(eventos_a_volcar)
+                'total_events_captured': total_eventos
             }
 
             # BUGFIX: Anadir total de WorkOrders al evento SIMULATION_START
@@ -292,6 +313,13 @@ def volcar_replay_a_archivo(buffer, archivo_salida, configuracion, almacen=None,
             else:
                 print(f"[REPLAY-METADATA] WARNING: No se recibio instantanea inicial de WorkOrders")
 
+            # PERF-23: esquema v2 (work_order_update en delta) + campos estaticos.
+            wo_delta = getattr(almacen, 'wo_delta_encoder', None)
+            if wo_delta is not None:
+                metadata.update(wo_delta.header())
+                print(f"[REPLAY-METADATA] work_order_update en delta: {wo_delta.updates} updates, "
+                      f"{wo_delta.campos_omitidos} campos omitidos")
+
             # INIT-5: resumen de nivel de servicio (backorders) en la metadata del replay.
             service = build_service_level_summary(almacen)
             metadata['service_level'] = service
@@ -326,17 +354,37 @@ def volcar_replay_a_archivo(buffer, archivo_salida, configuracion, almacen=None,
             f.write(json.dumps(metadata, ensure_ascii=False) + '\n')
 
             # Escribir todos los eventos
-            for evento in eventos_a_volcar:
-                f.write(json.dumps(evento, ensure_ascii=False) + '\n')
+            if streaming:
+                buffer.write_body_to(f)
+                ultimo_ts = buffer.last_timestamp if total_eventos else 0
+            elif unified:
+                for evento in buffer.iter_events():
+                    f.write(json.dumps(evento, ensure_ascii=False) + '\n')
+                ultimo_ts = buffer.last_timestamp if total_eventos else 0
+            else:
+                for evento in eventos_a_volcar:
+                    f.write(json.dumps(evento, ensure_ascii=False) + '\n')
+                ultimo_ts = eventos_a_volcar[-1]['timestamp'] if eventos_a_volcar else 0
 
             # Escribir evento final
             final_event = {
                 'event_type': 'SIMULATION_END',
-                'timestamp': eventos_a_volcar[-1]['timestamp'] if eventos_a_volcar else 0
+                'timestamp': ultimo_ts
             }
             f.write(json.dumps(final_event, ensure_ascii=False) + '\n')
 
-        print(f"[REPLAY-BUFFER] {len(eventos_a_volcar)} eventos guardados en {archivo_salida}")
+        print(f"[REPLAY-BUFFER] {total_eventos} eventos guardados en {archivo_salida}")
+
+        # PERF-7: copia columnar opcional (el .jsonl sigue siendo el canonico).
+        if archivo_columnar:
+            try:
+                from core.replay_columnar import write_columnar_replay
+                registros = (list(buffer.iter_events()) if eventos_a_volcar is None
+                             else list(eventos_a_volcar))
+                write_columnar_replay(archivo_columnar, metadata, registros + [final_event])
+                print(f"[REPLAY-COLUMNAR] Copia columnar guardada en {archivo_columnar}")
+            except Exception as e:
+                print(f"[REPLAY-COLUMNAR] WARNING: no se pudo escribir {archivo_columnar}: {e}")
         return True
 
     except Exception as e:
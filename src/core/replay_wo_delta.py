@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+PERF-23: work_order_update en delta (esquema de replay v2).
+
+Historico (v1, sin clave en el header): cada work_order_update repite ~20
+campos, la mitad estaticos para la WO (order_id, sku_id, product, location,
+staging...). Con performance.wo_update_delta el header SIMULATION_START
+lleva
+
+    "wo_update_schema": 2,
+    "work_order_static": {wo_id: {order_id, tour_id, sku_id, product, ...}}
+
+y cada update lleva solo `id` + los campos que cambiaron respecto del
+update anterior de esa WO (el primero, respecto de su registro estatico);
+`_unset` lista los campos que el update anterior tenia y este ya no.
+
+WorkOrderDeltaDecoder reconstruye el update COMPLETO (mismo dict que v1),
+asi los lectores no cambian. ASCII puro.
+"""
+
+from typing import Any, Dict, Optional
+
+WO_UPDATE_SCHEMA = 2
+# Campos que no cambian durante la vida de una WO (se internan en el header).
+STATIC_FIELDS = ('order_id', 'tour_id', 'sku_id', 'product', 'location',
+                 'staging', 'work_group', 'work_area', 'qty_requested')
+UNSET_KEY = '_unset'
+
+
+class WorkOrderDeltaEncoder:
+    """Lado del motor: update completo -> delta (en orden de emision)."""
+
+    def __init__(self):
+        self.static: Dict[str, Dict[str, Any]] = {}
+        self._ultimo: Dict[str, Dict[str, Any]] = {}
+        # Metricas
+        self.updates = 0
+        self.campos_omitidos = 0
+
+    def encode(self, datos: Dict[str, Any]) -> Dict[str, Any]:
+        wo_id = datos.get('id')
+        if wo_id is None:
+            return datos
+        clave = str(wo_id)
+        previo = self._ultimo.get(clave)
+        if previo is None:
+            previo = {k: datos[k] for k in STATIC_FIELDS if k in datos}
+            self.static[clave] = previo
+        delta = {'id': wo_id}
+        for k, v in datos.items():
+            if k not in previo or previo[k] != v:
+                delta[k] = v
+        quitados = [k for k in previo if k not in datos]
+        if quitados:
+            delta[UNSET_KEY] = quitados
+        self._ultimo[clave] = dict(datos)
+        self.updates += 1
+        self.campos_omitidos += len(datos) - (len(delta) - (UNSET_KEY in delta))
+        return delta
+
+    def header(self) -> Dict[str, Any]:
+        """Claves para el SIMULATION_START."""
+        return {'wo_update_schema': WO_UPDATE_SCHEMA, 'work_order_static': self.static}
+
+
+class WorkOrderDeltaDecoder:
+    """Lado del lector: delta -> update completo (en orden de archivo)."""
+
+    def __init__(self, static: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.static = static or {}
+        self._ultimo: Dict[str, Dict[str, Any]] = {}
+
+    def decode(self, evento: Dict[str, Any]) -> Dict[str, Any]:
+        wo_id = evento.get('id')
+        if wo_id is None:
+            return evento
+        clave = str(wo_id)
+        base = self._ultimo.get(clave)
+        completo = dict(base if base is not None else self.static.get(clave, {}))
+        for k in evento.get(UNSET_KEY, ()):
+            completo.pop(k, None)
+        for k, v in evento.items():
+            if k != UNSET_KEY:
+                completo[k] = v
+        self._ultimo[clave] = completo
+        return completo
@@ -290,6 +290,22 @@ class AnalyticsEngine:
                     # Saltar eventos con coordenadas malformadas
                     continue
         
+        # PERF-21: tramos segment_started (performance.movement_events =
+        # "segment"). La celda 1 ya vino en el estado_agente del primer paso;
+        # las siguientes cuentan como si hubieran llegado una por una.
+        if 'origin' in self.events_df.columns:
+            from core.replay_movement import SEGMENT_EVENT, decode_path
+            for _, event in self.events_df[self.events_df['tipo'] == SEGMENT_EVENT].iterrows():
+                try:
+                    celdas = decode_path(event['origin'], event['steps'])[2:]
+                except (ValueError, TypeError, IndexError, KeyError):
+                    continue
+                for x, y in celdas:
+                    if 0 <= x < warehouse_width and 0 <= y < warehouse_height:
+                        mask = (heatmap_df['x (coordenada)'] == x) & (heatmap_df['y (coordenada)'] == y)
+                        heatmap_df.loc[mask, 'tiempo_transito (segundos)'] += 1.0
+                        transito_count += 1
+
         print(f"[ANALYTICS-ENGINE] Procesados {transito_count} eventos de transito")
         
         # Calcular tiempo de trabajo (eventos task_completed)
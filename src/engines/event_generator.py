@@ -11,6 +11,7 @@ import logging
 logging.basicConfig(level=logging.INFO, format='%(message)s', stream=sys.stdout)
 logger = logging.getLogger(__name__)
 import os
+import time
 
 import simpy
 from datetime import datetime
@@ -21,8 +22,11 @@ from subsystems.simulation.operators import crear_operarios
 from subsystems.simulation.layout_manager import LayoutManager
 from subsystems.simulation.assignment_calculator import AssignmentCostCalculator
 from subsystems.simulation.data_manager import DataManager
-from subsystems.simulation.pathfinder import Pathfinder
+from subsystems.simulation.pathfinder_engines import create_pathfinder
 from subsystems.simulation.route_calculator import RouteCalculator
+from subsystems.simulation.distance_oracle import build_distance_oracle
+from subsystems.simulation.layout_cache import LayoutCache
+from subsystems.simulation.path_cache import SegmentPathLRU
 
 # Imports de core
 from core.config_manager import ConfigurationManager, ConfigurationError
@@ -34,7 +38,7 @@ from analytics.exporter_v2 import AnalyticsExporter
 from analytics.context import SimulationContext
 
 # Replay buffer
-from simulation_buffer import ReplayBuffer
+from simulation_buffer import ReplayBuffer, StreamingReplayBuffer, UnifiedEventLog
 
 
 # MEJ-ROBUSTEZ (auditoria 2026-07-10): watchdog de NO-PROGRESO. Si ninguna WO
@@ -108,7 +112,20 @@ class EventGenerator:
         self.session_output_dir = os.path.join("output", f"simulation_{self.session_timestamp}")
         
         # Replay buffer
-        self.replay_buffer = ReplayBuffer()
+        # PERF-8: modo streaming (memoria acotada): el cuerpo del replay se
+        # escribe por lotes a un .part durante la corrida; el header se
+        # completa al final en volcar_replay_a_archivo.
+        _perf = self.configuracion.get('performance', {}) or {}
+        if _perf.get('replay_streaming', False):
+            self.replay_buffer = StreamingReplayBuffer(
+                os.path.join(self.session_output_dir,
+                             f"replay_{self.session_timestamp}.jsonl.part"),
+                batch_size=_perf.get('replay_stream_batch', 1000))
+        elif _perf.get('single_event_log', False):
+            # PERF-10: un solo log (replay + analiticas derivados de el).
+            self.replay_buffer = UnifiedEventLog()
+        else:
+            self.replay_buffer = ReplayBuffer()
         
         # TMX components
         self.layout_manager = None
@@ -116,6 +133,8 @@ class EventGenerator:
         self.data_manager = None
         self.cost_calculator = None
         self.route_calculator = None
+        self.distance_oracle = None  # PERF-1 (opt-in)
+        self.layout_cache = None     # PERF-2 (opt-in)
         
         # Operarios
         self.operarios = []
@@ -144,9 +163,17 @@ class EventGenerator:
         project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
         tmx_file = os.path.join(project_root, self.configuracion.get('layout_file', 'layouts/WH1.tmx'))
         logger.info(f"[EVENT-GENERATOR] Cargando layout: {tmx_file}")
+        perf_cfg = self.configuracion.get('performance', {}) or {}
         
         try:
-            self.layout_manager = LayoutManager(tmx_file, headless=True)
+            # PERF-2: cache persistente junto al layout (opt-in). Sin el flag
+            # se construye todo desde el TMX como siempre.
+            if perf_cfg.get('layout_cache', False):
+                self.layout_cache = LayoutCache(
+                    tmx_file, cache_root=perf_cfg.get('layout_cache_dir'))
+                logger.info(f"[EVENT-GENERATOR] Cache de layout: {self.layout_cache.dir}")
+            self.layout_manager = LayoutManager(tmx_file, headless=True,
+                                                layout_cache=self.layout_cache)
         except Exception as e:
             logger.error(f"[EVENT-GENERATOR ERROR] No se pudo cargar TMX: {e}")
             return False
@@ -154,7 +181,11 @@ class EventGenerator:
         # 2. Inicializar Pathfinder
         logger.info("[EVENT-GENERATOR] Inicializando pathfinding...")
         try:
-            self.pathfinder = Pathfinder(self.layout_manager.collision_matrix)
+            # PERF-3: motor de A* seleccionable (default: Pathfinder historico).
+            self.pathfinder = create_pathfinder(
+                self.layout_manager.collision_matrix,
+                perf_cfg.get('pathfinder_engine'),
+                perf_cfg.get('jps_tie_break'))
             self.route_calculator = RouteCalculator(self.pathfinder)
         except Exception as e:
             logger.error(f"[EVENT-GENERATOR ERROR] No se pudo inicializar pathfinder: {e}")
@@ -167,6 +198,12 @@ class EventGenerator:
         layout_file = self.configuracion.get('layout_file', '')
         sequence_file = self.configuracion.get('sequence_file', '')
         self.data_manager = DataManager(layout_file, sequence_file, headless=True)
+        # PERF-20: reservas/baseline en bloque (tabla temporal + join).
+        self.data_manager.bulk_inventory_sql = bool(perf_cfg.get('bulk_inventory_sql', False))
+        # PERF-19: inventario en memoria con escritura diferida (opt-in).
+        if perf_cfg.get('inventory_ledger', False):
+            self.data_manager.enable_inventory_ledger(
+                int(perf_cfg.get('inventory_flush_every', 0) or 0))
         
         # 5. Crear calculador de costos
         self.cost_calculator = AssignmentCostCalculator(self.data_manager)
@@ -189,6 +226,32 @@ class EventGenerator:
             visual_event_queue=None,  # No hay cola visual
             replay_buffer=self.replay_buffer  # SI hay replay buffer
         )
+
+        # 6b. PERF-2/18: caches de caminos recien ahora, con la grilla FINAL
+        # (F2.d ya bloqueo el staging si outbound esta activo).
+        if self.layout_cache is not None:
+            self.pathfinder.path_cache = self.layout_cache.load_paths(
+                self.pathfinder.width, self.layout_manager.collision_matrix)
+            logger.info(f"[EVENT-GENERATOR] Caminos en cache: "
+                        f"{len(self.pathfinder.path_cache)}")
+        # PERF-18: LRU de caminos por tramo compartida por todo lo que usa
+        # este pathfinder (rutas, costos, putaway); delante del store
+        # persistente de PERF-2 si lo hay.
+        _lru = int(perf_cfg.get('path_cache_size', 0) or 0)
+        if _lru > 0:
+            self.pathfinder.path_cache = SegmentPathLRU(
+                self.pathfinder.width, _lru, backing=self.pathfinder.path_cache)
+            logger.info(f"[EVENT-GENERATOR] Cache LRU de caminos: {_lru} tramos")
+
+        # 6c. PERF-1: oraculo de distancias precalculadas (opt-in), sobre la
+        # grilla FINAL (despues de F2.d). Sin el flag no se construye y el
+        # calculador sigue con Manhattan (historico).
+        if perf_cfg.get('distance_oracle', False):
+            self.distance_oracle = build_distance_oracle(
+                self.layout_manager, self.data_manager, self.pathfinder,
+                layout_cache=self.layout_cache)
+            self.cost_calculator.distance_oracle = self.distance_oracle
+            self.route_calculator.distance_oracle = self.distance_oracle
         
         # 7. Crear operarios
         self.procesos_operarios, self.operarios = crear_operarios(
@@ -318,44 +381,30 @@ class EventGenerator:
             
             # Ejecutar simulacion SimPy pura
             logger.info("[EVENT-GENERATOR] Ejecutando simulacion SimPy...")
-            step_counter = 0
 
             # MEJ-ROBUSTEZ: watchdog de no-progreso (ver compute_stall_limit).
             _stall_limit = compute_stall_limit(
                 getattr(self.almacen, 'inbound_schedule', []))
-            _last_done = -1
-            _t_last_progress = 0.0
 
-            while not self.almacen.simulacion_ha_terminado():
-                try:
-                    self.env.run(until=self.env.now + 1.0)
-                    step_counter += 1
-
-                    # Log cada 100 pasos
-                    if step_counter % 100 == 0:
-                        stats = self.almacen.dispatcher.obtener_estadisticas()
-                        logger.info(f"[EVENT-GENERATOR] t={self.env.now:.1f}s | "
-                              f"Completadas: {stats['completados']}/{stats['total']}")
-
-                    # MEJ-ROBUSTEZ: si nada se cierra por > stall_limit de
-                    # tiempo de SIM, hay deadlock -> abortar con diagnostico
-                    # y seguir al volcado (el .jsonl parcial se conserva).
-                    _done = len(self.almacen.dispatcher.work_orders_completados)
-                    if _done != _last_done:
-                        _last_done = _done
-                        _t_last_progress = self.env.now
-                    elif self.env.now - _t_last_progress > _stall_limit:
-                        self._diagnosticar_stall(_stall_limit)
-                        break
-
-                except simpy.core.EmptySchedule:
-                    if self.almacen.simulacion_ha_terminado():
-                        break
-                    else:
-                        logger.warning("[EVENT-GENERATOR WARNING] No hay eventos pero simulacion no termino")
-                        break
+            # PERF-14: run_mode "single" = avance evento a evento (env.step)
+            # con el chequeo de terminacion/stall en cada segundo entero;
+            # "sliced" (default) = bucle historico de tramos de 1 s.
+            _perf = self.configuracion.get('performance', {}) or {}
+            if _perf.get('run_mode', 'sliced') == 'single':
+                self._ejecutar_run_unico(
+                    _stall_limit, float(_perf.get('progress_log_seconds', 5.0)))
+            else:
+                self._ejecutar_por_tramos(_stall_limit)
             
             logger.info(f"[EVENT-GENERATOR] Simulacion completada en t={self.env.now:.2f}s")
+
+            # PERF-19: volcar el ledger de inventario (una transaccion).
+            _ledger = getattr(self.data_manager, 'inventory_ledger', None)
+            if _ledger is not None:
+                _filas = self.data_manager.flush_inventory()
+                logger.info(f"[EVENT-GENERATOR] Inventario volcado: {_ledger.movimientos} "
+                            f"movimientos, {_filas} filas en el ultimo flush "
+                            f"({_ledger.flushes} flushes)")
             
             # Exportar analytics
             logger.info("[EVENT-GENERATOR] Exportando analytics...")
@@ -371,17 +420,50 @@ class EventGenerator:
             os.makedirs(self.session_output_dir, exist_ok=True)
             output_file = os.path.join(self.session_output_dir, f"replay_{self.session_timestamp}.jsonl")
             initial_snapshot = getattr(self.almacen.dispatcher, 'initial_work_orders_snapshot', [])
+            # PERF-7: copia columnar (.replaycol) opcional junto al .jsonl.
+            columnar_file = None
+            if (self.configuracion.get('performance', {}) or {}).get('replay_columnar', False):
+                columnar_file = os.path.join(self.session_output_dir,
+                                             f"replay_{self.session_timestamp}.replaycol")
             
             volcar_replay_a_archivo(
                 self.replay_buffer,
                 output_file,
                 self.configuracion,
                 self.almacen,
-                initial_snapshot
+                initial_snapshot,
+                archivo_columnar=columnar_file
             )
             
             logger.info(f"[EVENT-GENERATOR] Archivo generado: {output_file}")
             logger.info(f"[EVENT-GENERATOR] Eventos capturados: {len(self.replay_buffer)}")
+            # PERF-8: el cuerpo temporal ya fue copiado al .jsonl final.
+            if getattr(self.replay_buffer, 'is_streaming', False):
+                self.replay_buffer.close(remove=True)
+
+            # PERF-2: persistir los caminos nuevos para la proxima replica.
+            if self.layout_cache is not None:
+                try:
+                    self.layout_cache.save_paths()
+                except OSError as _e:
+                    logger.warning(f"[LAYOUT-CACHE][WARN] no se pudieron guardar caminos: {_e}")
+
+            # PERF-18: contadores de la cache LRU de caminos (JSON aparte).
+            _pc = getattr(self.pathfinder, 'path_cache', None)
+            if isinstance(_pc, SegmentPathLRU):
+                try:
+                    import json as _json
+                    suffix = f"_{self.session_timestamp}" if self.session_timestamp else ""
+                    pc_path = os.path.join(self.session_output_dir,
+                                           f"path_cache_report{suffix}.json")
+                    rep = _pc.report()
+                    with open(pc_path, "w", encoding="utf-8") as _f:
+                        _json.dump(rep, _f, indent=2)
+                    logger.info(f"[PATH-CACHE] hits={rep['hits']} misses={rep['misses']} "
+                                f"hit_rate={rep['hit_rate']} evictions={rep['evictions']} "
+                                f"-> {pc_path}")
+                except OSError as _e:
+                    logger.warning(f"[PATH-CACHE][WARN] no se pudo escribir reporte: {_e}")
 
             # INICIATIVA #2 - Fase 1: reporte de instrumentacion de congestion (si activa).
             # Se escribe a un JSON aparte para NO contaminar el replay .jsonl.
@@ -467,6 +549,89 @@ class EventGenerator:
             traceback.print_exc()
             return False
     
+    def _ejecutar_por_tramos(self, stall_limit):
+        """Bucle historico: env.run() en tramos de 1 s de SIM, chequeando
+        terminacion y watchdog de no-progreso desde Python tras cada tramo."""
+        step_counter = 0
+        _last_done = -1
+        _t_last_progress = 0.0
+
+        while not self.almacen.simulacion_ha_terminado():
+            try:
+                self.env.run(until=self.env.now + 1.0)
+                step_counter += 1
+
+                # Log cada 100 pasos
+                if step_counter % 100 == 0:
+                    stats = self.almacen.dispatcher.obtener_estadisticas()
+                    logger.info(f"[EVENT-GENERATOR] t={self.env.now:.1f}s | "
+                          f"Completadas: {stats['completados']}/{stats['total']}")
+
+                # MEJ-ROBUSTEZ: si nada se cierra por > stall_limit de
+                # tiempo de SIM, hay deadlock -> abortar con diagnostico
+                # y seguir al volcado (el .jsonl parcial se conserva).
+                _done = len(self.almacen.dispatcher.work_orders_completados)
+                if _done != _last_done:
+                    _last_done = _done
+                    _t_last_progress = self.env.now
+                elif self.env.now - _t_last_progress > stall_limit:
+                    self._diagnosticar_stall(stall_limit)
+                    break
+
+            except simpy.core.EmptySchedule:
+                if self.almacen.simulacion_ha_terminado():
+                    break
+                else:
+                    logger.warning("[EVENT-GENERATOR WARNING] No hay eventos pero simulacion no termino")
+                    break
+
+    def _ejecutar_run_unico(self, stall_limit, progreso_s=5.0):
+        """
+        PERF-14: la corrida avanza evento a evento con la API publica de
+        SimPy (env.peek / env.step) en vez de un env.run(until=now+1) por
+        segundo de SIM. En cada segundo entero k se chequean terminacion y
+        watchdog de no-progreso con el estado tras los eventos < k (lo mismo
+        que ve el bucle por tramos, cuyo `until` es URGENT en k) y al cortar
+        se lleva el reloj a k con env.run(until=k) => mismo t final y mismo
+        replay. El log de progreso se limita por reloj de pared (cada
+        progreso_s segundos reales).
+
+        Returns:
+            'terminada' | 'stall'
+        """
+        env = self.env
+        dispatcher = self.almacen.dispatcher
+        if self.almacen.simulacion_ha_terminado():
+            return 'terminada'
+
+        done_prev, t_progreso = -1, 0.0
+        ultimo_log = time.monotonic()
+        peek, step = env.peek, env.step
+        k = env.now + 1.0
+        while True:
+            while peek() < k:
+                step()
+
+            ahora = time.monotonic()
+            if ahora - ultimo_log >= progreso_s:
+                ultimo_log = ahora
+                stats = dispatcher.obtener_estadisticas()
+                logger.info(f"[EVENT-GENERATOR] t={k:.1f}s | "
+                      f"Completadas: {stats['completados']}/{stats['total']}")
+
+            done = len(dispatcher.work_orders_completados)
+            if done != done_prev:
+                done_prev, t_progreso = done, k
+            elif k - t_progreso > stall_limit:
+                env.run(until=k)
+                self._diagnosticar_stall(stall_limit)
+                return 'stall'
+
+            if self.almacen.simulacion_ha_terminado():
+                env.run(until=k)
+                return 'terminada'
+            k += 1.0
+
     def _diagnosticar_stall(self, stall_limit):
         """
         MEJ-ROBUSTEZ: banner de diagnostico al abortar por no-progreso.
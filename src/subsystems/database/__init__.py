@@ -1,8 +1,10 @@
 # Database subsystem package
-from .database_manager import DatabaseManager, get_db, get_readonly_connection, get_write_connection
+from .database_manager import (DatabaseManager, apply_connection_pragmas, get_db,
+                               get_readonly_connection, get_write_connection)
 
 __all__ = [
     'DatabaseManager',
+    'apply_connection_pragmas',
     'get_db',
     'get_readonly_connection', 
     'get_write_connection'
@@ -17,6 +17,24 @@ from typing import Optional
 from contextlib import contextmanager
 
 
+# Pragmas de rendimiento de toda conexion de escritura (ver _create_connection).
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",       # Write-Ahead Logging
+    "PRAGMA synchronous=NORMAL",     # Faster, still safe
+    "PRAGMA cache_size=-64000",      # 64MB cache
+    "PRAGMA temp_store=MEMORY",      # Temp tables in RAM
+    "PRAGMA foreign_keys=ON",        # Enforce FK constraints
+)
+
+
+def apply_connection_pragmas(conn: sqlite3.Connection) -> sqlite3.Connection:
+    """Apply CONNECTION_PRAGMAS to an existing connection (PERF-20: shared
+    with DataManager's bulk inventory path)."""
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
 class DatabaseManager:
     """
     Singleton Database Manager for SQLite warehouse database.
@@ -110,11 +128,7 @@ class DatabaseManager:
             conn = sqlite3.connect(self.db_path, check_same_thread=False)
         
         # Apply performance optimizations
-        conn.execute("PRAGMA journal_mode=WAL")       # Write-Ahead Logging
-        conn.execute("PRAGMA synchronous=NORMAL")     # Faster, still safe
-        conn.execute("PRAGMA cache_size=-64000")      # 64MB cache
-        conn.execute("PRAGMA temp_store=MEMORY")      # Temp tables in RAM
-        conn.execute("PRAGMA foreign_keys=ON")        # Enforce FK constraints
+        apply_connection_pragmas(conn)
         
         # Enable dict-like row access
         conn.row_factory = sqlite3.Row
@@ -10,9 +10,12 @@ Author: Digital Twin Warehouse Team
 Version: V11 - Migration Phase 3
 """
 
-from typing import Dict, Tuple, Optional, Any, List
+from collections import OrderedDict
+from typing import Dict, Tuple, Optional, Any, List, Sequence
 from dataclasses import dataclass, field
 
+import numpy as np
+
 
 @dataclass
 class CostResult:
@@ -71,14 +74,16 @@ class AssignmentCostCalculator:
     PRIORITY_PENALTY_LOW = 50_000               # Agent has low priority for work_area
     DISTANCE_WEIGHT = 100                       # Cost per grid cell of travel
     PRIORITY_THRESHOLD_GOOD = 10                # Priority <= this is considered good
+    ORIGIN_COLUMN_CACHE = 256                   # PERF-16: LRU of origin columns
 
-    def __init__(self, data_manager, route_calculator=None):
+    def __init__(self, data_manager, route_calculator=None, distance_oracle=None):
         """
         Initialize assignment cost calculator
 
         Args:
             data_manager: DataManager instance with agent configuration
             route_calculator: Optional RouteCalculator for precise distance calculation
+            distance_oracle: Optional DistanceOracle (PERF-1) for O(1) lookups
 
         Configuration Loaded:
             - agent_types with work_area_priorities
@@ -86,6 +91,12 @@ class AssignmentCostCalculator:
         """
         self.data_manager = data_manager
         self.route_calculator = route_calculator
+        # PERF-1: oraculo de distancias precalculadas (opt-in; None = historico)
+        self.distance_oracle = distance_oracle
+        # PERF-16: caches de distance_vector (ver _oracle_caches)
+        self._cache_oracle = None
+        self._cell_cache: Dict[Tuple[int, int], Tuple[int, int]] = {}
+        self._column_cache: OrderedDict = OrderedDict()
 
         # Load agent configuration from data_manager
         self.agent_config = []
@@ -235,7 +246,8 @@ class AssignmentCostCalculator:
 
         Note:
             This is a greedy approach, not an optimal assignment problem solution.
-            For optimal global assignment, consider Hungarian algorithm (future).
+            For optimal one-WO-per-operator assignment see optimal_assignment
+            (PERF-15, Hungarian via scipy).
 
         Example:
             >>> match = calculator.find_best_assignment(idle_ops, pending_wos)
@@ -246,23 +258,207 @@ class AssignmentCostCalculator:
         best_cost = float('inf')
         best_match = None
 
+        # Skip work orders that are already assigned
+        released = [wo for wo in work_orders
+                    if not (hasattr(wo, 'status') and wo.status != 'released')]
+        if not released:
+            return None
+        locations = [wo.ubicacion for wo in released]
+        work_areas = [wo.work_area for wo in released]
+
         for operator in operators:
             # Skip operators that are not available for new assignments
             if not self._is_operator_available(operator):
                 continue
 
-            for wo in work_orders:
-                # Skip work orders that are already assigned
-                if hasattr(wo, 'status') and wo.status != 'released':
-                    continue
+            # PERF-16: one cost vector per operator; argmin keeps the first
+            # minimum, like the strict '<' scan over calculate_cost.
+            costs = self.calculate_cost_vector(operator, locations, work_areas)
+            i = int(np.argmin(costs))
+            if costs[i] < best_cost:
+                best_cost = float(costs[i])
+                best_match = (operator, released[i])
+
+        if best_match is None:
+            return None
+        operator, wo = best_match
+        return (operator, wo, self.calculate_cost(operator, wo))
+
+    def calculate_cost_vector(self, operator, locations: Sequence[Tuple[int, int]],
+                              work_areas: Sequence[str],
+                              priority_scores: Optional[Sequence[int]] = None,
+                              current_position: Optional[Tuple[int, int]] = None) -> np.ndarray:
+        """
+        PERF-16: vectorized calculate_cost for many candidates of ONE operator.
+
+        Returns the float64 vector of total_cost (element-wise equal to
+        calculate_cost(operator, wo, current_position).total_cost) without
+        building a CostResult/breakdown per candidate. Callers only
+        materialize calculate_cost for the WO they pick.
+
+        Args:
+            operator: BaseOperator instance
+            locations: (x, y) of each candidate (work_order.ubicacion)
+            work_areas: work_area of each candidate
+            priority_scores: Optional precomputed
+                operator.get_priority_for_work_area(area) per candidate
+            current_position: Same meaning as in calculate_cost
+
+        Returns:
+            np.ndarray of total costs, aligned with `locations`
+        """
+        if priority_scores is None:
+            by_area: Dict[str, int] = {}
+            for area in work_areas:
+                if area not in by_area:
+                    by_area[area] = operator.get_priority_for_work_area(area)
+            priority_scores = [by_area[area] for area in work_areas]
+        scores = np.asarray(priority_scores, dtype=np.int64)
+        penalties = np.where(
+            scores == 999, float(self.PRIORITY_PENALTY_INCOMPATIBLE),
+            np.where(scores > self.PRIORITY_THRESHOLD_GOOD,
+                     float(self.PRIORITY_PENALTY_LOW), 0.0))
+        distances = self.distance_vector(self._start_position(operator, current_position),
+                                         locations)
+        return penalties + distances * self.DISTANCE_WEIGHT
+
+    def _start_position(self, operator, current_position):
+        """Start cell used by calculate_cost when current_position is None."""
+        if current_position is not None:
+            return current_position
+        if hasattr(operator, 'current_position') and operator.current_position is not None:
+            return operator.current_position
+        if hasattr(operator, 'posicion_grilla'):
+            return operator.posicion_grilla
+        return (0, 0)
+
+    def distance_vector(self, from_pos: Tuple[int, int],
+                        destinations: Sequence[Tuple[int, int]]) -> np.ndarray:
+        """
+        PERF-15: distances from `from_pos` to every destination (float64),
+        element-wise equal to _calculate_distance(from_pos, d).
+
+        With a DistanceOracle the lookups are vectorized: one gather over the
+        origin's row if it is a source, otherwise over the origin's column in
+        the destinations' rows (same symmetry rule as DistanceOracle.lookup).
+        PERF-16: destination cells and origin columns are cached (see
+        _oracle_caches). Whatever the oracle cannot answer falls back to the
+        scalar path.
+        """
+        n = len(destinations)
+        out = np.empty(n, dtype=np.float64)
+        pending = range(n)
+        oracle = self.distance_oracle
+        if oracle is not None and n:
+            cells, columns = self._oracle_caches(oracle)
+            ax, ay = int(from_pos[0]), int(from_pos[1])
+            info = []
+            for d in destinations:
+                key = (int(d[0]), int(d[1]))
+                c = cells.get(key)
+                if c is None:
+                    x, y = key
+                    inside = 0 <= x < oracle.width and 0 <= y < oracle.height
+                    row = oracle.index.get(key, -1) if oracle._walkable(x, y) else -1
+                    c = cells[key] = (y * oracle.width + x if inside else -1, row)
+                info.append(c)
+            flat, rows = np.array(info, dtype=np.int64).reshape(n, 2).T
+            vals = np.full(n, np.nan, dtype=np.float64)
+            r = oracle.index.get((ax, ay))
+            if r is not None:
+                ok = flat >= 0
+                vals[ok] = oracle.dist[r, flat[ok]]
+            elif oracle._walkable(ax, ay):
+                col = columns.get((ax, ay))
+                if col is None:
+                    col = np.ascontiguousarray(oracle.dist[:, ay * oracle.width + ax])
+                    columns[(ax, ay)] = col
+                    if len(columns) > self.ORIGIN_COLUMN_CACHE:
+                        columns.popitem(last=False)
+                else:
+                    columns.move_to_end((ax, ay))
+                ok = rows >= 0
+                vals[ok] = col[rows[ok]]
+            same = flat == (ay * oracle.width + ax)
+            same &= flat >= 0
+            vals[same] = 0.0
+            ok = np.isfinite(vals)
+            out[ok] = vals[ok]
+            oracle.lookups += int(np.count_nonzero(ok & ~same))
+            pending = np.flatnonzero(~ok)
+        for i in pending:
+            out[i] = self._calculate_distance(from_pos, destinations[i])
+        return out
+
+    def _oracle_caches(self, oracle):
+        """
+        PERF-16: caches tied to the current oracle (reset if it changes):
+        destination cell -> (flat index or -1, source row or -1 if not a
+        walkable source) and an LRU of origin columns dist[:, origin] for
+        origins that are not sources (operators between picks).
+        """
+        if self._cache_oracle is not oracle:
+            self._cache_oracle = oracle
+            self._cell_cache = {}
+            self._column_cache = OrderedDict()
+        return self._cell_cache, self._column_cache
+
+    def cost_matrix(self, operators: List, candidates: List[List],
+                    positions: List[Tuple[int, int]]) -> Tuple[np.ndarray, List]:
+        """
+        PERF-15: cost matrix operators x (union of their candidate WOs).
+
+        Row i holds calculate_cost(operators[i], wo, positions[i]).total_cost
+        for the WOs in candidates[i] and np.inf for the rest (not eligible
+        for that operator). Columns follow first appearance across the lists.
 
-                cost_result = self.calculate_cost(operator, wo)
+        Returns:
+            (matrix, column_work_orders)
+        """
+        columns: Dict[Any, int] = {}
+        for wos in candidates:
+            for wo in wos:
+                columns.setdefault(wo, len(columns))
+        matrix = np.full((len(operators), len(columns)), np.inf, dtype=np.float64)
+        for i, (operator, wos, pos) in enumerate(zip(operators, candidates, positions)):
+            if not wos:
+                continue
+            cols = [columns[wo] for wo in wos]
+            matrix[i, cols] = self.calculate_cost_vector(
+                operator, [wo.ubicacion for wo in wos], [wo.work_area for wo in wos],
+                current_position=pos)
+        return matrix, list(columns)
+
+    def optimal_assignment(self, operators: List, candidates: List[List],
+                           positions: List[Tuple[int, int]]) -> Optional[Dict[int, Any]]:
+        """
+        PERF-15: one distinct WO per operator minimizing the summed cost
+        (linear assignment / Hungarian, scipy.optimize.linear_sum_assignment).
 
-                if cost_result.total_cost < best_cost:
-                    best_cost = cost_result.total_cost
-                    best_match = (operator, wo, cost_result)
+        Args:
+            operators: Operators to match (rows)
+            candidates: Eligible WOs per operator (same order as operators)
+            positions: Start position per operator
 
-        return best_match
+        Returns:
+            {operator_index: work_order} for the operators that got an
+            eligible WO, or None if scipy is not available.
+        """
+        try:
+            from scipy.optimize import linear_sum_assignment
+        except ImportError:
+            return None
+        matrix, columns = self.cost_matrix(operators, candidates, positions)
+        if matrix.size == 0:
+            return {}
+        finite = np.isfinite(matrix)
+        if not finite.any():
+            return {}
+        # Ineligible pairs: cost above any feasible total, so the solver
+        # only uses them when an operator has nothing else left.
+        forbidden = float(matrix[finite].max() + 1.0) * (len(operators) + 1)
+        rows, cols = linear_sum_assignment(np.where(finite, matrix, forbidden))
+        return {int(i): columns[j] for i, j in zip(rows, cols) if finite[i, j]}
 
     def _calculate_distance(self, from_pos: Tuple[int, int],
                           to_pos: Tuple[int, int]) -> float:
@@ -270,6 +466,7 @@ class AssignmentCostCalculator:
         Calculate estimated travel distance between two grid positions
 
         Uses multiple strategies with fallbacks:
+        0. DistanceOracle lookup (PERF-1, O(1) when an endpoint is a source)
         1. RouteCalculator with pathfinding (most accurate)
         2. Manhattan distance (good for grid-based movement)
         3. Euclidean distance (fallback)
@@ -281,6 +478,13 @@ class AssignmentCostCalculator:
         Returns:
             Estimated distance as float (in grid cells)
         """
+        # Strategy 0 (PERF-1): oraculo precalculado. Cae a A* solo para pares
+        # de celdas arbitrarias; None (sin camino) sigue a las heuristicas.
+        if self.distance_oracle is not None:
+            distance = self.distance_oracle.distance(from_pos, to_pos)
+            if distance is not None:
+                return distance
+
         # Strategy 1: Use RouteCalculator with pathfinding if available
         if self.route_calculator and hasattr(self.route_calculator, 'pathfinder'):
             try:
@@ -404,6 +608,8 @@ class AssignmentCostCalculator:
 
     def __repr__(self):
         route_calc_status = "ACTIVE" if self.route_calculator else "DISABLED"
+        oracle_status = "ACTIVE" if self.distance_oracle is not None else "DISABLED"
         return (f"AssignmentCostCalculator("
                 f"agents={len(self.agent_config)}, "
-                f"route_calc={route_calc_status})")
+                f"route_calc={route_calc_status}, "
+                f"oracle={oracle_status})")
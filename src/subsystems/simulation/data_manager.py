@@ -17,6 +17,12 @@ import os
 import sqlite3
 from typing import List, Dict, Tuple, Optional, Any
 from .layout_manager import LayoutManager
+from .inventory_ledger import InventoryLedger
+from ..database.database_manager import apply_connection_pragmas
+
+# PERF-20: UPDATE ... FROM (join) existe desde SQLite 3.33; antes se usa una
+# subconsulta correlacionada sobre la PK de la tabla temporal.
+_SQLITE_UPDATE_FROM = sqlite3.sqlite_version_info >= (3, 33, 0)
 
 
 class DataManagerError(Exception):
@@ -83,6 +89,11 @@ class DataManager:
         # Excel/DB no los define; el motor no los usa hasta F1 (inbound off).
         self.inbound_dock_locations: Dict[int, Tuple[int, int]] = {}
         self.sku_catalog: Dict[str, Dict[str, Any]] = {}  # NEW: SKU catalog cache
+        # PERF-19: ledger de inventario en memoria (None = SQLite por llamada)
+        self.inventory_ledger: Optional[InventoryLedger] = None
+        # PERF-20: reservas/baseline en bloque (tabla temporal + UPDATE con
+        # join, pragmas de DatabaseManager). False = SQL historico.
+        self.bulk_inventory_sql = False
 
         # Load data from SQLite (preferred) or Excel (fallback)
         if os.path.exists(self.db_path):
@@ -930,6 +941,37 @@ class DataManager:
             print(f"[DATA-MANAGER] Error querying inventory by location: {e}")
             return {}
 
+    def enable_inventory_ledger(self, flush_every: int = 0) -> bool:
+        """
+        PERF-19: consume_stock/add_stock pasan a un InventoryLedger en memoria
+        con escritura diferida (flush_inventory al final, o cada `flush_every`
+        movimientos). Sin warehouse.db queda el camino historico.
+
+        Returns:
+            True si el ledger quedo activo.
+        """
+        if not os.path.exists(self.db_path):
+            return False
+        self.inventory_ledger = InventoryLedger(self.db_path, flush_every=flush_every)
+        print(f"[STOCK] Inventory ledger en memoria activo "
+              f"(flush_every={self.inventory_ledger.flush_every or 'fin de corrida'})")
+        return True
+
+    def flush_inventory(self) -> int:
+        """PERF-19: vuelca el ledger a inventory (0 si no hay ledger o nada pendiente)."""
+        if self.inventory_ledger is None:
+            return 0
+        try:
+            return self.inventory_ledger.flush()
+        except sqlite3.Error as e:
+            print(f"[STOCK][ERROR] flush_inventory failed: {e}")
+            return 0
+
+    def _sync_inventory_ledger(self):
+        """PERF-19: antes de SQL masivo sobre inventory, volcar y descartar el espejo."""
+        if self.inventory_ledger is not None:
+            self.inventory_ledger.invalidate()
+
     def commit_reservations(self, reservations: Dict[str, int]) -> bool:
         """
         Persist per-location reservations to inventory.qty_reserved (V12.1 - Init #1).
@@ -952,16 +994,20 @@ class DataManager:
             return False
 
         try:
-            conn = sqlite3.connect(self.db_path)
+            self._sync_inventory_ledger()
+            conn = self._inventory_connection()
             try:
                 conn.execute("BEGIN")
-                conn.execute("UPDATE inventory SET qty_reserved = 0")
-                for location_id, qty in reservations.items():
-                    if qty and qty > 0:
-                        conn.execute(
-                            "UPDATE inventory SET qty_reserved = ? WHERE location_id = ?",
-                            (int(qty), location_id)
-                        )
+                if self.bulk_inventory_sql:
+                    self._commit_reservations_bulk(conn, reservations)
+                else:
+                    conn.execute("UPDATE inventory SET qty_reserved = 0")
+                    for location_id, qty in reservations.items():
+                        if qty and qty > 0:
+                            conn.execute(
+                                "UPDATE inventory SET qty_reserved = ? WHERE location_id = ?",
+                                (int(qty), location_id)
+                            )
                 conn.commit()
             except sqlite3.Error:
                 conn.rollback()
@@ -977,6 +1023,46 @@ class DataManager:
             print(f"[DATA-MANAGER] Error committing reservations: {e}")
             return False
 
+    def _inventory_connection(self) -> sqlite3.Connection:
+        """Conexion para SQL masivo sobre inventory (PERF-20: con los pragmas
+        WAL/synchronous de DatabaseManager en modo bulk)."""
+        conn = sqlite3.connect(self.db_path)
+        if self.bulk_inventory_sql:
+            apply_connection_pragmas(conn)
+        return conn
+
+    @staticmethod
+    def _commit_reservations_bulk(conn: sqlite3.Connection,
+                                  reservations: Dict[str, int]) -> None:
+        """
+        PERF-20: mismas reservas que el bucle de UPDATEs por ubicacion, en
+        bloque: executemany a una tabla temporal y UN UPDATE con join. El
+        reset solo reescribe las filas que tenian reservas.
+        """
+        # Sin PK: las claves ya son unicas (dict) y el join busca en el indice
+        # de inventory recorriendo la temporal.
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS temp_reservations ("
+                     "location_id TEXT NOT NULL, qty INTEGER NOT NULL)")
+        conn.execute("DELETE FROM temp_reservations")
+        conn.executemany(
+            "INSERT INTO temp_reservations (location_id, qty) VALUES (?, ?)",
+            [(loc, int(qty)) for loc, qty in reservations.items() if qty and qty > 0])
+        conn.execute("UPDATE inventory SET qty_reserved = 0 WHERE qty_reserved <> 0")
+        if _SQLITE_UPDATE_FROM:
+            conn.execute("""
+                UPDATE inventory SET qty_reserved = r.qty
+                FROM temp_reservations AS r
+                WHERE r.location_id = inventory.location_id
+            """)
+        else:
+            conn.execute("""
+                UPDATE inventory SET qty_reserved = (
+                    SELECT r.qty FROM temp_reservations r
+                    WHERE r.location_id = inventory.location_id
+                )
+                WHERE location_id IN (SELECT location_id FROM temp_reservations)
+            """)
+
     def reset_reservations(self) -> bool:
         """
         Reset ALL qty_reserved to 0 (V12.1 - Init #1).
@@ -990,6 +1076,7 @@ class DataManager:
         if not os.path.exists(self.db_path):
             return False
         try:
+            self._sync_inventory_ledger()
             conn = sqlite3.connect(self.db_path)
             conn.execute("UPDATE inventory SET qty_reserved = 0")
             conn.commit()
@@ -1023,6 +1110,9 @@ class DataManager:
             return None
 
         try:
+            # PERF-19: ledger en memoria (sin conexion ni commit por pick)
+            if self.inventory_ledger is not None:
+                return self.inventory_ledger.consume(location_id, qty, sim_now)
             conn = sqlite3.connect(self.db_path)
             conn.row_factory = sqlite3.Row
             row = conn.execute(
@@ -1075,6 +1165,8 @@ class DataManager:
             return None
 
         try:
+            if self.inventory_ledger is not None:  # PERF-19
+                return self.inventory_ledger.add(location_id, qty, sim_now)
             conn = sqlite3.connect(self.db_path)
             conn.row_factory = sqlite3.Row
             row = conn.execute(
@@ -1119,7 +1211,8 @@ class DataManager:
         if not os.path.exists(self.db_path):
             return False
         try:
-            conn = sqlite3.connect(self.db_path)
+            self._sync_inventory_ledger()
+            conn = self._inventory_connection()
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS inventory_baseline (
                     location_id TEXT PRIMARY KEY,
@@ -1136,15 +1229,24 @@ class DataManager:
                 print("[STOCK] inventory_baseline created from current qty_available")
 
             # Restore qty_available from baseline; clear reservations
-            conn.execute("""
-                UPDATE inventory
-                SET qty_available = (
-                    SELECT b.qty_baseline FROM inventory_baseline b
+            if self.bulk_inventory_sql and _SQLITE_UPDATE_FROM:
+                # PERF-20: un join en vez de una subconsulta por fila
+                conn.execute("""
+                    UPDATE inventory
+                    SET qty_available = b.qty_baseline, qty_reserved = 0
+                    FROM inventory_baseline AS b
                     WHERE b.location_id = inventory.location_id
-                ),
-                qty_reserved = 0
-                WHERE location_id IN (SELECT location_id FROM inventory_baseline)
-            """)
+                """)
+            else:
+                conn.execute("""
+                    UPDATE inventory
+                    SET qty_available = (
+                        SELECT b.qty_baseline FROM inventory_baseline b
+                        WHERE b.location_id = inventory.location_id
+                    ),
+                    qty_reserved = 0
+                    WHERE location_id IN (SELECT location_id FROM inventory_baseline)
+                """)
             conn.commit()
             total = conn.execute("SELECT SUM(qty_available) FROM inventory").fetchone()[0]
             conn.close()
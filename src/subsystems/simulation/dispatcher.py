@@ -20,7 +20,11 @@ import logging
 
 logger = logging.getLogger(__name__)
 from typing import List, Dict, Optional, Any, Tuple
-import math
+
+import numpy as np
+
+from .pending_pool import PendingWorkOrderPool, clave_ola
+from .tour_optimizer import crear_tour_optimizer
 
 
 class DispatcherV11:
@@ -68,7 +72,7 @@ class DispatcherV11:
 
         # WorkOrder State Management
         self.lista_maestra_work_orders: List[Any] = []          # All WOs (source of truth)
-        self.work_orders_pendientes: List[Any] = []              # PENDING state
+        self.work_orders_pendientes = PendingWorkOrderPool()     # PENDING state (PERF-11)
         self.work_orders_asignados: Dict[str, List[Any]] = {}    # {operator_id: [WO1, WO2...]}
         self.work_orders_en_progreso: Dict[str, Any] = {}        # {operator_id: current_WO}
         self.work_orders_completados: List[Any] = []             # COMPLETED state
@@ -144,11 +148,59 @@ class DispatcherV11:
             if fv is not None:
                 self.wave_release_times[str(k)] = fv
 
+        # PERF-13: despertar de operarios ociosos. "poll" (default historico):
+        # el agente sin tour reintenta cada 0.5 s. "event": espera un evento
+        # SimPy que se dispara cuando el estado del despacho cambia (altas de
+        # WOs, pallet listo, liberacion de ola, fin de tour, WO fallida), con
+        # idle_wakeup_timeout (s) como red de seguridad (0 = sin timeout).
+        _perf = configuracion.get('performance') or {}
+        self.idle_wakeups = str(_perf.get('idle_wakeups', 'poll'))
+        if self.idle_wakeups not in ('poll', 'event'):
+            logger.warning(f"[DISPATCHER WARN] idle_wakeups desconocido "
+                           f"'{self.idle_wakeups}', usando poll")
+            self.idle_wakeups = 'poll'
+        self.idle_wakeup_timeout = float(_perf.get('idle_wakeup_timeout', 30.0) or 0.0)
+        self._evento_trabajo = None
+        self.total_despertares = 0
+
+        # PERF-15: asignacion por lote (Optimizacion Global). Con varios
+        # operarios ociosos, la PRIMERA WO de cada uno se elige con una
+        # asignacion lineal (Hungaro) sobre la matriz de costos en vez de N
+        # elecciones greedy. batch_window (s, default 0.5 = un ciclo de poll):
+        # el primer pedido abre una ventana, los ociosos que piden dentro de
+        # ella esperan y el lote se resuelve al cierre (los operarios casi
+        # nunca quedan ociosos en el MISMO env.now). 0 = solo los ociosos del
+        # mismo instante (sin espera).
+        self.batch_assignment = bool(_perf.get('batch_assignment', False))
+        _ventana = _perf.get('batch_window')
+        self.batch_window = max(0.0, float(0.5 if _ventana is None else _ventana))
+        self._lote_primeras: Dict[str, Any] = {}
+        self._lote_t: Optional[float] = None
+        self._lote_pedidos: Dict[str, Any] = {}   # ventana abierta: clave -> operario
+        self._lote_liberados: set = set()         # pasaron por un cierre sin reserva
+        self._lote_cierre: Optional[float] = None
+        self.total_lotes_asignacion = 0
+
+        # PERF-17: motor de ruta del tour por estrategia (route_engine).
+        # None = orden historico (pick_sequence / orden del dispatcher).
+        self.tour_optimizer = crear_tour_optimizer(configuracion, self.estrategia)
+
         logger.info(f"[DISPATCHER] Inicializado con estrategia: '{self.estrategia}'")
         logger.info(f"[DISPATCHER] Max WOs por tour: {self.max_wos_por_tour}, "
               f"Radio cercania: {self.radio_cercania} "
               f"(expansion paso={self.radio_expansion_paso}, max={self.radio_max_expansiones})")
 
+    @property
+    def work_orders_pendientes(self) -> PendingWorkOrderPool:
+        """PERF-11: WOs pendientes como pool indexado (interfaz de lista)."""
+        return self._pendientes
+
+    @work_orders_pendientes.setter
+    def work_orders_pendientes(self, work_orders) -> None:
+        # Asignar una lista (tests, reseteos) la indexa en el mismo orden.
+        self._pendientes = (work_orders if isinstance(work_orders, PendingWorkOrderPool)
+                            else PendingWorkOrderPool(work_orders))
+
     def agregar_work_orders(self, work_orders: List[Any]) -> None:
         """
         Add new WorkOrders to master list and pending queue
@@ -170,6 +222,8 @@ class DispatcherV11:
                 self.work_orders_pendientes.append(wo)
             wo.status = "released"
 
+        self.notificar_trabajo_disponible()
+
         # FASE 2 / AUDIT 2026-07-10: total de WorkOrders para la metadata.
         # Se REFRESCA en cada alta (antes se fijaba en la PRIMERA llamada:
         # con inbound activo, el putaway de la 2da llamada y los picks XD
@@ -181,6 +235,38 @@ class DispatcherV11:
         # print(f"[DISPATCHER] {self.env.now:.2f} - Agregados {len(work_orders)} WorkOrders. "
         #       f"Total pendientes: {len(self.work_orders_pendientes)}")
 
+    # ------------------------------------------------------------------
+    # PERF-13: despertar por evento de operarios ociosos
+    # ------------------------------------------------------------------
+    @property
+    def despertar_por_evento(self) -> bool:
+        return self.idle_wakeups == 'event'
+
+    def esperar_trabajo(self):
+        """
+        Evento SimPy compartido por los operarios ociosos: se dispara en la
+        proxima notificar_trabajo_disponible(). Se crea perezosamente (en modo
+        poll nadie lo pide y notificar es no-op).
+        """
+        if self._evento_trabajo is None:
+            self._evento_trabajo = self.env.event()
+        return self._evento_trabajo
+
+    def notificar_trabajo_disponible(self) -> None:
+        """Despierta a los ociosos en espera (si hay) y rearma el evento."""
+        evento = self._evento_trabajo
+        if evento is not None:
+            self._evento_trabajo = None
+            self.total_despertares += 1
+            evento.succeed()
+
+    def _despertar_en_olas(self):
+        """Proceso SimPy: notifica en cada release_time futuro de ola."""
+        for t in sorted(set(self.wave_release_times.values())):
+            if t > self.env.now:
+                yield self.env.timeout(t - self.env.now)
+                self.notificar_trabajo_disponible()
+
     def registrar_operador_disponible(self, operator: Any) -> None:
         """
         Register operator as available for work assignment
@@ -270,6 +356,9 @@ class DispatcherV11:
                 logger.debug(f"[DISPATCHER] No hay candidatos viables para {operator.type}_{operator.id}")
                 self._last_no_candidates_log[operator_key] = self.env.now
 
+            # PERF-15: esperando el cierre de la ventana de lote (sin putaway).
+            if self.batch_assignment and self._esperando_lote(operator):
+                return None
             # INIT-7 F2: sin candidatos de pick, intentar putaway.
             return self._asignar_putaway(operator)
 
@@ -407,6 +496,36 @@ class DispatcherV11:
             logger.warning(f"[DISPATCHER WARN] Estrategia desconocida '{self.estrategia}', usando Optimizacion Global")
             return self._estrategia_optimizacion_global(operator)
 
+    def _areas_compatibles(self, operator: Any) -> List[Any]:
+        """PERF-11: areas pendientes que el operario puede atender (una consulta
+        por AREA en vez de una por WO)."""
+        return [a for a in self.work_orders_pendientes.areas()
+                if operator.can_handle_work_area(a)]
+
+    def _olas_bloqueadas(self) -> set:
+        """PERF-11: claves de ola pendientes aun no liberadas (vacio si waves off)."""
+        if not self.waves_enabled:
+            return set()
+        return {k for k in self.work_orders_pendientes.olas()
+                if k is not None and k in self.wave_release_times
+                and self.env.now < self.wave_release_times[k]}
+
+    def _candidatos_compatibles(self, operator: Any, areas: Optional[List[Any]] = None) -> List[Any]:
+        """
+        WOs pendientes de areas compatibles con el operario y de olas ya
+        liberadas, en orden de llegada. PERF-11: consulta al pool indexado en
+        lugar de filtrar la lista completa (mismo resultado que
+        [wo for wo in pendientes if can_handle_work_area(wo.work_area)
+         and _wo_elegible_por_ola(wo)]).
+        """
+        if areas is None:
+            areas = self._areas_compatibles(operator)
+        candidatos = self.work_orders_pendientes.en_areas(areas)
+        bloqueadas = self._olas_bloqueadas()
+        if bloqueadas:
+            candidatos = [wo for wo in candidatos if clave_ola(wo) not in bloqueadas]
+        return candidatos
+
     def _estrategia_fifo(self, operator: Any) -> List[Any]:
         """
         FIFO Strategy - Take first N WorkOrders that fit operator capacity
@@ -418,9 +537,7 @@ class DispatcherV11:
             List[WorkOrder] - First N WOs that fit capacity
         """
         # Filter by work area compatibility + INIT-4 (C3) elegibilidad por ola
-        candidatos = [wo for wo in self.work_orders_pendientes
-                     if operator.can_handle_work_area(wo.work_area)
-                     and self._wo_elegible_por_ola(wo)]
+        candidatos = self._candidatos_compatibles(operator)
 
         # INIT-4 (C2): priorizar pedidos urgentes (opt-in; no-op si flag off)
         candidatos = self._aplicar_prioridad_pedido(candidatos)
@@ -447,9 +564,7 @@ class DispatcherV11:
         3. Para el resto del tour, seguir pick_sequence del Excel (solo del mismo área que la primera WO)
         """
         # Paso 1: Filtrar por compatibilidad de área + INIT-4 (C3) elegibilidad por ola
-        candidatos_compatibles = [wo for wo in self.work_orders_pendientes
-                                 if operator.can_handle_work_area(wo.work_area)
-                                 and self._wo_elegible_por_ola(wo)]
+        candidatos_compatibles = self._candidatos_compatibles(operator)
 
         if not candidatos_compatibles:
             # Debug log to understand why no WOs are compatible
@@ -466,7 +581,21 @@ class DispatcherV11:
 
         # Paso 3: Usar AssignmentCostCalculator para encontrar la MEJOR primera WO dentro del área prioritaria
         # print(f"[DISPATCHER DEBUG] [Optimizacion Global] Evaluando mejor primera WO (area prioritaria) entre {len(candidatos_area_prioridad)} candidatos")
-        best_first_wo = self._encontrar_mejor_primera_wo(operator, candidatos_area_prioridad)
+        best_first_wo = None
+        reservadas = set()
+        if self.batch_assignment:
+            if self.batch_window > 0 and self._diferir_al_lote(operator):
+                return []
+            best_first_wo = self._primera_wo_por_lote(operator, candidatos_area_prioridad)
+            # Las primeras WOs reservadas a OTROS operarios del lote no entran
+            # ni al greedy de respaldo ni al barrido (si no, el lote se deshace
+            # al primer tour).
+            reservadas = self._reservadas_por_otros(operator)
+            if best_first_wo is None and reservadas:
+                libres = [wo for wo in candidatos_area_prioridad if wo not in reservadas]
+                candidatos_area_prioridad = libres or candidatos_area_prioridad
+        if best_first_wo is None:
+            best_first_wo = self._encontrar_mejor_primera_wo(operator, candidatos_area_prioridad)
         if not best_first_wo:
             logger.debug(f"[DISPATCHER DEBUG] No se encontro mejor primera WO")
             return []
@@ -477,6 +606,8 @@ class DispatcherV11:
         # Preferir misma área, pero permitir cambio de área si se agota la secuencia
         # INIT-4 (C2 Opcion C): si hay urgentes, el barrido usa SOLO urgentes.
         pool_barrido = self._pool_para_barrido(candidatos_compatibles, best_first_wo)
+        if reservadas:
+            pool_barrido = [wo for wo in pool_barrido if wo not in reservadas]
         tour_wos = self._construir_tour_por_secuencia(operator, best_first_wo, pool_barrido)
         
         # Si es Tour Simple, filtrar por staging location
@@ -485,6 +616,129 @@ class DispatcherV11:
         
         return tour_wos
 
+    def _posicion_inicial(self, operator: Any) -> Any:
+        """Posicion desde la que se costea la primera WO (depot si None)."""
+        current_pos = operator.current_position
+        if current_pos is None:
+            staging_locs = self.data_manager.get_outbound_staging_locations()
+            current_pos = staging_locs.get(1, (3, 29))  # Staging 1 como depot default
+        return current_pos
+
+    def _costos_candidatos(self, operator: Any, candidatos: List[Any], current_pos: Any):
+        """
+        PERF-16: total_cost de cada candidata (np.ndarray alineado) con
+        AssignmentCostCalculator.calculate_cost_vector. Con logging DEBUG se
+        materializa ademas el CostResult (breakdown) de cada una.
+        """
+        calc = self.assignment_calculator
+        if logger.isEnabledFor(logging.DEBUG):
+            for wo in candidatos:
+                logger.debug(f"[DISPATCHER] costo {wo.id}: "
+                             f"{calc.calculate_cost(operator, wo, current_pos)}")
+        return calc.calculate_cost_vector(
+            operator, [wo.ubicacion for wo in candidatos],
+            [wo.work_area for wo in candidatos], current_position=current_pos)
+
+    def _primera_wo_por_lote(self, operator: Any, candidatos: List[Any]) -> Optional[Any]:
+        """
+        PERF-15: primera WO del operario segun la asignacion optima del lote
+        de operarios ociosos (Hungaro sobre la matriz de costos de
+        AssignmentCostCalculator). Con batch_window > 0 el lote ya se resolvio
+        al cierre de la ventana (_cerrar_lote) y aca solo se lee la reserva;
+        con 0 se resuelve UNA vez por env.now con los ociosos de ese instante.
+
+        None => usar el camino greedy (_encontrar_mejor_primera_wo): lote de
+        un solo operario, reserva ya consumida/invalida o sin scipy.
+        """
+        if self.batch_window <= 0 and self._lote_t != self.env.now:
+            self._resolver_lote(operator)
+        wo = self._lote_primeras.pop(f"{operator.type}_{operator.id}", None)
+        if wo is None or wo not in self.work_orders_pendientes or wo not in candidatos:
+            return None
+        return wo
+
+    def _resolver_lote(self, operator: Any) -> None:
+        """Resuelve la asignacion del lote de ociosos (incluye a `operator`)."""
+        self._lote_t = self.env.now
+        self._lote_primeras = {}
+        ociosos = [operator] + [
+            op for op in self.operadores_disponibles
+            if op is not operator and getattr(op, 'status', None) == 'idle'
+            and f"{op.type}_{op.id}" not in self.operadores_activos]
+        self._asignar_lote(ociosos)
+
+    def _diferir_al_lote(self, operator: Any) -> bool:
+        """
+        PERF-15 (batch_window > 0): True => el operario espera el cierre de la
+        ventana de lote (la abre si no hay una). False => ya paso por un
+        cierre: usa su reserva (_primera_wo_por_lote) o el greedy.
+        """
+        clave = f"{operator.type}_{operator.id}"
+        if clave in self._lote_primeras or clave in self._lote_liberados:
+            self._lote_liberados.discard(clave)
+            return False
+        self._lote_pedidos.setdefault(clave, operator)
+        if self._lote_cierre is None:
+            self._lote_cierre = self.env.now + self.batch_window
+            self.env.process(self._cerrar_lote())
+        return True
+
+    def _esperando_lote(self, operator: Any) -> bool:
+        """True si el operario esta en la ventana de lote abierta."""
+        return f"{operator.type}_{operator.id}" in self._lote_pedidos
+
+    def _cerrar_lote(self):
+        """Proceso SimPy: al cierre de la ventana resuelve el lote de pedidos."""
+        yield self.env.timeout(self.batch_window)
+        pedidos = self._lote_pedidos
+        self._lote_pedidos = {}
+        self._lote_cierre = None
+        self._lote_t = self.env.now
+        self._lote_liberados.update(pedidos)
+        self._asignar_lote([
+            op for clave, op in pedidos.items()
+            if getattr(op, 'status', None) == 'idle' and clave not in self.operadores_activos])
+        # Modo event: los que esperan el lote duermen en esperar_trabajo().
+        self.notificar_trabajo_disponible()
+
+    def _asignar_lote(self, ociosos: List[Any]) -> None:
+        """Hungaro sobre `ociosos`; deja la primera WO de cada uno en _lote_primeras."""
+        if len(ociosos) < 2:
+            return
+        claves = {f"{op.type}_{op.id}" for op in ociosos}
+        # Reservas vigentes de operarios fuera de este lote (ventanas previas).
+        tomadas = {wo for k, wo in self._lote_primeras.items() if k not in claves}
+
+        operadores, candidatos, posiciones = [], [], []
+        for op in ociosos:
+            area = self._filtrar_por_area_prioridad(op, self._candidatos_compatibles(op))
+            # Misma factibilidad que el greedy: la WO cabe sola en el operario.
+            elegibles = [wo for wo in area if wo.calcular_volumen_restante() <= op.capacity
+                         and wo not in tomadas]
+            if elegibles:
+                operadores.append(op)
+                candidatos.append(elegibles)
+                posiciones.append(self._posicion_inicial(op))
+        if len(operadores) < 2:
+            return
+
+        asignacion = self.assignment_calculator.optimal_assignment(
+            operadores, candidatos, posiciones)
+        if not asignacion:
+            return
+        self.total_lotes_asignacion += 1
+        for i, wo in asignacion.items():
+            self._lote_primeras[f"{operadores[i].type}_{operadores[i].id}"] = wo
+        logger.debug(f"[DISPATCHER] Lote de asignacion t={self.env.now:.2f}: "
+                     f"{len(self._lote_primeras)} operarios")
+
+    def _reservadas_por_otros(self, operator: Any) -> set:
+        """PERF-15: primeras WOs del lote vigente reservadas a otros operarios."""
+        if self.batch_window <= 0 and self._lote_t != self.env.now:
+            return set()
+        clave = f"{operator.type}_{operator.id}"
+        return {wo for k, wo in self._lote_primeras.items() if k != clave}
+
     def _estrategia_ejecucion_plan(self, operator: Any) -> List[Any]:
         """
         Ejecución de Plan (Filtro por Prioridad):
@@ -494,22 +748,31 @@ class DispatcherV11:
         - El resto del tour se construye igual que Optimización Global (doble barrido con todas las áreas)
         """
         # Paso 1: Filtrar por compatibilidad de área + INIT-4 (C3) elegibilidad por ola
-        candidatos_compatibles = [wo for wo in self.work_orders_pendientes
-                                 if operator.can_handle_work_area(wo.work_area)
-                                 and self._wo_elegible_por_ola(wo)]
+        areas = self._areas_compatibles(operator)
+        candidatos_compatibles = self._candidatos_compatibles(operator, areas)
 
         if not candidatos_compatibles:
             return []
         
-        # Paso 2: Filtrar solo WOs del área de trabajo con MAYOR prioridad
-        candidatos_area_prioridad = self._filtrar_por_area_prioridad(operator, candidatos_compatibles)
-        
-        if not candidatos_area_prioridad:
-            return []
-        
-        # Paso 3: Seleccionar la primera WO con el pick_sequence más pequeño (SIN AssignmentCostCalculator)
-        # print(f"[DISPATCHER DEBUG] Ejecucion de Plan: Buscando WO con menor pick_sequence entre {len(candidatos_area_prioridad)} candidatos")
-        primera_wo = min(candidatos_area_prioridad, key=lambda wo: wo.pick_sequence)
+        if not self.priority_dispatch_enabled and not self._olas_bloqueadas():
+            # PERF-11: sin filtros que recorten/reordenen el area (prioridad de
+            # pedido u olas bloqueadas), el area de MAYOR prioridad sale de las
+            # AREAS pendientes y su menor pick_sequence es la cabeza del indice
+            # ordenado del pool (mismo resultado que los pasos 2-3 de abajo).
+            prioridades = {a: operator.get_priority_for_work_area(a) for a in areas}
+            mejor = min(prioridades.values())
+            primera_wo = self.work_orders_pendientes.primera_por_pick_sequence(
+                [a for a in areas if prioridades[a] == mejor])
+        else:
+            # Paso 2: Filtrar solo WOs del área de trabajo con MAYOR prioridad
+            candidatos_area_prioridad = self._filtrar_por_area_prioridad(operator, candidatos_compatibles)
+            
+            if not candidatos_area_prioridad:
+                return []
+            
+            # Paso 3: Seleccionar la primera WO con el pick_sequence más pequeño (SIN AssignmentCostCalculator)
+            # print(f"[DISPATCHER DEBUG] Ejecucion de Plan: Buscando WO con menor pick_sequence entre {len(candidatos_area_prioridad)} candidatos")
+            primera_wo = min(candidatos_area_prioridad, key=lambda wo: wo.pick_sequence)
         
         # print(f"[DISPATCHER DEBUG] Ejecucion de Plan: Primera WO seleccionada: {primera_wo.id} con pick_sequence={primera_wo.pick_sequence}")
         
@@ -682,32 +945,26 @@ class DispatcherV11:
             return None
         
         # Calcular costos para todas las candidatas
-        costos = []
-        current_pos = operator.current_position
-        if current_pos is None:
-            # Usar posición del depot si el operador no tiene posición actual
-            staging_locs = self.data_manager.get_outbound_staging_locations()
-            current_pos = staging_locs.get(1, (3, 29))  # Staging 1 como depot default
+        current_pos = self._posicion_inicial(operator)
         
         # print(f"[DISPATCHER DEBUG] Calculando costos desde posicion: {current_pos}")
-        for wo in candidatos:
-            cost_result = self.assignment_calculator.calculate_cost(operator, wo, current_pos)
-            costos.append((wo, cost_result))
-        
-        # Ordenar por costo total (menor es mejor)
-        costos.sort(key=lambda x: x[1].total_cost)
+        # PERF-16: vector de costos (sin CostResult por WO); argsort estable ==
+        # el sort estable historico por total_cost.
+        costos = self._costos_candidatos(operator, candidatos, current_pos)
+        orden = np.argsort(costos, kind='stable')
         
         # Retornar la mejor WO que quepa en capacidad
-        for wo, cost_result in costos:
+        for i in orden:
+            wo = candidatos[i]
             wo_volume = wo.calcular_volumen_restante()
             if wo_volume <= operator.capacity:
                 logger.debug(f"[DISPATCHER] Mejor primera WO: {wo.id} "
-                      f"(costo: {cost_result.total_cost:.0f}, volumen: {wo_volume})")
+                      f"(costo: {costos[i]:.0f}, volumen: {wo_volume})")
                 return wo
         
         # Si ninguna WO cabe sola, retornar la mejor (será marcada como oversized)
-        if costos:
-            best_wo = costos[0][0]
+        if len(orden):
+            best_wo = candidatos[orden[0]]
             logger.warning(f"[DISPATCHER] WARNING: Mejor WO {best_wo.id} excede capacidad "
                   f"({best_wo.calcular_volumen_restante()} > {operator.capacity})")
             return best_wo
@@ -767,11 +1024,16 @@ class DispatcherV11:
         
         # ==================== PREPARAR ÁREAS ====================
         # Obtener áreas compatibles con el operador
-        areas_presentes = {}
+        # PERF-11: una pasada agrupa por area (antes: un barrido de candidatos
+        # por area) y la prioridad se consulta una vez por area, no por WO.
+        candidatos_por_area = {}
         for wo in candidatos:
-            pr = operator.get_priority_for_work_area(wo.work_area)
+            candidatos_por_area.setdefault(wo.work_area, []).append(wo)
+        areas_presentes = {}
+        for area in candidatos_por_area:
+            pr = operator.get_priority_for_work_area(area)
             if pr != 999:  # 999 = incompatible
-                areas_presentes[wo.work_area] = pr
+                areas_presentes[area] = pr
         
         # Ordenar áreas: primera área primero, luego resto por prioridad
         otras_areas = [a for a in areas_presentes.keys() if a != primera_wo.work_area]
@@ -801,8 +1063,8 @@ class DispatcherV11:
                 break
             
             # Obtener WOs disponibles del área actual
-            area_wos = [wo for wo in candidatos 
-                        if wo.work_area == area and wo not in usadas]
+            area_wos = [wo for wo in candidatos_por_area.get(area, ())
+                        if wo not in usadas]
             
             # RESTRICCIÓN DE STAGING para Tour Simple
             if self.tour_type == "Tour Simple (Un Destino)":
@@ -962,15 +1224,14 @@ class DispatcherV11:
 
         op_x, op_y = operator.current_position
 
+        # PERF-11: areas compatibles resueltas una vez por area.
+        # PERF-12: la consulta por radio usa el indice espacial del pool
+        # (buckets por area): solo mira WOs cercanas, misma distancia euclidea.
+        pendientes = self.work_orders_pendientes
+        areas = self._areas_compatibles(operator)
+
         def _filtrar_por_radio(radio: float) -> List[Any]:
-            resultado = []
-            for wo in self.work_orders_pendientes:
-                if not operator.can_handle_work_area(wo.work_area):
-                    continue
-                wo_x, wo_y = wo.ubicacion
-                if math.sqrt((wo_x - op_x)**2 + (wo_y - op_y)**2) <= radio:
-                    resultado.append(wo)
-            return resultado
+            return pendientes.en_radio(areas, (op_x, op_y), radio)
 
         # --- Intento 0: radio inicial ---
         candidatos = _filtrar_por_radio(self.radio_cercania)
@@ -992,8 +1253,7 @@ class DispatcherV11:
             # --- Fallback final: todas las WOs compatibles ---
             if not candidatos:
                 self.total_expansiones_radio += 1
-                candidatos = [wo for wo in self.work_orders_pendientes
-                              if operator.can_handle_work_area(wo.work_area)]
+                candidatos = pendientes.en_areas(areas)
                 if candidatos:
                     op_id = getattr(operator, 'operator_id', str(operator))
                     logger.info(f"[DISPATCHER] Radio expandido al MAXIMO para {op_id} "
@@ -1023,29 +1283,21 @@ class DispatcherV11:
             return []
 
         # Get operator's current position (or depot if none)
-        current_pos = operator.current_position
-        if current_pos is None:
-            # Use first outbound staging location as default
-            staging_locs = self.data_manager.get_outbound_staging_locations()
-            current_pos = staging_locs.get(1, (3, 29))  # Staging 1 como depot default
+        current_pos = self._posicion_inicial(operator)
 
-        # Calculate costs for all candidates
-        costos = []
-        for wo in candidatos:
-            cost_result = self.assignment_calculator.calculate_cost(
-                operator, wo, current_pos
-            )
-            costos.append((wo, cost_result))
+        # Calculate costs for all candidates (PERF-16: vector de costos)
+        costos = self._costos_candidatos(operator, candidatos, current_pos)
 
-        # Sort by total cost (lower is better)
-        costos.sort(key=lambda x: x[1].total_cost)
+        # Sort by total cost (lower is better); estable como el sort historico
+        orden = np.argsort(costos, kind='stable')
 
         # Select best WOs that fit capacity
         selected = []
         volume_acumulado = 0
         skipped_oversized = []  # Track WOs that are too big even alone
 
-        for wo, cost_result in costos:
+        for i in orden:
+            wo = candidatos[i]
             wo_volume = wo.calcular_volumen_restante()
 
             # Check if this WO would fit
@@ -1069,9 +1321,8 @@ class DispatcherV11:
                 wo.status = "staged"
                 wo.cantidad_restante = 0
                 self.work_orders_completados.append(wo)
-                # Remove from pending
-                if wo in self.work_orders_pendientes:
-                    self.work_orders_pendientes.remove(wo)
+                # Remove from pending (PERF-11: baja indexada)
+                self.work_orders_pendientes.discard(wo)
 
         return selected
 
@@ -1118,7 +1369,8 @@ class DispatcherV11:
                 start_position=start_pos,
                 work_orders=work_orders,
                 return_to_start=True,  # Return to staging area after picks
-                preserve_first=preserve_first
+                preserve_first=preserve_first,
+                optimizer=self.tour_optimizer
             )
 
             if route_result and route_result.get('success', False):
@@ -1167,9 +1419,8 @@ class DispatcherV11:
         operator_id = f"{operator.type}_{operator.id}"
 
         for wo in work_orders:
-            # Remove from pending
-            if wo in self.work_orders_pendientes:
-                self.work_orders_pendientes.remove(wo)
+            # Remove from pending (PERF-11: baja indexada, antes list.remove)
+            self.work_orders_pendientes.discard(wo)
 
             # Add to assigned
             if operator_id not in self.work_orders_asignados:
@@ -1438,6 +1689,7 @@ class DispatcherV11:
 
         wo.status = "failed"
         wo.tiempo_fin = self.env.now
+        self.notificar_trabajo_disponible()
 
         self.almacen.registrar_evento('work_order_update', {
             'id': wo.id,
@@ -1487,6 +1739,10 @@ class DispatcherV11:
         if operator not in self.operadores_disponibles:
             self.operadores_disponibles.append(operator)
 
+        # PERF-13: un fin de tour puede cerrar la simulacion (los ociosos en
+        # espera deben enterarse para salir).
+        self.notificar_trabajo_disponible()
+
     def obtener_estadisticas(self) -> Dict[str, Any]:
         """
         Return current dispatcher statistics
@@ -1599,9 +1855,18 @@ class DispatcherV11:
         ultimo_reporte = 0
         intervalo_reporte = 10.0  # Reportar cada 10 segundos simulados
 
+        # PERF-13: en modo event nadie depende de este tick (los operarios
+        # despiertan por evento); basta con el intervalo de reporte, y las
+        # olas futuras se notifican con su propio proceso.
+        paso = 0.1
+        if self.despertar_por_evento:
+            paso = intervalo_reporte
+            if self.waves_enabled and self.wave_release_times:
+                self.env.process(self._despertar_en_olas())
+
         while True:
             # Yield pequeno para permitir que otros procesos se ejecuten
-            yield self.env.timeout(0.1)
+            yield self.env.timeout(paso)
 
             # Verificar si termino la simulacion
             if self.simulacion_ha_terminado():
@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+"""
+DistanceOracle - PERF-1: distancias precalculadas por layout
+Digital Twin Warehouse Simulator
+
+Oraculo de distancias "todos contra fuentes": UNA pasada de Dijkstra por cada
+celda fuente (puntos de picking, celdas de staging, muelles inbound) sobre la
+collision_matrix, guardada en un array compacto float32 de forma
+(n_fuentes, alto*ancho). Una consulta fuente<->celda es O(1) (indexar el array);
+solo los pares de celdas arbitrarias (ninguna es fuente) caen a A*.
+
+Metrica: la MISMA que minimiza el Pathfinder (8 direcciones, recto=1,
+diagonal=sqrt(2), solo se entra a celdas caminables), es decir el coste
+octile del camino optimo == RouteCalculator.calculate_path_distance(path).
+Una fuente no caminable (p.ej. una celda de staging) se expande igual hacia
+sus vecinos caminables (mismo criterio que el snap F2.d de RouteCalculator).
+
+Opt-in via config['performance']['distance_oracle'] (default false): sin la
+clave nadie lo construye y el motor queda byte-identico.
+
+Ley #4: ASCII puro en prints/logs.
+"""
+
+import heapq
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+Cell = Tuple[int, int]
+
+# Mismo orden que Pathfinder.get_neighbors (cardinales y luego diagonales).
+_OFFSETS = (
+    (0, -1, 1.0), (1, 0, 1.0), (0, 1, 1.0), (-1, 0, 1.0),
+    (1, -1, math.sqrt(2)), (1, 1, math.sqrt(2)),
+    (-1, 1, math.sqrt(2)), (-1, -1, math.sqrt(2)),
+)
+
+
+def _unique_in_bounds(sources: Iterable[Cell], width: int, height: int) -> List[Cell]:
+    """Fuentes sin duplicados y dentro de la grilla, en orden de aparicion."""
+    seen = set()
+    out: List[Cell] = []
+    for cell in sources:
+        cell = (int(cell[0]), int(cell[1]))
+        if cell in seen or not (0 <= cell[0] < width and 0 <= cell[1] < height):
+            continue
+        seen.add(cell)
+        out.append(cell)
+    return out
+
+
+class DistanceOracle:
+    """
+    `dist[row, y*width + x]` = coste minimo desde la fuente `row` hasta (x, y)
+    (np.inf si inalcanzable). `index: {celda_fuente: row}`.
+
+    El grafo es simetrico entre celdas caminables (mismo coste ida y vuelta),
+    por eso d(a, b) se resuelve con la fila de a O con la fila de b.
+    """
+
+    def __init__(self, collision_matrix: List[List[bool]], sources: Iterable[Cell],
+                 pathfinder=None, dist: Optional[np.ndarray] = None):
+        if not collision_matrix or not collision_matrix[0]:
+            raise ValueError("[DISTANCE-ORACLE ERROR] collision_matrix cannot be empty")
+
+        self.collision_matrix = collision_matrix
+        self.height = len(collision_matrix)
+        self.width = len(collision_matrix[0])
+        self.pathfinder = pathfinder
+
+        self.index: Dict[Cell, int] = {
+            cell: row for row, cell in
+            enumerate(_unique_in_bounds(sources, self.width, self.height))}
+
+        # Metricas (se exportan junto a las del motor si se piden).
+        self.lookups = 0
+        self.fallbacks = 0
+
+        # PERF-2: matriz precalculada (p.ej. memory-mapped desde LayoutCache).
+        n_cells = self.width * self.height
+        if dist is not None and tuple(dist.shape) == (len(self.index), n_cells):
+            self.dist = dist
+        else:
+            self.dist = self._build()
+
+        print(f"[DISTANCE-ORACLE] {len(self.index)} fuentes sobre grid "
+              f"{self.width}x{self.height} ({self.dist.nbytes // 1024} KB)")
+
+    # ------------------------------------------------------------------
+    # Construccion
+    # ------------------------------------------------------------------
+    def _walkable(self, x: int, y: int) -> bool:
+        return 0 <= x < self.width and 0 <= y < self.height \
+            and bool(self.collision_matrix[y][x])
+
+    def _build(self) -> np.ndarray:
+        n_cells = self.width * self.height
+        dist = np.full((len(self.index), n_cells), np.inf, dtype=np.float32)
+        if not self.index:
+            return dist
+        sources = sorted(self.index.items(), key=lambda kv: kv[1])
+        try:
+            from scipy.sparse.csgraph import dijkstra
+        except ImportError:
+            dijkstra = None
+
+        if dijkstra is not None:
+            graph = self._csr_graph()
+            ids = [cell[1] * self.width + cell[0] for cell, _row in sources]
+            dist[:, :] = dijkstra(graph, directed=True, indices=ids)
+        else:
+            for cell, row in sources:
+                dist[row, :] = self._dijkstra_py(cell)
+        return dist
+
+    def _csr_graph(self):
+        """Grafo dirigido u->v (v caminable) en formato CSR para scipy."""
+        from scipy.sparse import csr_matrix
+        w = self.width
+        rows, cols, costs = [], [], []
+        for y in range(self.height):
+            for x in range(w):
+                u = y * w + x
+                for dx, dy, cost in _OFFSETS:
+                    nx, ny = x + dx, y + dy
+                    if self._walkable(nx, ny):
+                        rows.append(u)
+                        cols.append(ny * w + nx)
+                        costs.append(cost)
+        n_cells = w * self.height
+        return csr_matrix((costs, (rows, cols)), shape=(n_cells, n_cells))
+
+    def _dijkstra_py(self, source: Cell) -> np.ndarray:
+        """Fallback sin scipy: Dijkstra con heap sobre la grilla."""
+        w = self.width
+        out = np.full(w * self.height, np.inf, dtype=np.float64)
+        sid = source[1] * w + source[0]
+        out[sid] = 0.0
+        heap = [(0.0, source)]
+        while heap:
+            d, (x, y) = heapq.heappop(heap)
+            if d > out[y * w + x]:
+                continue
+            for dx, dy, cost in _OFFSETS:
+                nx, ny = x + dx, y + dy
+                if not self._walkable(nx, ny):
+                    continue
+                nd = d + cost
+                nid = ny * w + nx
+                if nd < out[nid]:
+                    out[nid] = nd
+                    heapq.heappush(heap, (nd, (nx, ny)))
+        return out
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+    def has(self, cell: Cell) -> bool:
+        """True si `cell` es fuente (consulta O(1) garantizada)."""
+        return tuple(cell) in self.index
+
+    def row(self, cell: Cell) -> Optional[np.ndarray]:
+        """Fila completa de distancias desde la fuente `cell` (None si no es fuente)."""
+        r = self.index.get(tuple(cell))
+        return None if r is None else self.dist[r]
+
+    def lookup(self, a: Cell, b: Cell) -> Optional[float]:
+        """
+        Distancia O(1) si a o b es fuente; None si ninguno lo es o si el par
+        es inalcanzable. NO cae a A* (ver `distance`).
+        """
+        a = (int(a[0]), int(a[1]))
+        b = (int(b[0]), int(b[1]))
+        if a == b:
+            return 0.0
+        r = self.index.get(a)
+        if r is not None:
+            if not (0 <= b[0] < self.width and 0 <= b[1] < self.height):
+                return None
+            d = self.dist[r, b[1] * self.width + b[0]]
+        else:
+            r = self.index.get(b)
+            # Simetria solo entre caminables (a no caminable no tiene salida en A*).
+            if r is None or not self._walkable(a[0], a[1]) \
+                    or not self._walkable(b[0], b[1]):
+                return None
+            d = self.dist[r, a[1] * self.width + a[0]]
+        if not np.isfinite(d):
+            return None
+        self.lookups += 1
+        return float(d)
+
+    def distance(self, a: Cell, b: Cell) -> Optional[float]:
+        """
+        Distancia de camino a -> b: lookup O(1) si hay fuente en el par; si no,
+        A* del pathfinder (coste octile del camino). None si no hay camino.
+        """
+        d = self.lookup(a, b)
+        if d is not None or self.has(a) or self.has(b):
+            return d
+        if self.pathfinder is None:
+            return None
+        self.fallbacks += 1
+        # PERF-4: motores con consulta de coste dedicada (JPS) no materializan
+        # el camino celda por celda.
+        path_cost = getattr(self.pathfinder, 'path_cost', None)
+        if path_cost is not None:
+            return path_cost(tuple(a), tuple(b))
+        path = self.pathfinder.find_path(tuple(a), tuple(b))
+        if not path:
+            return None
+        total = 0.0
+        for (x1, y1), (x2, y2) in zip(path, path[1:]):
+            total += math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
+        return total
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'sources': len(self.index),
+            'lookups': self.lookups,
+            'fallbacks': self.fallbacks,
+        }
+
+    def __repr__(self):
+        return (f"DistanceOracle(sources={len(self.index)}, "
+                f"grid={self.width}x{self.height})")
+
+
+def build_distance_oracle(layout_manager, data_manager=None,
+                          pathfinder=None, layout_cache=None) -> DistanceOracle:
+    """
+    PERF-1: arma el oraculo con las fuentes del layout: puntos de picking
+    (DataManager, misma fuente que WorkOrder.ubicacion, o LayoutManager si no
+    hay DataManager), todas las celdas de staging outbound y los muelles inbound.
+    PERF-2: con layout_cache la matriz se reusa (mmap) si las fuentes y la
+    grilla (collision_matrix final, tras F2.d) coinciden.
+    """
+    sources: List[Cell] = []
+    if data_manager is not None:
+        for p in data_manager.get_picking_points():
+            sources.append(tuple(p['ubicacion_grilla']))
+        for cells in getattr(data_manager, 'outbound_staging_zone_cells', {}).values():
+            sources.extend(tuple(c) for c in cells)
+        sources.extend(tuple(c) for c in
+                       getattr(data_manager, 'outbound_staging_locations', {}).values())
+        sources.extend(tuple(c) for c in
+                       getattr(data_manager, 'inbound_dock_locations', {}).values())
+    else:
+        for p in getattr(layout_manager, 'picking_points', []) or []:
+            sources.append(tuple(p['grid_position']))
+    if layout_cache is None:
+        return DistanceOracle(layout_manager.collision_matrix, sources,
+                              pathfinder=pathfinder)
+
+    # Mismo filtro/orden que DistanceOracle.__init__ para comparar contra disco.
+    matrix = layout_manager.collision_matrix
+    ordered = _unique_in_bounds(sources, len(matrix[0]), len(matrix))
+    dist = layout_cache.load_oracle_dist(ordered, matrix)
+    oracle = DistanceOracle(layout_manager.collision_matrix, ordered,
+                            pathfinder=pathfinder, dist=dist)
+    if dist is None:
+        try:
+            layout_cache.save_oracle(ordered, matrix, oracle.dist)
+        except OSError as e:
+            print(f"[DISTANCE-ORACLE WARNING] No se pudo escribir cache: {e}")
+    return oracle
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+InventoryLedger - PERF-19: inventario en memoria con escritura diferida
+Digital Twin Warehouse Simulator
+
+DataManager.consume_stock / add_stock abrian una conexion SQLite, SELECT,
+UPDATE y commit (un fsync) POR CADA pick y putaway. Este ledger carga la
+tabla `inventory` UNA vez (perezoso: en el primer movimiento, despues de que
+la asignacion persistio qty_reserved con commit_reservations), aplica cada
+movimiento en O(1) sobre un dict y vuelca las filas tocadas con UN
+executemany en una sola transaccion: al final de la corrida (flush) o cada
+`flush_every` movimientos (checkpoint).
+
+Misma aritmetica y mismos avisos que el camino por llamada (tope en 0,
+reservado liberado en el pick, last_updated = sim_now del ultimo movimiento),
+asi la tabla `inventory` termina igual.
+
+Opt-in via config['performance']['inventory_ledger'] (default false: SQLite
+por llamada, historico).
+
+Ley #4: ASCII puro en prints/logs.
+"""
+
+import sqlite3
+from typing import Dict, List, Optional, Tuple
+
+
+class InventoryLedger:
+    """Espejo en memoria de inventory (location_id -> [avail, reserved, t])."""
+
+    def __init__(self, db_path: str, flush_every: int = 0):
+        self.db_path = db_path
+        self.flush_every = max(0, int(flush_every or 0))
+        self._rows: Optional[Dict[str, List]] = None
+        self._dirty: set = set()
+        self._pendientes = 0
+        # Metricas
+        self.movimientos = 0
+        self.flushes = 0
+        self.filas_escritas = 0
+
+    # ------------------------------------------------------------------
+    def load(self) -> int:
+        """Lee inventory completo (un SELECT). Devuelve filas cargadas."""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            self._rows = {
+                loc: [avail or 0, reserved or 0, None]
+                for loc, avail, reserved in conn.execute(
+                    "SELECT location_id, qty_available, qty_reserved FROM inventory")
+            }
+        finally:
+            conn.close()
+        self._dirty.clear()
+        self._pendientes = 0
+        return len(self._rows)
+
+    def _fila(self, location_id: str) -> Optional[List]:
+        if self._rows is None:
+            self.load()
+        return self._rows.get(location_id)
+
+    def get(self, location_id: str) -> Optional[Tuple[int, int]]:
+        """(qty_available, qty_reserved) actuales o None."""
+        row = self._fila(location_id)
+        return None if row is None else (row[0], row[1])
+
+    # ------------------------------------------------------------------
+    def consume(self, location_id: str, qty: int,
+                sim_now: Optional[float] = None) -> Optional[Tuple[int, int]]:
+        """Ver DataManager.consume_stock (misma semantica)."""
+        row = self._fila(location_id)
+        if row is None:
+            print(f"[STOCK][WARN] location '{location_id}' not in inventory - skip consume")
+            return None
+        avail, reserved = row[0], row[1]
+        if qty > avail:
+            print(f"[STOCK][WARN] pick {qty} > available {avail} at {location_id} "
+                  f"-> capping qty_available to 0")
+        row[0] = max(0, avail - qty)
+        row[1] = max(0, reserved - qty)
+        row[2] = sim_now
+        self._tocar(location_id)
+        return (row[0], row[1])
+
+    def add(self, location_id: str, qty: int,
+            sim_now: Optional[float] = None) -> Optional[Tuple[int, int]]:
+        """Ver DataManager.add_stock (misma semantica)."""
+        row = self._fila(location_id)
+        if row is None:
+            print(f"[STOCK][WARN] location '{location_id}' not in inventory - skip add")
+            return None
+        row[0] += qty
+        row[2] = sim_now
+        self._tocar(location_id)
+        return (row[0], row[1])
+
+    def _tocar(self, location_id: str) -> None:
+        self._dirty.add(location_id)
+        self.movimientos += 1
+        self._pendientes += 1
+        if self.flush_every and self._pendientes >= self.flush_every:
+            self.flush()
+
+    # ------------------------------------------------------------------
+    @property
+    def dirty(self) -> bool:
+        return bool(self._dirty)
+
+    def flush(self) -> int:
+        """Vuelca las filas tocadas en UNA transaccion. Devuelve filas escritas."""
+        if not self._dirty:
+            return 0
+        filas = [(self._rows[loc][0], self._rows[loc][1], self._rows[loc][2], loc)
+                 for loc in sorted(self._dirty)]
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                conn.executemany(
+                    "UPDATE inventory SET qty_available = ?, qty_reserved = ?, "
+                    "last_updated = ? WHERE location_id = ?", filas)
+        finally:
+            conn.close()
+        self._dirty.clear()
+        self._pendientes = 0
+        self.flushes += 1
+        self.filas_escritas += len(filas)
+        return len(filas)
+
+    def invalidate(self) -> None:
+        """Vuelca lo pendiente y descarta el espejo (otro SQL va a tocar
+        inventory; el proximo movimiento recarga)."""
+        if self._rows is not None:
+            self.flush()
+        self._rows = None
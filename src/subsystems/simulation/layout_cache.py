@@ -0,0 +1,337 @@
+# -*- coding: utf-8 -*-
+"""
+LayoutCache - PERF-2: cache persistente en disco por layout
+Digital Twin Warehouse Simulator
+
+Las replicas de experiment_runner y los trials de Optuna corren el MISMO
+layout cientos de veces: cada corrida reconstruia la collision_matrix, el
+indice de picking, el oraculo de distancias (PERF-1) y los mismos caminos A*.
+Este modulo los guarda junto al layout y la corrida N+1 arranca en caliente.
+
+Clave: sha256 del TMX + tilesets externos (.tsx, donde viven las propiedades
+`walkable`) + WALKABILITY_RULES + CACHE_VERSION. Cambiar el mapa, el tileset
+o las reglas de caminabilidad invalida la cache sola (otro directorio).
+Caminos y oraculo dependen ademas de la grilla FINAL (AlmacenMejorado F2.d
+bloquea el staging con outbound activo): sus archivos llevan `grid_digest`
+de la collision_matrix con la que se calcularon, asi una corrida con outbound
+on nunca reusa caminos de una con outbound off (ni al reves).
+
+Layout en disco (directorio `<dir_del_tmx>/.layout_cache/<stem>_<key16>/`):
+    meta.json        dims, picking points, clave completa
+    collision.npy    uint8 [alto, ancho]
+    oracle_<h16>.npy float32 [n, alto*ancho] (se abre con mmap_mode='r');
+                     h16 = sha256 de las n fuentes (int32 [n, 2], orden de
+                     fila) + grid_digest
+    paths_<g16>.npz  keys int32 [m, 4] (sx, sy, gx, gy), offs int64 [m+1]
+                     (offsets en cells), cells int32 [k] ids y*ancho+x;
+                     g16 = grid_digest
+
+Escrituras atomicas (archivo temporal + os.replace) y UN archivo por dato:
+los tres arrays de caminos viajan juntos en un .npz y la matriz del
+oraculo lleva sus fuentes en el nombre, asi dos corridas paralelas sobre el
+mismo layout (optimizer con n_jobs>1) nunca mezclan archivos de escritores
+distintos. Ademas `SegmentPathStore.get` descarta un camino cacheado que no
+empiece en `start` y termine en `goal`.
+
+Opt-in via config['performance']['layout_cache'] (default false).
+
+Ley #4: ASCII puro en prints/logs.
+"""
+
+import hashlib
+import json
+import os
+import re
+import zipfile
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+Cell = Tuple[int, int]
+
+# Subir si cambia la semantica de lo cacheado (formato o algoritmo).
+CACHE_VERSION = 3
+# Resumen de las reglas con que LayoutManager/Pathfinder interpretan el mapa.
+WALKABILITY_RULES = ("walkable-prop:any-visible-layer-false-blocks;"
+                     "picking:type=picking_location;moves:8dir;cost:octile")
+
+_TILESET_SRC = re.compile(rb'<tileset[^>]*\ssource="([^"]+)"')
+
+
+def compute_layout_key(tmx_path: str) -> str:
+    """sha256 hex del TMX + tilesets externos + reglas + version."""
+    h = hashlib.sha256()
+    with open(tmx_path, 'rb') as f:
+        data = f.read()
+    h.update(data)
+    base_dir = os.path.dirname(os.path.abspath(tmx_path))
+    for src in _TILESET_SRC.findall(data):
+        tsx = os.path.join(base_dir, src.decode('utf-8', 'replace'))
+        h.update(b'\0tileset\0' + src)
+        if os.path.exists(tsx):
+            with open(tsx, 'rb') as f:
+                h.update(f.read())
+    h.update(b'\0rules\0' + WALKABILITY_RULES.encode('ascii'))
+    h.update(b'\0version\0' + str(CACHE_VERSION).encode('ascii'))
+    return h.hexdigest()
+
+
+def grid_digest(collision_matrix: List[List[bool]]) -> str:
+    """sha256 hex (16) de la grilla caminable tal como la ve el pathfinder."""
+    arr = np.ascontiguousarray(np.asarray(collision_matrix, dtype=np.uint8))
+    return hashlib.sha256(str(arr.shape).encode('ascii') + arr.tobytes()).hexdigest()[:16]
+
+
+class SegmentPathStore:
+    """
+    Caminos A* (start, goal) -> path persistidos entre corridas.
+
+    Los caminos cargados de disco se decodifican bajo demanda desde los
+    arrays compactos; los nuevos de esta corrida viven en `_new` hasta save.
+    `get` devuelve SIEMPRE una lista nueva (los llamadores pueden mutarla).
+    """
+
+    def __init__(self, width: int):
+        self.width = int(width)
+        self._index: Dict[Tuple[int, int, int, int], Tuple[int, int]] = {}
+        self._cells: Optional[np.ndarray] = None
+        self._new: Dict[Tuple[int, int, int, int], List[Cell]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0  # caminos de disco con extremos incoherentes
+
+    def __len__(self):
+        return len(self._index) + len(self._new)
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self._new)
+
+    def get(self, start: Cell, goal: Cell) -> Optional[List[Cell]]:
+        key = (start[0], start[1], goal[0], goal[1])
+        path = self._new.get(key)
+        if path is not None:
+            self.hits += 1
+            return list(path)
+        span = self._index.get(key)
+        if span is None:
+            self.misses += 1
+            return None
+        w = self.width
+        ids = self._cells[span[0]:span[1]]
+        if len(ids) == 0 or int(ids[0]) != start[1] * w + start[0] \
+                or int(ids[-1]) != goal[1] * w + goal[0]:
+            # Archivo corrupto/ajeno: se ignora el camino (se recalcula con A*).
+            del self._index[key]
+            self.rejected += 1
+            self.misses += 1
+            return None
+        self.hits += 1
+        return [(int(c) % w, int(c) // w) for c in ids]
+
+    def put(self, start: Cell, goal: Cell, path: List[Cell]) -> None:
+        key = (start[0], start[1], goal[0], goal[1])
+        if key not in self._index:
+            self._new[key] = [tuple(p) for p in path]
+
+    def load_arrays(self, keys: np.ndarray, offs: np.ndarray, cells: np.ndarray) -> None:
+        self._cells = cells
+        for i, k in enumerate(keys.tolist()):
+            self._index[tuple(k)] = (int(offs[i]), int(offs[i + 1]))
+
+    def to_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Union de lo cargado + lo nuevo, en formato compacto."""
+        keys: List[Tuple[int, int, int, int]] = []
+        offs = [0]
+        chunks: List[np.ndarray] = []
+        for key, (a, b) in self._index.items():
+            keys.append(key)
+            chunks.append(np.asarray(self._cells[a:b], dtype=np.int32))
+            offs.append(offs[-1] + (b - a))
+        w = self.width
+        for key, path in self._new.items():
+            keys.append(key)
+            chunks.append(np.fromiter((y * w + x for (x, y) in path),
+                                      dtype=np.int32, count=len(path)))
+            offs.append(offs[-1] + len(path))
+        cells = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.int32)
+        return (np.asarray(keys, dtype=np.int32).reshape(-1, 4),
+                np.asarray(offs, dtype=np.int64), cells)
+
+
+class LayoutCache:
+    """Acceso a la cache de UN layout (ver docstring del modulo)."""
+
+    def __init__(self, tmx_path: str, cache_root: Optional[str] = None):
+        self.tmx_path = os.path.abspath(tmx_path)
+        self.key = compute_layout_key(self.tmx_path)
+        root = cache_root or os.path.join(os.path.dirname(self.tmx_path), '.layout_cache')
+        stem = os.path.splitext(os.path.basename(self.tmx_path))[0]
+        self.dir = os.path.join(root, f"{stem}_{self.key[:16]}")
+        self.path_store: Optional[SegmentPathStore] = None
+        self._paths_name: Optional[str] = None
+
+    # ------------------------------------------------------------------
+    # IO basico
+    # ------------------------------------------------------------------
+    def _file(self, name: str) -> str:
+        return os.path.join(self.dir, name)
+
+    def _save_npy(self, name: str, arr: np.ndarray) -> None:
+        os.makedirs(self.dir, exist_ok=True)
+        tmp = self._file(f".{name}.{os.getpid()}.tmp")
+        with open(tmp, 'wb') as f:
+            np.save(f, arr)
+        os.replace(tmp, self._file(name))
+
+    def _save_npz(self, name: str, **arrays: np.ndarray) -> None:
+        os.makedirs(self.dir, exist_ok=True)
+        tmp = self._file(f".{name}.{os.getpid()}.tmp")
+        with open(tmp, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp, self._file(name))
+
+    def _load_npz(self, name: str, fields: Tuple[str, ...]) -> Optional[Dict[str, np.ndarray]]:
+        path = self._file(name)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as npz:
+                return {k: npz[k] for k in fields}
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile) as e:
+            print(f"[LAYOUT-CACHE WARNING] {name} ilegible, se ignora: {e}")
+            return None
+
+    def _load_npy(self, name: str, mmap: bool = False) -> Optional[np.ndarray]:
+        path = self._file(name)
+        if not os.path.exists(path):
+            return None
+        try:
+            return np.load(path, mmap_mode='r' if mmap else None)
+        except (OSError, ValueError) as e:
+            print(f"[LAYOUT-CACHE WARNING] {name} ilegible, se ignora: {e}")
+            return None
+
+    def _read_meta(self) -> Optional[Dict[str, Any]]:
+        path = self._file('meta.json')
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return meta if meta.get('key') == self.key else None
+
+    def _ensure_meta(self) -> None:
+        """Meta minima (clave) para oraculo/caminos sin layout guardado."""
+        if self._read_meta() is None:
+            self._write_meta({'key': self.key, 'version': CACHE_VERSION,
+                              'tmx': os.path.basename(self.tmx_path)})
+
+    def _write_meta(self, meta: Dict[str, Any]) -> None:
+        os.makedirs(self.dir, exist_ok=True)
+        tmp = self._file(f".meta.json.{os.getpid()}.tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp, self._file('meta.json'))
+
+    # ------------------------------------------------------------------
+    # Collision matrix + picking points (LayoutManager)
+    # ------------------------------------------------------------------
+    def load_layout(self) -> Optional[Dict[str, Any]]:
+        """{'collision_matrix', 'picking_points'} o None si no hay cache valida."""
+        meta = self._read_meta()
+        if meta is None or 'picking_points' not in meta:
+            return None
+        coll = self._load_npy('collision.npy')
+        if coll is None:
+            return None
+        matrix = [[bool(v) for v in row] for row in coll.tolist()]
+        points = []
+        for p in meta.get('picking_points', []):
+            points.append({
+                'grid_position': tuple(p['grid_position']),
+                'pixel_position': tuple(p['pixel_position']),
+                'type': p['type'],
+                'name': p['name'],
+            })
+        return {'collision_matrix': matrix, 'picking_points': points}
+
+    def save_layout(self, collision_matrix: List[List[bool]],
+                    picking_points: List[Dict[str, Any]]) -> None:
+        self._save_npy('collision.npy', np.asarray(collision_matrix, dtype=np.uint8))
+        self._write_meta({
+            'key': self.key,
+            'version': CACHE_VERSION,
+            'tmx': os.path.basename(self.tmx_path),
+            'width': len(collision_matrix[0]) if collision_matrix else 0,
+            'height': len(collision_matrix),
+            'picking_points': [{
+                'grid_position': list(p['grid_position']),
+                'pixel_position': list(p['pixel_position']),
+                'type': p['type'],
+                'name': p['name'],
+            } for p in picking_points],
+        })
+
+    # ------------------------------------------------------------------
+    # Oraculo de distancias (PERF-1)
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _oracle_name(sources: List[Cell], collision_matrix: List[List[bool]]) -> str:
+        """Archivo de la matriz: fuentes + grilla van en el nombre (no hay par src/dist)."""
+        src = np.ascontiguousarray(np.asarray(sources, dtype=np.int32).reshape(-1, 2))
+        h = hashlib.sha256(str(src.shape).encode('ascii') + src.tobytes())
+        h.update(b'\0grid\0' + grid_digest(collision_matrix).encode('ascii'))
+        return f"oracle_{h.hexdigest()[:16]}.npy"
+
+    def load_oracle_dist(self, sources: List[Cell],
+                         collision_matrix: List[List[bool]]) -> Optional[np.ndarray]:
+        """Matriz memory-mapped si fue calculada para EXACTAMENTE estas fuentes y grilla."""
+        if self._read_meta() is None:
+            return None
+        dist = self._load_npy(self._oracle_name(sources, collision_matrix), mmap=True)
+        if dist is None or dist.ndim != 2 or dist.shape[0] != len(sources):
+            return None
+        return dist
+
+    def save_oracle(self, sources: List[Cell], collision_matrix: List[List[bool]],
+                    dist: np.ndarray) -> None:
+        self._save_npy(self._oracle_name(sources, collision_matrix),
+                       np.asarray(dist, dtype=np.float32))
+        self._ensure_meta()
+
+    # ------------------------------------------------------------------
+    # Caminos de tramo
+    # ------------------------------------------------------------------
+    def load_paths(self, width: int, collision_matrix: List[List[bool]]) -> SegmentPathStore:
+        """
+        Store con los caminos persistidos para ESTA grilla (vacio si no hay).
+        `collision_matrix` debe ser la final (despues de F2.d): save_paths
+        escribe en el archivo de la misma grilla.
+        """
+        store = SegmentPathStore(width)
+        self._paths_name = f"paths_{grid_digest(collision_matrix)}.npz"
+        if self._read_meta() is not None:
+            arrays = self._load_npz(self._paths_name, ('keys', 'offs', 'cells'))
+            if arrays is not None and len(arrays['offs']) == len(arrays['keys']) + 1 \
+                    and int(arrays['offs'][-1]) == len(arrays['cells']):
+                store.load_arrays(arrays['keys'], arrays['offs'], arrays['cells'])
+        self.path_store = store
+        return store
+
+    def save_paths(self, store: Optional[SegmentPathStore] = None) -> bool:
+        """Persiste la union de caminos. No escribe si no hubo caminos nuevos."""
+        store = store or self.path_store
+        if store is None or not store.dirty or self._paths_name is None:
+            return False
+        keys, offs, cells = store.to_arrays()
+        # Un solo archivo: un lector concurrente ve el conjunto viejo o el nuevo.
+        self._save_npz(self._paths_name, keys=keys, offs=offs, cells=cells)
+        self._ensure_meta()
+        print(f"[LAYOUT-CACHE] {len(keys)} caminos persistidos en {self.dir}")
+        return True
+
+    def __repr__(self):
+        return f"LayoutCache(key={self.key[:16]}, dir={self.dir})"
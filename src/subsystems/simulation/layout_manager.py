@@ -18,12 +18,15 @@ class LayoutManager:
     Provides grid/pixel conversion, collision detection, and picking point extraction
     """
 
-    def __init__(self, tmx_file_path: str, headless: bool = False):
+    def __init__(self, tmx_file_path: str, headless: bool = False,
+                 layout_cache: Any = None):
         """
         Initialize Layout Manager with TMX file
 
         Args:
             tmx_file_path: Path to TMX map file (absolute or relative from project root)
+            layout_cache: Optional LayoutCache (PERF-2); reuses the collision
+                matrix and picking points persisted for this exact TMX
 
         Raises:
             FileNotFoundError: If TMX file doesn't exist
@@ -72,8 +75,22 @@ class LayoutManager:
         print(f"  - Total: {self.pixel_width}x{self.pixel_height} pixeles")
 
         # Initialize collision matrix and picking points
-        self.collision_matrix = self._build_collision_matrix()
-        self.picking_points = self._extract_picking_points()
+        # PERF-2: con layout_cache se reusan los de una corrida previa del
+        # MISMO TMX (clave = hash del contenido + reglas); si no, se construyen
+        # y se persisten para la siguiente.
+        cached = layout_cache.load_layout() if layout_cache is not None else None
+        if cached is not None:
+            self.collision_matrix = cached['collision_matrix']
+            self.picking_points = cached['picking_points']
+            print(f"[LAYOUT-MANAGER] Matriz y picking desde cache ({layout_cache.dir})")
+        else:
+            self.collision_matrix = self._build_collision_matrix()
+            self.picking_points = self._extract_picking_points()
+            if layout_cache is not None:
+                try:
+                    layout_cache.save_layout(self.collision_matrix, self.picking_points)
+                except OSError as e:
+                    print(f"[LAYOUT-MANAGER WARNING] No se pudo escribir cache: {e}")
 
         print(f"[LAYOUT-MANAGER] Puntos de picking encontrados: {len(self.picking_points)}")
 
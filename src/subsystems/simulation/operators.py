@@ -16,6 +16,24 @@ import logging
 logger = logging.getLogger(__name__)
 from typing import List, Dict, Any, Optional, Tuple
 
+from core.replay_movement import (
+    SEGMENT_EVENT, encode_segment, encode_timed_segment, position_at)
+
+
+def _retraso_exacto(now: float, t: float) -> Optional[float]:
+    """
+    PERF-22: retraso d >= 0 con now + d == t EXACTO en float (SimPy agenda en
+    now + d; t - now redondeado puede errar el ultimo bit), ajustando d de a
+    un ulp. None si ningun d llega a t (empate de redondeo: la suma salta
+    de t - ulp a t + ulp).
+    """
+    d = t - now
+    while now + d < t:
+        d = math.nextafter(d, math.inf)
+    while d > 0.0 and now + d > t:
+        d = math.nextafter(d, -math.inf)
+    return d if now + d == t else None
+
 
 def determinar_staging_destino(work_orders: List[Any], data_manager: Any) -> Tuple[int, Tuple[int, int]]:
     """
@@ -84,7 +102,7 @@ class BaseOperator:
         self.simulador = simulador
 
         # Agent state
-        self.current_position = None  # (grid_x, grid_y)
+        self.current_position = None  # (grid_x, grid_y); property, ver PERF-22
         self.current_task = None
         self.status = "idle"  # idle, moving, working
         self.cargo_volume = 0
@@ -517,6 +535,21 @@ class BaseOperator:
             if offset > 0:
                 yield self.env.timeout(offset * self.spawn_index)
 
+    # PERF-22: durante un tramo grueso (_recorrer_tramo_grueso) la posicion
+    # se reconstruye a demanda desde (celdas, instantes) y el reloj de SimPy;
+    # cualquier asignacion (incluido _set_pos) la vuelve a fijar.
+    @property
+    def current_position(self):
+        tramo = self._tramo_grueso
+        if tramo is not None:
+            return position_at(tramo[0], tramo[1], self.env.now)
+        return self._current_position
+
+    @current_position.setter
+    def current_position(self, cell):
+        self._tramo_grueso = None
+        self._current_position = cell
+
     def _set_pos(self, new_cell):
         """
         Choke point unico para cambiar la posicion del agente (Iniciativa #2).
@@ -634,7 +667,7 @@ class BaseOperator:
                            f"permanencia fallo: {e}")
 
     def _timewindow_execute_plan(self, segment_path, speed, on_before, on_after,
-                                 time_per_cell, goal_dwell=0.0):
+                                 time_per_cell, goal_dwell=0.0, segment_event=None):
         """
         OPCION C (time-window) - Fase 2: EJECUCION segun el plan espacio-temporal.
         Planifica+reserva la ruta libre de conflicto y la SIGUE celda a celda,
@@ -643,6 +676,8 @@ class BaseOperator:
         hay espera reactiva ni adquisicion por cerrojo (la F3 queda jubilada en este
         modo). Emite los mismos eventos que el lazo estatico (on_before tras mover,
         on_after tras el timeout) => el viewer ve el movimiento ordenado.
+        PERF-21: con segment_event (ver _recorrer_tramo) el plan completo,
+        esperas incluidas, viaja en un segment_started con duracion por paso.
 
         Generador SimPy. Devuelve (via StopIteration value) True si EJECUTO el plan,
         False si no habia plan: el llamador cae entonces a la ruta estatica (fallback
@@ -682,13 +717,17 @@ class BaseOperator:
             return False
 
         prev_t = float(plan[0][1])  # = t0; plan[0] == start == posicion actual
+        compacto = self._tramo_compacto(segment_event, len(plan))
         for step_idx, (cell, t) in enumerate(plan[1:], 1):
             dt = float(t) - prev_t
             if dt < 0.0:
                 dt = 0.0
             self._set_pos(cell)  # mover (o re-entrar si es espera: cell == actual)
-            if on_before is not None:
+            if on_before is not None and (step_idx == 1 or not compacto):
                 on_before(step_idx, cell)
+            if compacto and step_idx == 1:
+                self.almacen.registrar_evento(SEGMENT_EVENT, encode_timed_segment(
+                    plan, time_per_cell * speed, **segment_event))
             if dt > 0.0:
                 yield self.env.timeout(dt)
             if on_after is not None:
@@ -696,8 +735,67 @@ class BaseOperator:
             prev_t = float(t)
         return True
 
+    def _tramo_compacto(self, segment_event, n_celdas):
+        """PERF-21: el tramo se registra como segment_started (>1 paso)."""
+        return (segment_event is not None and n_celdas > 2
+                and getattr(self.almacen, 'movement_segments', False))
+
+    def _campos_segmento(self, current_task, **extra):
+        """PERF-21: campos de agente para segment_started (los mismos que el
+        estado_agente del tramo, salvo position)."""
+        campos = {
+            'agent_id': self.id,
+            'agent_type': self.type,
+            'status': self.status,
+            'current_task': current_task,
+            'cargo_volume': self.cargo_volume,
+        }
+        campos.update(extra)
+        return campos
+
+    def _recorrer_tramo_grueso(self, segment_path, dt, on_before, on_after,
+                               segment_event):
+        """
+        PERF-22: rama estatica en UN env.timeout (performance.coarse_movement).
+        Mismos eventos que el tramo compacto (on_before del primer paso +
+        segment_started) y el mismo instante de llegada, bit a bit: los
+        instantes de entrada se suman paso a paso como lo haria el reloj de
+        SimPy y el timeout se agenda en el ultimo instante alcanzable EXACTO
+        desde t0 (_retraso_exacto); los pasos que queden (empates de
+        redondeo, casi nunca mas de uno) siguen con timeout(dt) por celda,
+        exactos por construccion. Mientras dura, current_position se
+        interpola (property); on_after se llama una vez, con el ultimo paso.
+        Generador SimPy.
+        """
+        n = len(segment_path) - 1
+        self._set_pos(segment_path[1])
+        if on_before is not None:
+            on_before(1, segment_path[1])
+        if segment_event is not None:
+            self.almacen.registrar_evento(SEGMENT_EVENT, encode_segment(
+                segment_path, dt, **segment_event))
+        t0 = self.env.now
+        instantes = []
+        t = t0
+        for _ in range(n):
+            instantes.append(t)
+            t += dt
+        instantes_fin = instantes[1:] + [t]  # instante de llegada de cada paso
+        k, d = n, _retraso_exacto(t0, t)
+        while d is None:  # k >= 1 siempre llega: t0 + dt es el paso de SimPy
+            k -= 1
+            d = _retraso_exacto(t0, instantes_fin[k - 1])
+        self._tramo_grueso = (segment_path, instantes)
+        yield self.env.timeout(d)
+        for _ in range(n - k):
+            yield self.env.timeout(dt)
+        self._set_pos(segment_path[-1])
+        if on_after is not None:
+            on_after(n, segment_path[-1])
+
     def _recorrer_tramo(self, segment_path, speed, on_before=None, on_after=None,
-                        time_per_cell: float = 0.1, goal_dwell: float = 0.0):
+                        time_per_cell: float = 0.1, goal_dwell: float = 0.0,
+                        segment_event: Optional[Dict[str, Any]] = None):
         """
         Helper compartido (Ground + Forklift) que recorre un tramo celda a celda.
 
@@ -717,6 +815,13 @@ class BaseOperator:
             on_before: callable(step_idx, step_position) -> None, ejecutado ANTES del timeout.
             on_after: callable(step_idx, step_position) -> None, ejecutado DESPUES del timeout.
             time_per_cell: segundos base por celda (default 0.1).
+            segment_event: PERF-21, campos del evento segment_started (agent_id,
+                status, current_task...). Con performance.movement_events =
+                "segment" (rama estatica o plan time-window ejecutado)
+                on_before corre solo en el primer paso y el resto del tramo
+                viaja en UN segment_started (ver core/replay_movement.py).
+                None = per_cell. La rama F3 (cell_exclusion) no se compacta:
+                sus esperas reactivas no se conocen al empezar el tramo.
 
         Es un generador SimPy: usar con `yield from self._recorrer_tramo(...)`.
 
@@ -754,13 +859,28 @@ class BaseOperator:
                     # reserva EN el plan (destino-con-permanencia, 3.2/4.6).
                     executed = yield from self._timewindow_execute_plan(
                         segment_path, speed, on_before, on_after, time_per_cell,
-                        goal_dwell=goal_dwell)
+                        goal_dwell=goal_dwell, segment_event=segment_event)
                     if executed:
                         return
+            # PERF-21: tramo compacto (mismos pasos y timeouts; solo cambia
+            # lo que se registra para el replay).
+            compacto = self._tramo_compacto(segment_event, len(segment_path))
+            # PERF-22: sin capa de congestion y sin eventos por celda que
+            # emitir, un unico timeout para todo el tramo.
+            if (len(segment_path) > 2 and (cm is None or not cm.active)
+                    and (on_before is None or compacto)
+                    and getattr(self.almacen, 'coarse_movement', False)):
+                yield from self._recorrer_tramo_grueso(
+                    segment_path, time_per_cell * speed, on_before, on_after,
+                    segment_event if compacto else None)
+                return
             for step_idx, step_position in enumerate(segment_path[1:], 1):
                 self._set_pos(step_position)
-                if on_before is not None:
+                if on_before is not None and (step_idx == 1 or not compacto):
                     on_before(step_idx, step_position)
+                if compacto and step_idx == 1:
+                    self.almacen.registrar_evento(SEGMENT_EVENT, encode_segment(
+                        segment_path, time_per_cell * speed, **segment_event))
                 yield self.env.timeout(time_per_cell * speed)
                 if on_after is not None:
                     on_after(step_idx, step_position)
@@ -1108,6 +1228,16 @@ class BaseOperator:
                     logger.info(f"[{self.id}] Simulacion finalizada, saliendo...")
                     break
 
+                despachador = self.almacen.dispatcher
+                if despachador.despertar_por_evento:
+                    # PERF-13: dormir hasta que cambie el estado del despacho
+                    # (con timeout de seguridad si esta configurado).
+                    espera = despachador.esperar_trabajo()
+                    if despachador.idle_wakeup_timeout > 0:
+                        espera = espera | self.env.timeout(despachador.idle_wakeup_timeout)
+                    yield espera
+                    continue
+
                 yield self.env.timeout(0.5)  # V12: Reduced for fast termination detection
                 continue
 
@@ -1218,7 +1348,10 @@ class BaseOperator:
                     segment_path, self.default_speed,
                     on_before=_on_before, on_after=_on_after,
                     time_per_cell=TIME_PER_CELL,
-                    goal_dwell=self._pick_dwell_estimate(wo)
+                    goal_dwell=self._pick_dwell_estimate(wo),
+                    segment_event=self._campos_segmento(
+                        wo.id if wo else None,
+                        current_work_area=wo.work_area if wo else None)
                 )
             else:
                 self._jump_to(wo.ubicacion)
@@ -1290,7 +1423,8 @@ class BaseOperator:
                             on_before=_on_before, on_after=_on_after,
                             time_per_cell=TIME_PER_CELL,
                             # AUD8-1: la reserva incluye el packing por clase
-                            goal_dwell=self._staging_dwell_estimate(staging_wos)
+                            goal_dwell=self._staging_dwell_estimate(staging_wos),
+                            segment_event=self._campos_segmento(None)
                         )
 
                         self.total_distance_traveled += len(return_path) - 1
@@ -1510,7 +1644,9 @@ class BaseOperator:
 
             yield from self._recorrer_tramo(
                 path, self.default_speed, on_before=_on_before,
-                time_per_cell=self.time_per_cell, goal_dwell=goal_dwell)
+                time_per_cell=self.time_per_cell, goal_dwell=goal_dwell,
+                segment_event=self._campos_segmento(
+                    wo.id, current_work_area=wo.work_area))
             self.total_distance_traveled += len(path) - 1
         else:
             self._jump_to(destino)
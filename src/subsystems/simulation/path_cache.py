@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+SegmentPathLRU - PERF-18: memo en memoria de caminos A* por tramo
+Digital Twin Warehouse Simulator
+
+Los tours de una corrida repiten los mismos tramos (staging -> pasillo,
+pasillo -> pasillo, regreso a staging) y cada uno volvia a correr el A*.
+Esta cache LRU acotada (start, goal) -> camino se cuelga de
+`Pathfinder.path_cache` (misma interfaz get/put que el SegmentPathStore de
+PERF-2), asi la comparten TODOS los que resuelven caminos con el pathfinder
+de la corrida: RouteCalculator.calculate_route, el fallback A* de
+AssignmentCostCalculator y la navegacion de putaway (BaseOperator._putaway_nav).
+
+Caminos guardados compactos: ndarray int32 de ids de celda (y*ancho + x).
+`get` devuelve SIEMPRE una lista nueva de tuplas (los llamadores pueden
+mutarla). Mismo grid => el A* es determinista => el camino cacheado es el
+mismo que se recalcularia (replay byte-identico).
+
+Con `backing` (el SegmentPathStore persistido por LayoutCache) la LRU va
+delante: un fallo consulta el store y cada camino nuevo se le reenvia, asi
+save_paths sigue persistiendo todo.
+
+Opt-in via config['performance']['path_cache_size'] (0/ausente = sin cache).
+Contadores hits/misses/evictions en path_cache_report_<ts>.json de la sesion.
+
+Ley #4: ASCII puro en prints/logs.
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+Cell = Tuple[int, int]
+
+
+class SegmentPathLRU:
+    """Cache LRU acotada de caminos (start, goal) -> ids de celda."""
+
+    def __init__(self, width: int, max_entries: int, backing: Any = None):
+        self.width = int(width)
+        self.max_entries = max(1, int(max_entries))
+        self.backing = backing
+        self._paths: "OrderedDict[Tuple[int, int, int, int], np.ndarray]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.backing_hits = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._paths)
+
+    def get(self, start: Cell, goal: Cell) -> Optional[List[Cell]]:
+        key = (start[0], start[1], goal[0], goal[1])
+        ids = self._paths.get(key)
+        if ids is not None:
+            self._paths.move_to_end(key)
+            self.hits += 1
+            w = self.width
+            return [(c % w, c // w) for c in ids.tolist()]
+        self.misses += 1
+        if self.backing is not None:
+            path = self.backing.get(start, goal)
+            if path is not None:
+                self.backing_hits += 1
+                self._guardar(key, path)
+            return path
+        return None
+
+    def put(self, start: Cell, goal: Cell, path: List[Cell]) -> None:
+        self._guardar((start[0], start[1], goal[0], goal[1]), path)
+        if self.backing is not None:
+            self.backing.put(start, goal, path)
+
+    def _guardar(self, key: Tuple[int, int, int, int], path: List[Cell]) -> None:
+        w = self.width
+        self._paths[key] = np.fromiter((y * w + x for (x, y) in path),
+                                       dtype=np.int32, count=len(path))
+        self._paths.move_to_end(key)
+        if len(self._paths) > self.max_entries:
+            self._paths.popitem(last=False)
+            self.evictions += 1
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def report(self) -> Dict[str, Any]:
+        """Metricas de la corrida (JSON serializable)."""
+        return {
+            'max_entries': self.max_entries,
+            'entries': len(self._paths),
+            'cells_stored': int(sum(len(a) for a in self._paths.values())),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hit_rate, 4),
+            'backing_hits': self.backing_hits,
+            'evictions': self.evictions,
+        }
@@ -40,6 +40,10 @@ class Pathfinder:
         self.COST_STRAIGHT = 1.0
         self.COST_DIAGONAL = math.sqrt(2)  # ~1.414
 
+        # PERF-2: store opcional de caminos ya resueltos (get/put), p.ej. el
+        # SegmentPathStore persistido por LayoutCache. None = A* siempre.
+        self.path_cache = None
+
         print(f"[PATHFINDER] Inicializado con grid {self.width}x{self.height}")
 
     def is_walkable(self, x: int, y: int) -> bool:
@@ -62,6 +66,14 @@ class Pathfinder:
         # Check walkability
         return self.collision_matrix[y][x]
 
+    def refresh_walkability(self) -> None:
+        """
+        Hook para quien modifica collision_matrix despues de crear el pathfinder
+        (F2.d: staging outbound no caminable). Este A* lee la grilla en vivo:
+        no hay nada que reconstruir. Los motores de PERF-3/4 la copian y la
+        re-leen aca.
+        """
+
     def get_neighbors(self, pos: Tuple[int, int]) -> List[Tuple[Tuple[int, int], float]]:
         """
         Get walkable neighbors with movement costs
@@ -173,6 +185,12 @@ class Pathfinder:
             print(f"[PATHFINDER WARNING] Goal position {goal} is not walkable")
             return None
 
+        # PERF-2: camino ya resuelto (mismo grid => mismo resultado del A*)
+        if self.path_cache is not None:
+            cached = self.path_cache.get(start, goal)
+            if cached is not None:
+                return cached
+
         # Initialize A* data structures
         # Open set: priority queue of (f_score, counter, position)
         open_set: List[Tuple[float, int, Tuple[int, int]]] = []
@@ -205,6 +223,8 @@ class Pathfinder:
             if current == goal:
                 path = self.reconstruct_path(came_from, current)
                 print(f"[PATHFINDER] Camino encontrado: {len(path)} pasos")
+                if self.path_cache is not None:
+                    self.path_cache.put(start, goal, path)
                 return path
 
             # Mark as visited
@@ -0,0 +1,465 @@
+# -*- coding: utf-8 -*-
+"""
+Pathfinder Engines - PERF-3: motores alternativos detras de la interfaz Pathfinder
+Digital Twin Warehouse Simulator
+
+`ArrayPathfinder` es el MISMO A* que Pathfinder.find_path (misma heuristica
+octile, mismo orden de vecinos, mismo desempate (f, contador) en el heap) pero
+sobre ids enteros de celda (y*ancho + x) y buffers preasignados:
+
+- walkability: array NumPy plano (uint8) construido desde la grilla;
+- vecinos: tabla precalculada por celda [(id_vecino, coste), ...] en el orden
+  N, E, S, O, NE, SE, SO, NO de Pathfinder.get_neighbors;
+- g / padre / visto / cerrado: listas de largo ancho*alto reusadas entre
+  consultas; un contador de GENERACION las "resetea" en O(1) (una celda vale
+  solo si su marca == generacion actual). Listas y no ndarray en el bucle
+  caliente: indexar un escalar NumPy desde Python es ~3x mas lento.
+
+Mismo orden de expansion => mismos caminos celda por celda => el .jsonl con
+WAREHOUSE_SEED=42 queda byte-identico. Tampoco imprime por camino encontrado.
+Las tablas son una COPIA de la grilla: quien la modifique despues de crear el
+motor (F2.d de AlmacenMejorado bloquea el staging outbound) debe llamar a
+`refresh_walkability()` (Pathfinder historico: no-op, lee la grilla en vivo).
+
+`JPSPathfinder` (PERF-4) agrega Jump Point Search (variante con corte de
+esquinas permitido, la misma regla de movimiento que el A*) para pasillos
+largos y uniformes. Politica de desempate configurable (`tie_break`):
+- "astar" (default): los caminos que se EJECUTAN siguen saliendo del A*
+  (identicos al historico, byte-identico); JPS responde solo las consultas
+  de coste (`path_cost`, p.ej. el fallback del DistanceOracle).
+- "jps": tambien los caminos salen de JPS. Mismo coste optimo, pero entre
+  caminos de igual coste puede elegir otro => el .jsonl cambia.
+
+Seleccion via config['performance']['pathfinder_engine'] (default "astar").
+Benchmark de expansiones: scripts/bench_pathfinding.py.
+
+Ley #4: ASCII puro en prints/logs.
+"""
+
+import heapq
+import math
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from subsystems.simulation.pathfinder import Pathfinder
+
+Cell = Tuple[int, int]
+
+# Motores disponibles (config performance.pathfinder_engine).
+ENGINE_ASTAR = "astar"              # historico (dicts por consulta)
+ENGINE_ASTAR_ARRAY = "astar_array"  # PERF-3
+ENGINE_JPS = "jps"                  # PERF-4
+
+# Politicas de desempate de JPSPathfinder (performance.jps_tie_break).
+TIE_BREAK_ASTAR = "astar"
+TIE_BREAK_JPS = "jps"
+
+# Mismos costes que Pathfinder (atributos de instancia alla).
+_COST_STRAIGHT = 1.0
+_COST_DIAGONAL = math.sqrt(2)
+
+
+class ArrayPathfinder(Pathfinder):
+    """A* array-backed con resultados identicos a Pathfinder.find_path."""
+
+    def __init__(self, collision_matrix: List[List[bool]]):
+        super().__init__(collision_matrix)
+        w, h = self.width, self.height
+        n = w * h
+
+        # Coordenadas por id (evita divmod en el bucle caliente).
+        self._xs = [i % w for i in range(n)]
+        self._ys = [i // w for i in range(n)]
+        self._build_walkability()
+
+        # Buffers reusables + generacion.
+        self._g = [0.0] * n
+        self._parent = [-1] * n
+        self._seen = [0] * n
+        self._closed = [0] * n
+        self._gen = 0
+
+        # Metrica para benchmarks (nodos cerrados en la ultima consulta).
+        self.last_expansions = 0
+
+    def refresh_walkability(self) -> None:
+        """Re-lee collision_matrix (p.ej. tras el bloqueo F2.d del staging)."""
+        self._build_walkability()
+
+    def _build_walkability(self) -> None:
+        """walkable + tabla de vecinos desde la collision_matrix ACTUAL."""
+        w, h = self.width, self.height
+        n = w * h
+        collision_matrix = self.collision_matrix
+        self.walkable = np.fromiter(
+            (1 if collision_matrix[y][x] else 0 for y in range(h) for x in range(w)),
+            dtype=np.uint8, count=n)
+
+        # Vecinos caminables por celda, mismo orden que get_neighbors.
+        directions = (
+            (0, -1, self.COST_STRAIGHT), (1, 0, self.COST_STRAIGHT),
+            (0, 1, self.COST_STRAIGHT), (-1, 0, self.COST_STRAIGHT),
+            (1, -1, self.COST_DIAGONAL), (1, 1, self.COST_DIAGONAL),
+            (-1, 1, self.COST_DIAGONAL), (-1, -1, self.COST_DIAGONAL),
+        )
+        walk = self.walkable
+        self._neighbors = []
+        for i in range(n):
+            x, y = self._xs[i], self._ys[i]
+            row = []
+            for dx, dy, cost in directions:
+                nx, ny = x + dx, y + dy
+                if 0 <= nx < w and 0 <= ny < h and walk[ny * w + nx]:
+                    row.append((ny * w + nx, cost))
+            self._neighbors.append(tuple(row))
+
+    def find_path(self, start: Cell, goal: Cell) -> Optional[List[Cell]]:
+        """Ver Pathfinder.find_path (mismo contrato y mismos caminos)."""
+        if start == goal:
+            return [start]
+
+        if not self.is_walkable(start[0], start[1]):
+            print(f"[PATHFINDER WARNING] Start position {start} is not walkable")
+            return None
+        if not self.is_walkable(goal[0], goal[1]):
+            print(f"[PATHFINDER WARNING] Goal position {goal} is not walkable")
+            return None
+
+        if self.path_cache is not None:
+            cached = self.path_cache.get(start, goal)
+            if cached is not None:
+                return cached
+
+        w = self.width
+        gx, gy = goal[0], goal[1]
+        sid = start[1] * w + start[0]
+        gid = gy * w + gx
+
+        self._gen += 1
+        gen = self._gen
+        g = self._g
+        parent = self._parent
+        seen = self._seen
+        closed = self._closed
+        xs, ys = self._xs, self._ys
+        neighbors = self._neighbors
+        c_straight = self.COST_STRAIGHT
+        k_diag = self.COST_DIAGONAL - 2 * self.COST_STRAIGHT
+        push, pop = heapq.heappush, heapq.heappop
+
+        g[sid] = 0.0
+        seen[sid] = gen
+        parent[sid] = -1
+        open_set = [(0.0, 0, sid)]
+        counter = 1
+        expansions = 0
+
+        while open_set:
+            current = pop(open_set)[2]
+            if closed[current] == gen:
+                continue
+
+            if current == gid:
+                self.last_expansions = expansions
+                path = []
+                node = current
+                while node != sid:
+                    path.append((xs[node], ys[node]))
+                    node = parent[node]
+                path.append(start)
+                path.reverse()
+                if self.path_cache is not None:
+                    self.path_cache.put(start, goal, path)
+                return path
+
+            closed[current] = gen
+            expansions += 1
+            g_cur = g[current]
+            for nid, cost in neighbors[current]:
+                if closed[nid] == gen:
+                    continue
+                tentative = g_cur + cost
+                if seen[nid] != gen or tentative < g[nid]:
+                    parent[nid] = current
+                    g[nid] = tentative
+                    seen[nid] = gen
+                    dx = abs(xs[nid] - gx)
+                    dy = abs(ys[nid] - gy)
+                    h = c_straight * (dx + dy) + k_diag * (dx if dx < dy else dy)
+                    push(open_set, (tentative + h, counter, nid))
+                    counter += 1
+
+        self.last_expansions = expansions
+        print(f"[PATHFINDER WARNING] No se encontro camino de {start} a {goal}")
+        return None
+
+    def path_cost(self, start: Cell, goal: Cell) -> Optional[float]:
+        """Coste octile del camino optimo start -> goal (None si no hay)."""
+        path = self.find_path(start, goal)
+        if not path:
+            return None
+        return _polyline_cost(path)
+
+    def __repr__(self):
+        return f"ArrayPathfinder(grid={self.width}x{self.height})"
+
+
+def _sign(v: int) -> int:
+    return (v > 0) - (v < 0)
+
+
+def _polyline_cost(points: List[Cell]) -> float:
+    """Coste de una polilinea de tramos rectos/diagonales puros."""
+    total = 0.0
+    for (x1, y1), (x2, y2) in zip(points, points[1:]):
+        dx, dy = abs(x2 - x1), abs(y2 - y1)
+        diag = dx if dx < dy else dy
+        total += diag * _COST_DIAGONAL + (dx + dy - 2 * diag) * _COST_STRAIGHT
+    return total
+
+
+class JPSPathfinder(ArrayPathfinder):
+    """
+    PERF-4: Jump Point Search sobre la misma grilla 8-conexa del A*.
+
+    En lugar de empujar cada vecino, "salta" en linea recta/diagonal hasta
+    una celda con vecino forzado (o el goal): en pasillos uniformes el heap
+    solo ve los puntos de salto. Reglas de poda/forzado de la variante con
+    corte de esquinas permitido (Harabor & Grastien 2011; igual que la regla
+    de movimiento de Pathfinder.get_neighbors, que no chequea esquinas).
+
+    Ver `tie_break` en el docstring del modulo.
+    """
+
+    def __init__(self, collision_matrix: List[List[bool]],
+                 tie_break: str = TIE_BREAK_ASTAR):
+        super().__init__(collision_matrix)
+        tie_break = (tie_break or TIE_BREAK_ASTAR).strip().lower()
+        if tie_break not in (TIE_BREAK_ASTAR, TIE_BREAK_JPS):
+            print(f"[PATHFINDER WARNING] jps_tie_break desconocido '{tie_break}'; "
+                  f"usando '{TIE_BREAK_ASTAR}'")
+            tie_break = TIE_BREAK_ASTAR
+        self.tie_break = tie_break
+        # Celdas recorridas por los saltos en la ultima busqueda JPS.
+        self.last_scanned = 0
+
+    def _build_walkability(self) -> None:
+        """Ademas de la tabla del A*, la lista plana que leen los saltos."""
+        super()._build_walkability()
+        self._walk = self.walkable.tolist()
+
+    def find_path(self, start: Cell, goal: Cell) -> Optional[List[Cell]]:
+        if self.tie_break == TIE_BREAK_ASTAR:
+            return super().find_path(start, goal)
+        if start == goal:
+            return [start]
+        if not self.is_walkable(start[0], start[1]):
+            print(f"[PATHFINDER WARNING] Start position {start} is not walkable")
+            return None
+        if not self.is_walkable(goal[0], goal[1]):
+            print(f"[PATHFINDER WARNING] Goal position {goal} is not walkable")
+            return None
+        if self.path_cache is not None:
+            cached = self.path_cache.get(start, goal)
+            if cached is not None:
+                return cached
+        result = self._jps(start, goal)
+        if result is None:
+            print(f"[PATHFINDER WARNING] No se encontro camino de {start} a {goal}")
+            return None
+        path = self._interpolar(result[0])
+        path[0] = start
+        if self.path_cache is not None:
+            self.path_cache.put(start, goal, path)
+        return path
+
+    def path_cost(self, start: Cell, goal: Cell) -> Optional[float]:
+        """Coste optimo via JPS (independiente de tie_break)."""
+        if start == goal:
+            return 0.0
+        if not self.is_walkable(start[0], start[1]) or \
+                not self.is_walkable(goal[0], goal[1]):
+            return None
+        result = self._jps(start, goal)
+        return None if result is None else result[1]
+
+    def jump_points(self, start: Cell, goal: Cell) -> Optional[List[Cell]]:
+        """Puntos de salto del camino (diagnostico / benchmark)."""
+        result = self._jps(start, goal)
+        return None if result is None else result[0]
+
+    # ------------------------------------------------------------------
+    # Nucleo JPS
+    # ------------------------------------------------------------------
+    def _jps(self, start: Cell, goal: Cell):
+        """(puntos_de_salto, coste) o None. Mismo heap (f, contador) del A*."""
+        w = self.width
+        gx, gy = goal[0], goal[1]
+        sid = start[1] * w + start[0]
+        gid = gy * w + gx
+
+        self._gen += 1
+        gen = self._gen
+        g, parent, seen, closed = self._g, self._parent, self._seen, self._closed
+        xs, ys = self._xs, self._ys
+        c_straight = self.COST_STRAIGHT
+        c_diag = self.COST_DIAGONAL
+        k_diag = c_diag - 2 * c_straight
+        push, pop = heapq.heappush, heapq.heappop
+        self.last_scanned = 0
+
+        g[sid] = 0.0
+        seen[sid] = gen
+        parent[sid] = -1
+        open_set = [(0.0, 0, sid)]
+        counter = 1
+        expansions = 0
+
+        while open_set:
+            current = pop(open_set)[2]
+            if closed[current] == gen:
+                continue
+            if current == gid:
+                self.last_expansions = expansions
+                points = []
+                node = current
+                while node != -1:
+                    points.append((xs[node], ys[node]))
+                    node = parent[node]
+                points.reverse()
+                return points, g[gid]
+
+            closed[current] = gen
+            expansions += 1
+            x, y = xs[current], ys[current]
+            g_cur = g[current]
+            for dx, dy in self._direcciones(x, y, parent[current]):
+                jp = self._jump(x + dx, y + dy, dx, dy, gx, gy)
+                if jp is None or closed[jp] == gen:
+                    continue
+                ddx, ddy = abs(xs[jp] - x), abs(ys[jp] - y)
+                diag = ddx if ddx < ddy else ddy
+                tentative = g_cur + diag * c_diag + (ddx + ddy - 2 * diag) * c_straight
+                if seen[jp] != gen or tentative < g[jp]:
+                    parent[jp] = current
+                    g[jp] = tentative
+                    seen[jp] = gen
+                    hx, hy = abs(xs[jp] - gx), abs(ys[jp] - gy)
+                    h = c_straight * (hx + hy) + k_diag * (hx if hx < hy else hy)
+                    push(open_set, (tentative + h, counter, jp))
+                    counter += 1
+
+        self.last_expansions = expansions
+        return None
+
+    def _ok(self, x: int, y: int) -> bool:
+        return 0 <= x < self.width and 0 <= y < self.height \
+            and self._walk[y * self.width + x] == 1
+
+    def _direcciones(self, x: int, y: int, parent_id: int):
+        """Vecinos podados (naturales + forzados) segun la direccion de llegada."""
+        if parent_id == -1:
+            return ((0, -1), (1, 0), (0, 1), (-1, 0),
+                    (1, -1), (1, 1), (-1, 1), (-1, -1))
+        ok = self._ok
+        dx = _sign(x - self._xs[parent_id])
+        dy = _sign(y - self._ys[parent_id])
+        dirs = []
+        if dx and dy:
+            dirs.append((0, dy))
+            dirs.append((dx, 0))
+            dirs.append((dx, dy))
+            if not ok(x - dx, y):
+                dirs.append((-dx, dy))
+            if not ok(x, y - dy):
+                dirs.append((dx, -dy))
+        elif dx:
+            dirs.append((dx, 0))
+            if not ok(x, y + 1):
+                dirs.append((dx, 1))
+            if not ok(x, y - 1):
+                dirs.append((dx, -1))
+        else:
+            dirs.append((0, dy))
+            if not ok(x + 1, y):
+                dirs.append((1, dy))
+            if not ok(x - 1, y):
+                dirs.append((-1, dy))
+        return dirs
+
+    def _jump_recto(self, x: int, y: int, dx: int, dy: int, gx: int, gy: int):
+        """Salto horizontal (dy=0) o vertical (dx=0); id del punto o None."""
+        ok = self._ok
+        while True:
+            if not ok(x, y):
+                return None
+            self.last_scanned += 1
+            if x == gx and y == gy:
+                return y * self.width + x
+            if dx:
+                if (ok(x + dx, y + 1) and not ok(x, y + 1)) or \
+                        (ok(x + dx, y - 1) and not ok(x, y - 1)):
+                    return y * self.width + x
+            else:
+                if (ok(x + 1, y + dy) and not ok(x + 1, y)) or \
+                        (ok(x - 1, y + dy) and not ok(x - 1, y)):
+                    return y * self.width + x
+            x += dx
+            y += dy
+
+    def _jump(self, x: int, y: int, dx: int, dy: int, gx: int, gy: int):
+        if not (dx and dy):
+            return self._jump_recto(x, y, dx, dy, gx, gy)
+        ok = self._ok
+        while True:
+            if not ok(x, y):
+                return None
+            self.last_scanned += 1
+            if x == gx and y == gy:
+                return y * self.width + x
+            if (ok(x - dx, y + dy) and not ok(x - dx, y)) or \
+                    (ok(x + dx, y - dy) and not ok(x, y - dy)):
+                return y * self.width + x
+            if self._jump_recto(x + dx, y, dx, 0, gx, gy) is not None or \
+                    self._jump_recto(x, y + dy, 0, dy, gx, gy) is not None:
+                return y * self.width + x
+            x += dx
+            y += dy
+
+    @staticmethod
+    def _interpolar(points: List[Cell]) -> List[Cell]:
+        """Expande puntos de salto (tramos rectos/diagonales puros) a celdas."""
+        path = [points[0]]
+        for (x1, y1), (x2, y2) in zip(points, points[1:]):
+            sx, sy = _sign(x2 - x1), _sign(y2 - y1)
+            x, y = x1, y1
+            while (x, y) != (x2, y2):
+                x += sx
+                y += sy
+                path.append((x, y))
+        return path
+
+    def __repr__(self):
+        return (f"JPSPathfinder(grid={self.width}x{self.height}, "
+                f"tie_break={self.tie_break})")
+
+
+def create_pathfinder(collision_matrix: List[List[bool]],
+                      engine: Optional[str] = None,
+                      jps_tie_break: Optional[str] = None) -> Pathfinder:
+    """
+    PERF-3: fabrica de pathfinders segun config performance.pathfinder_engine.
+    None / "astar" => Pathfinder historico. Motor desconocido => warning y
+    Pathfinder historico (nunca rompe la corrida por un typo).
+    PERF-4: "jps" + performance.jps_tie_break (default "astar").
+    """
+    engine = (engine or ENGINE_ASTAR).strip().lower()
+    if engine == ENGINE_ASTAR_ARRAY:
+        return ArrayPathfinder(collision_matrix)
+    if engine == ENGINE_JPS:
+        return JPSPathfinder(collision_matrix, tie_break=jps_tie_break or TIE_BREAK_ASTAR)
+    if engine != ENGINE_ASTAR:
+        print(f"[PATHFINDER WARNING] Motor desconocido '{engine}'; usando "
+              f"'{ENGINE_ASTAR}'")
+    return Pathfinder(collision_matrix)
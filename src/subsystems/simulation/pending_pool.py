@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""
+PendingWorkOrderPool - PERF-11 (pool indexado de WorkOrders pendientes)
+Digital Twin Warehouse Simulator
+
+Reemplaza la lista plana DispatcherV11.work_orders_pendientes. Antes cada
+solicitar_asignacion reconstruia una copia filtrada (area + ola) recorriendo
+TODA la lista y _marcar_asignados hacia list.remove por WO: O(pendientes) por
+pedido, cuadratico en la corrida.
+
+El pool mantiene, ademas del orden de llegada (el de la lista historica):
+  - indice por work_area (orden de llegada dentro del area),
+  - indice por ola (wave_id normalizado a str, como _wo_elegible_por_ola),
+  - heap por area de (pick_sequence, llegada) con borrado perezoso,
+  - PERF-12: grilla uniforme de buckets por area sobre wo.ubicacion
+    (perezosa: se construye en la primera consulta por radio, p.ej. de la
+    estrategia Cercania, y desde ahi se mantiene en cada alta/baja).
+
+Alta O(1) en los dicts + O(log n) en el heap; baja O(1) (la entrada del heap
+queda muerta y se descarta al llegar a la cabeza, o en una reconstruccion
+cuando las muertas superan a las vivas: O(1) amortizado). Conserva la
+interfaz de lista que usan dispatcher y tests (append, remove, in, len,
+iteracion en orden de llegada).
+
+Invariante: work_area, wave_id, pick_sequence y ubicacion de una WO NO cambian
+mientras esta pendiente (se fijan al generarla; el re-slotting de inbound
+solo toca WOs de putaway, que viven en su propia cola).
+
+Ley #4: ASCII puro en prints/logs.
+"""
+
+import heapq
+import math
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# PERF-12: lado (en celdas de grilla) de cada bucket del indice espacial.
+CELDA_ESPACIAL = 8
+
+
+def clave_ola(wo: Any) -> Optional[str]:
+    """wave_id normalizado (str) como lo busca DispatcherV11.wave_release_times."""
+    wid = getattr(wo, 'wave_id', None)
+    return None if wid is None else str(wid)
+
+
+def _entrada_secuencia(wo: Any, n: int) -> Tuple[Any, int, Any]:
+    """Entrada del heap: (pick_sequence, llegada, wo); n unico => wo no se compara."""
+    ps = getattr(wo, 'pick_sequence', 0)
+    return (float('-inf') if ps is None else ps, n, wo)
+
+
+class PendingWorkOrderPool:
+    """Conjunto ordenado de WOs pendientes con indices secundarios."""
+
+    def __init__(self, work_orders: Optional[Iterable[Any]] = None,
+                 celda_espacial: int = CELDA_ESPACIAL):
+        self._n = 0
+        self._celda = max(1, int(celda_espacial))
+        # area -> {(bx, by): {wo: n}}; None hasta la primera consulta por radio
+        self._espacial: Optional[Dict[Any, Dict[Tuple[int, int], Dict[Any, int]]]] = None
+        self._orden: Dict[Any, int] = {}                     # wo -> n (llegada)
+        self._por_area: Dict[Any, Dict[Any, int]] = {}       # area -> {wo: n}
+        self._por_ola: Dict[Optional[str], Dict[Any, int]] = {}
+        # area -> heap de (pick_sequence, n, wo); viva si _orden[wo] == n
+        self._seq_heap: Dict[Any, List[Tuple[Any, int, Any]]] = {}
+        for wo in work_orders or ():
+            self.append(wo)
+
+    # ------------------------------------------------------------------
+    # Interfaz de lista
+    # ------------------------------------------------------------------
+    def append(self, wo: Any) -> None:
+        """Alta al final del orden de llegada (una WO ya presente se ignora)."""
+        if wo in self._orden:
+            return
+        n = self._n
+        self._n += 1
+        self._orden[wo] = n
+        area = wo.work_area
+        self._por_area.setdefault(area, {})[wo] = n
+        self._por_ola.setdefault(clave_ola(wo), {})[wo] = n
+        heapq.heappush(self._seq_heap.setdefault(area, []), _entrada_secuencia(wo, n))
+        if self._espacial is not None:
+            self._espacial.setdefault(area, {}).setdefault(self._bucket(wo), {})[wo] = n
+
+    def extend(self, work_orders: Iterable[Any]) -> None:
+        for wo in work_orders:
+            self.append(wo)
+
+    def remove(self, wo: Any) -> None:
+        """Baja de una WO (ValueError si no esta, como list.remove)."""
+        n = self._orden.pop(wo, None)
+        if n is None:
+            raise ValueError("WorkOrder no pendiente: %r" % (wo,))
+        area = wo.work_area
+        vivas = self._por_area[area]
+        del vivas[wo]
+        if not vivas:
+            del self._por_area[area]
+            del self._seq_heap[area]
+        else:
+            heap = self._seq_heap[area]
+            if len(heap) > 2 * len(vivas) + 64:
+                self._seq_heap[area] = heap = [e for e in heap if self._orden.get(e[2]) == e[1]]
+                heapq.heapify(heap)
+        ola = clave_ola(wo)
+        del self._por_ola[ola][wo]
+        if not self._por_ola[ola]:
+            del self._por_ola[ola]
+        if self._espacial is not None:
+            buckets = self._espacial[area]
+            b = self._bucket(wo)
+            del buckets[b][wo]
+            if not buckets[b]:
+                del buckets[b]
+            if not buckets:
+                del self._espacial[area]
+
+    def discard(self, wo: Any) -> None:
+        if wo in self._orden:
+            self.remove(wo)
+
+    def __contains__(self, wo: Any) -> bool:
+        return wo in self._orden
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(list(self._orden))
+
+    def __len__(self) -> int:
+        return len(self._orden)
+
+    def __repr__(self) -> str:
+        return "PendingWorkOrderPool(pendientes=%d, areas=%d)" % (
+            len(self._orden), len(self._por_area))
+
+    # ------------------------------------------------------------------
+    # Consultas indexadas
+    # ------------------------------------------------------------------
+    def areas(self) -> List[Any]:
+        """Areas con al menos una WO pendiente."""
+        return list(self._por_area)
+
+    def olas(self) -> List[Optional[str]]:
+        """Claves de ola (str o None) con al menos una WO pendiente."""
+        return list(self._por_ola)
+
+    def en_areas(self, areas: Iterable[Any]) -> List[Any]:
+        """WOs de las areas dadas, en orden de llegada (sin recorrer el resto)."""
+        dicts = [self._por_area[a] for a in dict.fromkeys(areas) if a in self._por_area]
+        if not dicts:
+            return []
+        if len(dicts) == 1:
+            return list(dicts[0])
+        if len(dicts) == len(self._por_area):
+            return list(self._orden)
+        fuentes = [((n, wo) for wo, n in d.items()) for d in dicts]
+        return [wo for _, wo in heapq.merge(*fuentes, key=lambda par: par[0])]
+
+    def primera_por_pick_sequence(self, areas: Iterable[Any]) -> Optional[Any]:
+        """WO de menor pick_sequence entre las areas (empate: la mas antigua).
+
+        Equivale a min(en_areas(areas), key=pick_sequence), leyendo solo la
+        cabeza del heap de cada area (descarta ahi las entradas muertas).
+        """
+        mejor = None
+        for a in areas:
+            heap = self._seq_heap.get(a)
+            if not heap:
+                continue
+            while self._orden.get(heap[0][2]) != heap[0][1]:
+                heapq.heappop(heap)
+            if mejor is None or heap[0][:2] < mejor[:2]:
+                mejor = heap[0]
+        return None if mejor is None else mejor[2]
+
+    # ------------------------------------------------------------------
+    # PERF-12: indice espacial (grilla uniforme de buckets por area)
+    # ------------------------------------------------------------------
+    def _bucket(self, wo: Any) -> Tuple[int, int]:
+        x, y = wo.ubicacion
+        return (math.floor(x / self._celda), math.floor(y / self._celda))
+
+    def _indice_espacial(self) -> Dict[Any, Dict[Tuple[int, int], Dict[Any, int]]]:
+        if self._espacial is None:
+            self._espacial = {}
+            for wo, n in self._orden.items():
+                self._espacial.setdefault(wo.work_area, {}).setdefault(
+                    self._bucket(wo), {})[wo] = n
+        return self._espacial
+
+    def en_radio(self, areas: Iterable[Any], centro: Tuple[float, float],
+                 radio: float) -> List[Any]:
+        """
+        WOs de las areas a distancia euclidea <= radio de `centro`, en orden
+        de llegada. Misma aritmetica que el filtro historico de Cercania
+        (math.sqrt((x - cx)**2 + (y - cy)**2) <= radio), pero solo visita
+        los buckets que tocan la caja [cx-radio, cx+radio] x [cy-radio, cy+radio]:
+        un bucket fuera de la caja tiene |dx| > radio en algun eje, asi que
+        ninguna de sus WOs podia pasar el filtro.
+        """
+        indice = self._indice_espacial()
+        cx, cy = centro
+        c = self._celda
+        bx0, bx1 = math.floor((cx - radio) / c), math.floor((cx + radio) / c)
+        by0, by1 = math.floor((cy - radio) / c), math.floor((cy + radio) / c)
+        en_caja = (bx1 - bx0 + 1) * (by1 - by0 + 1)
+        encontrados = []
+        for area in dict.fromkeys(areas):
+            buckets = indice.get(area)
+            if not buckets:
+                continue
+            if en_caja >= len(buckets):
+                # Caja mas grande que los buckets ocupados: recorrer los ocupados.
+                grupos = [d for (bx, by), d in buckets.items()
+                          if bx0 <= bx <= bx1 and by0 <= by <= by1]
+            else:
+                grupos = [buckets[(bx, by)] for bx in range(bx0, bx1 + 1)
+                          for by in range(by0, by1 + 1) if (bx, by) in buckets]
+            for d in grupos:
+                for wo, n in d.items():
+                    wo_x, wo_y = wo.ubicacion
+                    if math.sqrt((wo_x - cx)**2 + (wo_y - cy)**2) <= radio:
+                        encontrados.append((n, wo))
+        encontrados.sort(key=lambda par: par[0])
+        return [wo for _, wo in encontrados]
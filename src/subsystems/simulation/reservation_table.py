@@ -14,10 +14,27 @@ Modelo de ocupacion: al ENTRAR en una celda mediante un paso (frm->to) que parte
 celda extiende su intervalo por `dt_wait`. Las aristas (movimientos dirigidos) se
 registran aparte para detectar el conflicto frontal (swap / head-on).
 
+PERF-24 (indexed=True, performance.reservation_index): indice por celda/arista
+paralelo a las listas (t_in de cada intervalo, duracion maxima, y los t_out +
+clearance ordenados, totales y por agente). is_free / earliest_free /
+can_swap arrancan el barrido por bisect en el primer intervalo que todavia
+puede solaparse, e interval_id (el intervalo seguro SIPP del planner) es un
+par de bisect. Mismas respuestas que el barrido lineal.
+
+PERF-25 (expiry_index=True, performance.reservation_expiry_index): indice
+inverso agente -> {celda/arista: n intervalos} y heap de vencimientos
+(t_out, tipo, clave). release_agent toca solo las claves del agente y
+purge_before solo las que tienen algo vencido (O(vencidos log n), no un
+barrido de toda la tabla). Las entradas del heap de intervalos ya liberados
+se descartan al salir; si superan a los vivos el heap se reconstruye.
+`purge_horizon` (performance.reservation_purge_horizon) es el margen de la
+purga automatica del planner en cada tramo (t0 - horizonte; historico 1.0 s).
+
 Ley #4: ASCII puro en prints/logs.
 """
 
 import bisect
+import heapq
 from typing import Dict, List, Tuple, Optional
 
 # Un intervalo de ocupacion de una celda: (t_in, t_out, agent_id).
@@ -25,6 +42,41 @@ Interval = Tuple[float, float, str]
 Cell = Tuple[int, int]
 Edge = Tuple[Cell, Cell]
 
+# Holgura del limite inferior del barrido indexado (nunca saltea de mas).
+_EPS_IDX = 1e-9
+
+
+class _Indice:
+    """PERF-24: indice de una lista de intervalos (celda o arista)."""
+    __slots__ = ("starts", "maxlen", "ends", "ends_agent")
+
+    def __init__(self, ivs: List[Interval], cl: float, con_fin: bool):
+        self.starts = [iv[0] for iv in ivs]
+        self.maxlen = max((iv[1] - iv[0] for iv in ivs), default=0.0)
+        # t_out + clearance ordenados (solo celdas: interval_id del planner)
+        self.ends: Optional[List[float]] = None
+        self.ends_agent: Optional[Dict[str, List[float]]] = None
+        if con_fin:
+            self.ends = sorted(iv[1] + cl for iv in ivs)
+            self.ends_agent = {}
+            for iv in ivs:
+                self.ends_agent.setdefault(iv[2], []).append(iv[1] + cl)
+            for fines in self.ends_agent.values():
+                fines.sort()
+
+    def insert(self, pos: int, iv: Interval, cl: float) -> None:
+        self.starts.insert(pos, iv[0])
+        if iv[1] - iv[0] > self.maxlen:
+            self.maxlen = iv[1] - iv[0]
+        if self.ends is not None:
+            fin = iv[1] + cl
+            bisect.insort(self.ends, fin)
+            bisect.insort(self.ends_agent.setdefault(iv[2], []), fin)
+
+    def first(self, t_lo: float) -> int:
+        """Primer indice cuyo intervalo puede terminar (con margen) > t_lo."""
+        return bisect.bisect_left(self.starts, t_lo - self.maxlen - _EPS_IDX)
+
 
 class ReservationTable:
     """
@@ -33,12 +85,32 @@ class ReservationTable:
     el chequeo de swap. Memoria acotada via `purge_before` y `release_agent`.
     """
 
-    def __init__(self, clearance: float = 0.0):
+    def __init__(self, clearance: float = 0.0, indexed: bool = False,
+                 expiry_index: bool = False, purge_horizon: Optional[float] = None):
         # Margen de seguridad (eps) entre intervalos contiguos de agentes distintos.
         # Con clearance=0 se exige no-solapamiento estricto (bordes pueden tocarse).
         self.clearance = float(clearance)
         self.reservations: Dict[Cell, List[Interval]] = {}
         self.edges: Dict[Edge, List[Interval]] = {}
+        # PERF-24: indices paralelos (None = barrido lineal historico).
+        self.indexed = bool(indexed)
+        self._cell_ix: Optional[Dict[Cell, _Indice]] = {} if self.indexed else None
+        self._edge_ix: Optional[Dict[Edge, _Indice]] = {} if self.indexed else None
+        # PERF-25: indice inverso por agente + heap de vencimientos. Las claves
+        # son (0, celda) o (1, arista); None = barridos completos historicos.
+        self._por_agente: Optional[Dict[str, Dict[tuple, int]]] = (
+            {} if expiry_index else None)
+        self._vencimientos: List[tuple] = []
+        self._vivos = 0
+        # Sin opciones PERF-25: 1.0 s historico tal cual. Con expiry_index o
+        # un horizonte explicito, nunca menor que clearance: lo purgado no
+        # puede bloquear consultas desde t0 (el id SIPP solo se desplaza en
+        # una constante por celda).
+        if expiry_index or purge_horizon is not None:
+            self.purge_horizon = max(1.0 if purge_horizon is None else float(purge_horizon),
+                                     self.clearance)
+        else:
+            self.purge_horizon = 1.0
         # Metricas: inserciones y solapes detectados (DEBE ser 0 por construccion).
         self.reserve_calls = 0
         self.overlap_violations = 0
@@ -60,7 +132,9 @@ class ReservationTable:
         if not ivs:
             return True
         cl = self.clearance
-        for (e_in, e_out, e_agent) in ivs:
+        lo = self._cell_ix[cell].first(t_in - cl) if self.indexed else 0
+        for i in range(lo, len(ivs)):
+            e_in, e_out, e_agent = ivs[i]
             if e_agent == ignore_agent:
                 continue
             if ignore_agents is not None and e_agent in ignore_agents:
@@ -89,7 +163,10 @@ class ReservationTable:
         cl = self.clearance
         t = float(t_from)
         # Intervalos ordenados por t_in: avanzar t hasta salir de cada bloqueo.
-        for (e_in, e_out, e_agent) in ivs:
+        # (PERF-24: los que terminan antes de t_from no mueven t; se saltean.)
+        lo = self._cell_ix[cell].first(t - cl) if self.indexed else 0
+        for i in range(lo, len(ivs)):
+            e_in, e_out, e_agent = ivs[i]
             if e_agent == ignore_agent:
                 continue
             if e_in - cl >= t + dur:
@@ -109,6 +186,15 @@ class ReservationTable:
         if not rev:
             return True
         cl = self.clearance
+        if self.indexed:
+            # PERF-24: solo la ventana que puede solaparse con [t_in, t_out]
+            for i in range(self._edge_ix[(to, frm)].first(t_in - cl), len(rev)):
+                e_in, e_out, e_agent = rev[i]
+                if e_in - cl >= t_out:
+                    break
+                if e_agent != agent_id and t_in < (e_out + cl):
+                    return False
+            return True
         for (e_in, e_out, e_agent) in rev:
             if e_agent == agent_id:
                 continue
@@ -116,6 +202,29 @@ class ReservationTable:
                 return False
         return True
 
+    def interval_id(self, cell: Cell, t: float, agent_id: str) -> int:
+        """
+        Intervalo seguro SIPP de `t` en `cell` para `agent_id`: cuantos
+        intervalos AJENOS ya terminaron (t_out + clearance <= t). Dos llegadas
+        con el mismo id estan en el mismo hueco libre.
+        """
+        ivs = self.reservations.get(cell)
+        if not ivs:
+            return 0
+        if self.indexed:
+            ix = self._cell_ix[cell]
+            propios = ix.ends_agent.get(agent_id)
+            return (bisect.bisect_right(ix.ends, t)
+                    - (bisect.bisect_right(propios, t) if propios else 0))
+        cl = self.clearance
+        n = 0
+        for (_e_in, e_out, e_agent) in ivs:
+            if e_agent == agent_id:
+                continue
+            if e_out + cl <= t:
+                n += 1
+        return n
+
     # ------------------------------------------------------------------
     # Insercion
     # ------------------------------------------------------------------
@@ -135,7 +244,19 @@ class ReservationTable:
             self.overlap_violations += 1
             return False
         ivs = self.reservations.setdefault(cell, [])
-        bisect.insort(ivs, (float(t_in), float(t_out), agent_id))
+        iv = (float(t_in), float(t_out), agent_id)
+        if self.indexed:
+            pos = bisect.bisect_right(ivs, iv)  # mismo lugar que insort
+            ivs.insert(pos, iv)
+            ix = self._cell_ix.get(cell)
+            if ix is None:
+                self._cell_ix[cell] = _Indice(ivs, self.clearance, True)
+            else:
+                ix.insert(pos, iv, self.clearance)
+        else:
+            bisect.insort(ivs, iv)
+        if self._por_agente is not None:
+            self._registrar(0, cell, iv)
         self.reserve_calls += 1
         return True
 
@@ -145,52 +266,144 @@ class ReservationTable:
         if frm == to:
             return
         ivs = self.edges.setdefault((frm, to), [])
-        bisect.insort(ivs, (float(t_in), float(t_out), agent_id))
+        iv = (float(t_in), float(t_out), agent_id)
+        if self.indexed:
+            pos = bisect.bisect_right(ivs, iv)
+            ivs.insert(pos, iv)
+            ix = self._edge_ix.get((frm, to))
+            if ix is None:
+                self._edge_ix[(frm, to)] = _Indice(ivs, self.clearance, False)
+            else:
+                ix.insert(pos, iv, self.clearance)
+        else:
+            bisect.insort(ivs, iv)
+        if self._por_agente is not None:
+            self._registrar(1, (frm, to), iv)
 
     # ------------------------------------------------------------------
     # Liberacion / purga (memoria acotada)
     # ------------------------------------------------------------------
     def release_agent(self, agent_id: str) -> None:
         """Elimina TODAS las reservas (vertices y aristas) de `agent_id`."""
+        if self._por_agente is not None:
+            # PERF-25: solo las celdas/aristas donde el agente tiene intervalos
+            for kind, key in self._por_agente.pop(agent_id, {}):
+                ivs = (self.edges if kind else self.reservations)[key]
+                kept = [iv for iv in ivs if iv[2] != agent_id]
+                self._vivos -= len(ivs) - len(kept)
+                self._reemplazar(kind, key, kept, len(ivs))
+            return
         empty_cells = []
         for cell, ivs in self.reservations.items():
             kept = [iv for iv in ivs if iv[2] != agent_id]
             if kept:
                 self.reservations[cell] = kept
+                if self.indexed and len(kept) != len(ivs):
+                    self._cell_ix[cell] = _Indice(kept, self.clearance, True)
             else:
                 empty_cells.append(cell)
-        for cell in empty_cells:
-            self.reservations.pop(cell, None)
         empty_edges = []
         for edge, ivs in self.edges.items():
             kept = [iv for iv in ivs if iv[2] != agent_id]
             if kept:
                 self.edges[edge] = kept
+                if self.indexed and len(kept) != len(ivs):
+                    self._edge_ix[edge] = _Indice(kept, self.clearance, False)
             else:
                 empty_edges.append(edge)
-        for edge in empty_edges:
-            self.edges.pop(edge, None)
+        self._drop(empty_cells, empty_edges)
 
     def purge_before(self, t: float) -> None:
         """Purga intervalos ya pasados (t_out < t) para acotar memoria."""
+        if self._por_agente is not None:
+            self._purgar_vencidos(t)
+            return
         empty_cells = []
         for cell, ivs in self.reservations.items():
             kept = [iv for iv in ivs if iv[1] >= t]
             if kept:
                 self.reservations[cell] = kept
+                if self.indexed and len(kept) != len(ivs):
+                    self._cell_ix[cell] = _Indice(kept, self.clearance, True)
             else:
                 empty_cells.append(cell)
-        for cell in empty_cells:
-            self.reservations.pop(cell, None)
         empty_edges = []
         for edge, ivs in self.edges.items():
             kept = [iv for iv in ivs if iv[1] >= t]
             if kept:
                 self.edges[edge] = kept
+                if self.indexed and len(kept) != len(ivs):
+                    self._edge_ix[edge] = _Indice(kept, self.clearance, False)
             else:
                 empty_edges.append(edge)
-        for edge in empty_edges:
+        self._drop(empty_cells, empty_edges)
+
+    # ------------------------------------------------------------------
+    # PERF-25: indice inverso + heap de vencimientos
+    # ------------------------------------------------------------------
+    def _registrar(self, kind: int, key, iv: Interval) -> None:
+        claves = self._por_agente.setdefault(iv[2], {})
+        claves[(kind, key)] = claves.get((kind, key), 0) + 1
+        heapq.heappush(self._vencimientos, (iv[1], kind, key))
+        self._vivos += 1
+
+    def _purgar_vencidos(self, t: float) -> None:
+        """purge_before incremental: solo las claves con entradas vencidas."""
+        heap = self._vencimientos
+        tocadas = set()
+        while heap and heap[0][0] < t:
+            _t_out, kind, key = heapq.heappop(heap)
+            tocadas.add((kind, key))
+        for kind, key in tocadas:
+            ivs = (self.edges if kind else self.reservations).get(key)
+            if not ivs:
+                continue  # entrada de un intervalo ya liberado
+            kept = []
+            for iv in ivs:
+                if iv[1] >= t:
+                    kept.append(iv)
+                    continue
+                claves = self._por_agente[iv[2]]
+                claves[(kind, key)] -= 1
+                if not claves[(kind, key)]:
+                    del claves[(kind, key)]
+                    if not claves:
+                        del self._por_agente[iv[2]]
+            if len(kept) != len(ivs):
+                self._vivos -= len(ivs) - len(kept)
+                self._reemplazar(kind, key, kept, len(ivs))
+        # Entradas huerfanas (release_agent) que aun no vencen: p.ej. pallets
+        # con t_out = now + 1e9. Reconstruir si ya son mas que los vivos.
+        if len(heap) > 2 * self._vivos + 64:
+            self._vencimientos = [(iv[1], 0, cell) for cell, ivs in self.reservations.items()
+                                  for iv in ivs]
+            self._vencimientos += [(iv[1], 1, edge) for edge, ivs in self.edges.items()
+                                   for iv in ivs]
+            heapq.heapify(self._vencimientos)
+
+    def _reemplazar(self, kind: int, key, kept: List[Interval], n_antes: int) -> None:
+        """Deja `kept` como lista de la clave (re-indexa o la quita si quedo vacia)."""
+        if not kept:
+            if kind:
+                self._drop((), (key,))
+            else:
+                self._drop((key,), ())
+            return
+        (self.edges if kind else self.reservations)[key] = kept
+        if self.indexed and len(kept) != n_antes:
+            indices = self._edge_ix if kind else self._cell_ix
+            indices[key] = _Indice(kept, self.clearance, not kind)
+
+    def _drop(self, cells, edges) -> None:
+        """Quita celdas/aristas que quedaron sin intervalos (y su indice)."""
+        for cell in cells:
+            self.reservations.pop(cell, None)
+            if self.indexed:
+                self._cell_ix.pop(cell, None)
+        for edge in edges:
             self.edges.pop(edge, None)
+            if self.indexed:
+                self._edge_ix.pop(edge, None)
 
     def total_intervals(self) -> int:
         return sum(len(v) for v in self.reservations.values())
@@ -7,7 +7,9 @@ Calculates optimal routes for visiting multiple picking locations
 """
 
 import math
-from typing import List, Tuple, Optional, Dict, Any
+from typing import List, Tuple, Optional, Dict, Any, Sequence
+
+import numpy as np
 
 
 class RouteCalculator:
@@ -18,12 +20,13 @@ class RouteCalculator:
     picking locations. Uses A* pathfinding and respects pick_sequence ordering.
     """
 
-    def __init__(self, pathfinder: Any):
+    def __init__(self, pathfinder: Any, distance_oracle: Any = None):
         """
         Initialize RouteCalculator with pathfinder
 
         Args:
             pathfinder: Pathfinder instance for A* pathfinding
+            distance_oracle: Optional DistanceOracle (PERF-1) for O(1) distances
 
         Raises:
             ValueError: If pathfinder is None
@@ -32,13 +35,17 @@ class RouteCalculator:
             raise ValueError("[ROUTE-CALCULATOR ERROR] pathfinder cannot be None")
 
         self.pathfinder = pathfinder
+        # PERF-1: oraculo de distancias (opt-in). None => distancias euclideas
+        # historicas en las heuristicas de ordenamiento.
+        self.distance_oracle = distance_oracle
         print(f"[ROUTE-CALCULATOR] Inicializado con pathfinder {self.pathfinder}")
 
     def calculate_route(self,
                        start_position: Tuple[int, int],
                        work_orders: List[Any],
                        return_to_start: bool = True,
-                       preserve_first: bool = False) -> Optional[Dict[str, Any]]:
+                       preserve_first: bool = False,
+                       optimizer: Any = None) -> Optional[Dict[str, Any]]:
         """
         Calculate optimal route visiting all work order locations
 
@@ -46,6 +53,11 @@ class RouteCalculator:
             start_position: Starting position (grid coordinates) - typically depot
             work_orders: List of WorkOrder objects to visit
             return_to_start: Whether to return to start position after last pick
+            preserve_first: Keep the dispatcher's order (the optimizer, if
+                any, keeps only the first WorkOrder fixed)
+            optimizer: Optional TourOptimizer (PERF-17): improves the visit
+                order with 2-opt/Or-opt over distance_matrix before the A*
+                segments (A* runs only for the final order)
 
         Returns:
             Dictionary with route information:
@@ -107,6 +119,14 @@ class RouteCalculator:
         # Order work orders by pick_sequence (default strategy)
         ordered_work_orders = self.order_work_orders_by_sequence(work_orders, preserve_first)
 
+        # PERF-17: busqueda local sobre la matriz parada-parada (una por tour)
+        if optimizer is not None and len(ordered_work_orders) > 1:
+            dist = self.distance_matrix(
+                [start_position] + [wo.ubicacion for wo in ordered_work_orders])
+            orden = optimizer.improve(dist, fixed_first=preserve_first,
+                                      closed=return_to_start)
+            ordered_work_orders = [ordered_work_orders[i] for i in orden]
+
         # Calculate route segments
         segment_paths = []
         segment_distances = []
@@ -335,6 +355,8 @@ class RouteCalculator:
               despues de filtrar por radio, ordenar los candidatos por vecino
               mas cercano en lugar de por costo de AssignmentCostCalculator.
             - Aproximacion greedy del TSP (no optima pero O(n^2) y rapida)
+            - PERF-1: con distance_oracle usa distancia real de camino
+              (estimate_distance); sin oraculo, euclidea (historico).
             - Estado actual: IMPLEMENTADA pero NO llamada desde ningun sitio.
               Para activarla: llamar desde DispatcherV11._construir_tour()
               cuando tour_type == "Cercania" (en lugar de preserve_first).
@@ -350,7 +372,7 @@ class RouteCalculator:
             # Find nearest work order
             nearest_wo = min(
                 remaining,
-                key=lambda wo: self._euclidean_distance(current_position, wo.ubicacion)
+                key=lambda wo: self.estimate_distance(current_position, wo.ubicacion)
             )
 
             # Add to sequence
@@ -364,6 +386,52 @@ class RouteCalculator:
 
         return sequence
 
+    def distance_matrix(self, points: Sequence[Tuple[int, int]]) -> np.ndarray:
+        """
+        PERF-17: matriz simetrica de estimate_distance entre `points`.
+
+        Con oraculo, las filas de los puntos que son fuente (picking points)
+        salen de UN gather cada una; los pares sin fuente o sin camino caen a
+        estimate_distance. Sin oraculo: euclidea vectorizada. Se simetriza
+        (promedio con la traspuesta) para la busqueda local.
+        """
+        n = len(points)
+        pts = np.array([(int(p[0]), int(p[1])) for p in points], dtype=np.int64).reshape(n, 2)
+        oracle = self.distance_oracle
+        if oracle is None:
+            diff = pts[:, None, :] - pts[None, :, :]
+            return np.sqrt((diff ** 2).sum(axis=2).astype(np.float64))
+
+        d = np.full((n, n), np.nan, dtype=np.float64)
+        w, h = oracle.width, oracle.height
+        inside = (pts[:, 0] >= 0) & (pts[:, 0] < w) & (pts[:, 1] >= 0) & (pts[:, 1] < h)
+        flat = np.where(inside, pts[:, 1] * w + pts[:, 0], 0)
+        for i, p in enumerate(points):
+            r = oracle.index.get((int(p[0]), int(p[1])))
+            if r is not None:
+                d[i, inside] = oracle.dist[r, flat[inside]]
+        # Sin fila propia: la del otro extremo (simetria entre caminables).
+        faltan = np.isnan(d) & ~np.isnan(d.T)
+        d[faltan] = d.T[faltan]
+        np.fill_diagonal(d, 0.0)
+        for i, j in zip(*np.nonzero(~np.isfinite(d))):
+            d[i, j] = self.estimate_distance(tuple(points[i]), tuple(points[j]))
+        return (d + d.T) / 2.0
+
+    def estimate_distance(self, pos1: Tuple[int, int], pos2: Tuple[int, int]) -> float:
+        """
+        Distancia para heuristicas de ordenamiento (PERF-1).
+
+        Con oraculo: distancia real de camino (O(1) si un extremo es fuente,
+        A* si no). Sin oraculo, o si el par no tiene camino: euclidea
+        (comportamiento historico exacto).
+        """
+        if self.distance_oracle is not None:
+            d = self.distance_oracle.distance(pos1, pos2)
+            if d is not None:
+                return d
+        return self._euclidean_distance(pos1, pos2)
+
     def _euclidean_distance(self, pos1: Tuple[int, int], pos2: Tuple[int, int]) -> float:
         """
         Calculate euclidean distance between two positions
@@ -150,18 +150,9 @@ class SpaceTimePlanner:
         # solo se conserva la MAS TEMPRANA. Esto elimina la oscilacion y las
         # cadenas de espera que hacian explotar las expansiones ante dwells
         # largos (descargas de decenas de segundos).
+        # PERF-24: el conteo vive en la tabla (bisect con indexed=True).
         def _interval_id(cell, t):
-            ivs = tbl.reservations.get(cell)
-            if not ivs:
-                return 0
-            cl = tbl.clearance
-            n = 0
-            for (_e_in, e_out, e_agent) in ivs:
-                if e_agent == agent_id:
-                    continue
-                if e_out + cl <= t:
-                    n += 1
-            return n
+            return tbl.interval_id(cell, t, agent_id)
 
         # open: (f, counter, cell, t). g = t - t0.
         counter = 0
@@ -275,7 +266,8 @@ class SpaceTimePlanner:
 
         # Re-planificacion: soltar reservas futuras propias y purgar pasado.
         self.table.release_agent(agent_id)
-        self.table.purge_before(t0 - 1.0)
+        # PERF-25: margen configurable (performance.reservation_purge_horizon)
+        self.table.purge_before(t0 - self.table.purge_horizon)
 
         t_start = _time.perf_counter()
         plan = self.find_path_st(start, goal, t0, agent_id, speed)
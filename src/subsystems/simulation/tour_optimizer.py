@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+TourOptimizer - PERF-17 (busqueda local 2-opt / Or-opt del orden de visita)
+Digital Twin Warehouse Simulator
+
+RouteCalculator.calculate_route ordena las paradas por pick_sequence (o por el
+orden del dispatcher con preserve_first) y corre un A* por segmento. Este
+motor mejora ESE orden antes del A*: recibe la matriz de distancias
+parada-parada (RouteCalculator.distance_matrix, una sola vez por tour, desde
+el oraculo PERF-1) y aplica movimientos 2-opt (invertir un tramo) y Or-opt
+(mover un tramo de 1..3 paradas) de primera mejora hasta un optimo local o
+hasta agotar el presupuesto. El A* solo corre despues, sobre el orden final.
+
+Presupuesto DETERMINISTA: max_moves = movimientos evaluados por tour (cada
+delta 2-opt u Or-opt calculado cuenta 1), asi la misma semilla da el mismo
+replay en cualquier maquina. time_budget_ms es solo una red de seguridad
+opcional por reloj de pared (default 0 = sin tope); si salta, el resultado
+pasa a depender de la maquina.
+
+Modelo: nodo 0 = posicion de arranque (fija), nodos 1..n = paradas. Camino
+abierto 0 -> ... o ciclo cerrado (return_to_start). Con fixed_first la
+primera parada tambien queda fija (preserve_first del dispatcher). Solo se
+aceptan mejoras estrictas => el orden devuelto nunca es mas largo que el de
+entrada (en la metrica de la matriz).
+
+Ley #4: ASCII puro en prints/logs.
+"""
+
+import time
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Mejora minima para aceptar un movimiento (ruido float32 del oraculo).
+EPS_MEJORA = 1e-6
+# Largo maximo del tramo que mueve Or-opt.
+OR_OPT_MAX = 3
+# Movimientos evaluados por tour (default de route_engine_max_moves).
+MAX_MOVES_DEFAULT = 20000
+
+
+class TourOptimizer:
+    """Mejora por busqueda local del orden de visita de un tour."""
+
+    def __init__(self, time_budget_ms: float = 0.0, or_opt: bool = True,
+                 max_moves: int = MAX_MOVES_DEFAULT):
+        self.time_budget_s = max(0.0, float(time_budget_ms)) / 1000.0
+        self.or_opt = bool(or_opt)
+        self.max_moves = max(0, int(max_moves))
+        # Metricas (diagnostico / benchmark)
+        self.tours = 0
+        self.tours_mejorados = 0
+        self.distancia_ahorrada = 0.0
+        self.sin_presupuesto = 0
+
+    # ------------------------------------------------------------------
+    def improve(self, dist: np.ndarray, fixed_first: bool = False,
+                closed: bool = True) -> List[int]:
+        """
+        Orden mejorado de las paradas 1..n.
+
+        Args:
+            dist: matriz (n+1)x(n+1); fila/columna 0 = arranque, i = parada i
+                  en el orden de entrada
+            fixed_first: la parada 1 queda primera
+            closed: el tour vuelve al arranque (suma el tramo final)
+
+        Returns:
+            Permutacion de range(n) (indices 0-based sobre las paradas)
+        """
+        n = dist.shape[0] - 1
+        self.tours += 1
+        if n < 2 or (fixed_first and n < 3):
+            return list(range(n))
+        d = dist.tolist()  # acceso escalar mas barato que numpy en el bucle
+        seq = list(range(n + 1))
+        if closed:
+            seq.append(0)
+        inicio = 2 if fixed_first else 1
+        ultimo = n  # ultimo indice de parada dentro de seq
+        restantes = self.max_moves
+        limite = (time.perf_counter() + self.time_budget_s
+                  if self.time_budget_s > 0 else None)
+        coste0 = self._coste(d, seq)
+
+        mejoro = True
+        while mejoro:
+            if restantes <= 0 or (limite is not None and time.perf_counter() > limite):
+                self.sin_presupuesto += 1
+                break
+            mejoro, usados = self._dos_opt(d, seq, inicio, ultimo, restantes)
+            restantes -= usados
+            if not mejoro and self.or_opt and restantes > 0:
+                mejoro, usados = self._or_opt(d, seq, inicio, ultimo, restantes)
+                restantes -= usados
+
+        coste1 = self._coste(d, seq)
+        if coste1 < coste0 - EPS_MEJORA:
+            self.tours_mejorados += 1
+            self.distancia_ahorrada += coste0 - coste1
+        return [i - 1 for i in seq[1:ultimo + 1]]
+
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _coste(d, seq: Sequence[int]) -> float:
+        return sum(d[a][b] for a, b in zip(seq, seq[1:]))
+
+    @staticmethod
+    def _dos_opt(d, seq: List[int], inicio: int, ultimo: int,
+                 restantes: int) -> Tuple[bool, int]:
+        """
+        Primera mejora 2-opt: invierte seq[i..j] (tramo de paradas movibles).
+        Evalua a lo sumo `restantes` movimientos; devuelve (mejoro, evaluados).
+        """
+        evaluados = 0
+        for i in range(inicio, ultimo):
+            a, b = seq[i - 1], seq[i]
+            dab = d[a][b]
+            for j in range(i + 1, ultimo + 1):
+                if evaluados >= restantes:
+                    return False, evaluados
+                evaluados += 1
+                c = seq[j]
+                if j + 1 < len(seq):
+                    e = seq[j + 1]
+                    delta = d[a][c] + d[b][e] - dab - d[c][e]
+                else:  # camino abierto: el tramo invertido queda al final
+                    delta = d[a][c] - dab
+                if delta < -EPS_MEJORA:
+                    seq[i:j + 1] = seq[i:j + 1][::-1]
+                    return True, evaluados
+        return False, evaluados
+
+    @staticmethod
+    def _or_opt(d, seq: List[int], inicio: int, ultimo: int,
+                restantes: int) -> Tuple[bool, int]:
+        """
+        Primera mejora Or-opt: mueve seq[i..i+L-1] entre otras dos posiciones.
+        Evalua a lo sumo `restantes` movimientos; devuelve (mejoro, evaluados).
+        """
+        evaluados = 0
+        for largo in range(1, OR_OPT_MAX + 1):
+            for i in range(inicio, ultimo - largo + 2):
+                j = i + largo - 1
+                p, s0, s1 = seq[i - 1], seq[i], seq[j]
+                nxt = seq[j + 1] if j + 1 < len(seq) else None
+                quitar = d[p][s0] + (d[s1][nxt] - d[p][nxt] if nxt is not None else 0.0)
+                # insertar entre seq[k] y seq[k+1], fuera del tramo
+                for k in range(inicio - 1, ultimo + 1):
+                    if i - 1 <= k <= j:
+                        continue
+                    if evaluados >= restantes:
+                        return False, evaluados
+                    evaluados += 1
+                    u = seq[k]
+                    v = seq[k + 1] if k + 1 < len(seq) else None
+                    poner = d[u][s0] + (d[s1][v] - d[u][v] if v is not None else 0.0)
+                    if poner - quitar < -EPS_MEJORA:
+                        tramo = seq[i:j + 1]
+                        del seq[i:j + 1]
+                        pos = k + 1 if k < i else k + 1 - largo
+                        seq[pos:pos] = tramo
+                        return True, evaluados
+        return False, evaluados
+
+
+def crear_tour_optimizer(config: Optional[dict], estrategia: str) -> Optional[TourOptimizer]:
+    """
+    TourOptimizer segun performance.route_engine para `estrategia` (None =
+    orden historico). route_engine: "local_search" (todas las estrategias) o
+    {estrategia: "sequence" | "local_search", "*": default}.
+    """
+    perf = (config or {}).get('performance', {}) or {}
+    motor = perf.get('route_engine', 'sequence')
+    if isinstance(motor, dict):
+        motor = motor.get(estrategia, motor.get('*', 'sequence'))
+    if motor != 'local_search':
+        return None
+    return TourOptimizer(time_budget_ms=float(perf.get('route_engine_budget_ms', 0.0) or 0.0),
+                         or_opt=bool(perf.get('route_engine_or_opt', True)),
+                         max_moves=int(perf.get('route_engine_max_moves', MAX_MOVES_DEFAULT)))
@@ -7,7 +7,9 @@ Digital Twin Warehouse Simulator
 import os
 import simpy
 import random
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
+
+from core.replay_wo_delta import WorkOrderDeltaEncoder
 from .order_strategies import create_order_strategy, OrderGenerationStrategy
 
 
@@ -185,7 +187,37 @@ class AlmacenMejorado:
         self.simulador = simulador
         self.visual_event_queue = visual_event_queue
         self.replay_buffer = replay_buffer
-        
+
+        # PERF-9: tablas precalculadas para el hot path de registrar_evento.
+        # Capacidad por tipo de agente (primer match gana, como el barrido
+        # lineal original) y cache de conversion grid -> pixel por celda.
+        self._capacidad_por_tipo: Dict[str, Any] = {}
+        for agent_config in configuracion.get('agent_types', []):
+            self._capacidad_por_tipo.setdefault(
+                agent_config.get('type'), agent_config.get('capacity', 150))
+        self._pixel_cache: Dict[Tuple[int, int], Tuple[Any, Any]] = {}
+        perf_cfg = configuracion.get('performance', {}) or {}
+        self._replay_compact_estado = bool(perf_cfg.get('replay_compact_estado', False))
+        # PERF-21: tramos de movimiento como UN segment_started (operators.py
+        # _recorrer_tramo) en vez de un estado_agente por celda.
+        self.movement_segments = perf_cfg.get('movement_events', 'per_cell') == 'segment'
+        # PERF-22: tramo en un solo timeout cuando no hay capa de congestion.
+        self.coarse_movement = bool(perf_cfg.get('coarse_movement', False))
+        # PERF-10: modo single-log. Con un UnifiedEventLog como replay_buffer
+        # cada evento se guarda UNA vez; replay y event_log son vistas.
+        self._single_log = bool(getattr(replay_buffer, 'is_unified', False))
+        if self._single_log:
+            replay_buffer.replay_builder = self._replay_evento
+        # PERF-23: work_order_update en delta (core/replay_wo_delta.py). Con
+        # single-log el replay se deriva en cada lectura del log (jsonl,
+        # columnar) y el delta depende del orden: ahi no aplica.
+        self.wo_delta_encoder = None
+        if perf_cfg.get('wo_update_delta', False):
+            if self._single_log:
+                print("[REPLAY][WARN] performance.wo_update_delta no aplica con "
+                      "single_event_log; se emiten updates completos")
+            else:
+                self.wo_delta_encoder = WorkOrderDeltaEncoder()
 
         # Inventory and catalog
         self.catalogo_skus: Dict[str, SKU] = {}
@@ -247,7 +279,12 @@ class AlmacenMejorado:
             from .reservation_table import ReservationTable
             from .spacetime_planner import SpaceTimePlanner
             self.reservation_table = ReservationTable(
-                clearance=float(tw_cfg.get('clearance', 0.0))
+                clearance=float(tw_cfg.get('clearance', 0.0)),
+                # PERF-24: consultas por bisect sobre indices por celda
+                indexed=bool(perf_cfg.get('reservation_index', False)),
+                # PERF-25: indice inverso por agente + heap de vencimientos
+                expiry_index=bool(perf_cfg.get('reservation_expiry_index', False)),
+                purge_horizon=perf_cfg.get('reservation_purge_horizon'),
             )
             if pathfinder is not None:
                 self.spacetime_planner = SpaceTimePlanner(
@@ -351,6 +388,10 @@ class AlmacenMejorado:
                             _f2d_blocked += 1
                 print(f"[OUTBOUND] F2.d: {_f2d_blocked} celdas de staging "
                       f"marcadas no-caminables en collision_matrix.")
+                # PERF-3/4: los motores array/JPS copian la grilla al crearse.
+                _refresh = getattr(self.pathfinder, 'refresh_walkability', None)
+                if _refresh is not None:
+                    _refresh()
         else:
             print("[OUTBOUND] desactivado (enabled:false) - comportamiento actual.")
 
@@ -439,7 +480,9 @@ class AlmacenMejorado:
         self.tareas_completadas_count = 0      # Legacy picking tasks counter
 
         # Event log for analytics
-        self.event_log: List[Dict[str, Any]] = []
+        # PERF-10: en modo single-log es una vista del UnifiedEventLog
+        self.event_log: List[Dict[str, Any]] = (
+            replay_buffer.analytics_events() if self._single_log else [])
 
         # Agent configuration
         self.num_operarios_total = configuracion.get('num_operarios_total', 3)
@@ -1024,6 +1067,8 @@ class AlmacenMejorado:
 
         wo.pallet_ready = True
         wo.tiempo_pallet_listo = float(self.env.now)
+        # PERF-13: el putaway recien elegible despierta a los ociosos.
+        self.dispatcher.notificar_trabajo_disponible()
 
     def tomar_pallet_inbound(self, pallet_id: str):
         """F2: saca el pallet del buffer del muelle (el operario lo cargo)."""
@@ -1047,7 +1092,8 @@ class AlmacenMejorado:
                 and hasattr(self.data_manager, 'add_stock')):
             result = self.data_manager.add_stock(location_id, qty,
                                                  sim_now=self.env.now)
-            if result is not None:
+            if result is not None and getattr(self.data_manager, 'inventory_ledger',
+                                              None) is None:
                 print(f"[STOCK] Putaway {wo.id}: +{qty}u en {location_id} "
                       f"({wo.sku_id}) -> avail={result[0]}")
 
@@ -1111,7 +1157,8 @@ class AlmacenMejorado:
             return  # stochastic WO (no real location) or nothing to consume
 
         result = self.data_manager.consume_stock(location_id, qty, sim_now=sim_now)
-        if result is not None:
+        # PERF-19: con el ledger en memoria, sin una linea de consola por pick.
+        if result is not None and getattr(self.data_manager, 'inventory_ledger', None) is None:
             new_avail, new_reserved = result
             print(f"[STOCK] Pick {wo.id}: {qty}u de {location_id} "
                   f"({wo.sku_id}) -> avail={new_avail}, reserved={new_reserved}")
@@ -1155,17 +1202,39 @@ class AlmacenMejorado:
         """Increment picking tasks completed counter (legacy)"""
         self.tareas_completadas_count += 1
 
+    def _pixel_de(self, position) -> Tuple[Any, Any]:
+        """PERF-9: grid -> pixel cacheado por celda (mismo fallback que antes)."""
+        if not (self.layout_manager and position):
+            return 0, 0
+        celda = (position[0], position[1])
+        pixel = self._pixel_cache.get(celda)
+        if pixel is None:
+            try:
+                pixel_x, pixel_y = self.layout_manager.grid_to_pixel(celda[0], celda[1])
+                pixel = (pixel_x, pixel_y)
+            except Exception as e:
+                print(f"[WARNING] Error calculating pixel coordinates from {position}: {e}")
+                pixel = (celda[0] * 32, celda[1] * 32)  # Fallback
+            self._pixel_cache[celda] = pixel
+        return pixel
+
     def registrar_evento(self, tipo: str, datos: Dict[str, Any]):
         """
         Register an event in the event log for analytics and replay buffer
 
         BUGFIX JSONL: Ahora tambien escribe eventos al replay_buffer para
         generacion de archivos .jsonl
+        PERF-10: en modo single-log se guarda una sola representacion
+        (timestamp, tipo, datos); event_log y replay se derivan de ella.
 
         Args:
             tipo: Event type (e.g., 'task_completed', 'agent_moved')
             datos: Event data dictionary
         """
+        if self._single_log:
+            self.replay_buffer.add_record(self.env.now, tipo, datos)
+            return
+
         evento = {
             'timestamp': self.env.now,
             'tipo': tipo,
@@ -1175,67 +1244,69 @@ class AlmacenMejorado:
         
         # BUGFIX JSONL: Tambien agregar al replay_buffer para generacion de .jsonl
         if self.replay_buffer is not None:
-            # Convertir formato para replay (tipo -> type)
-            if tipo == 'estado_agente':
-                # FIX REPLAY VIEWER: Usar estructura compatible con replay viewer
-                # Estructura: {type, timestamp, agent_id, data: {...}}
-                agent_id = datos.get('agent_id', 'unknown')
-                
-                # Calcular coordenadas pixel desde position (grid coordinates)
-                position = datos.get('position', [0, 0])
-                pixel_x, pixel_y = 0, 0
-                if self.layout_manager and position:
-                    try:
-                        pixel_x, pixel_y = self.layout_manager.grid_to_pixel(position[0], position[1])
-                    except Exception as e:
-                        print(f"[WARNING] Error calculating pixel coordinates from {position}: {e}")
-                        pixel_x, pixel_y = position[0] * 32, position[1] * 32  # Fallback
-                
-                # Obtener capacidad real del operario desde configuracion
-                agent_type = datos.get('agent_type', 'Unknown')
-                capacidad_real = 150  # Default
-                
-                # Buscar capacidad en configuracion por tipo de agente
-                agent_types_config = self.configuracion.get('agent_types', [])
-                for agent_config in agent_types_config:
-                    if agent_config.get('type') == agent_type:
-                        capacidad_real = agent_config.get('capacity', 150)
-                        break
-                
-                replay_evento = {
-                    'type': tipo,
-                    'timestamp': self.env.now,
-                    'agent_id': agent_id,
-                    'data': {
-                        'x': pixel_x,  # CRITICAL: Coordenadas pixel para replay viewer
-                        'y': pixel_y,  # CRITICAL: Coordenadas pixel para replay viewer
-                        'tipo': datos.get('tipo', 'unknown'),
-                        'position': position,
-                        'status': datos.get('status', 'idle'),
-                        'current_task': datos.get('current_task'),
-                        'current_work_area': datos.get('current_work_area'),
-                        'cargo_volume': datos.get('cargo_volume', 0),
-                        # Campos adicionales para compatibilidad
-                        'accion': f"Estado: {datos.get('status', 'idle')}",
-                        'tareas_completadas': 0,
-                        'direccion_x': 0,
-                        'direccion_y': 0,
-                        'type': datos.get('tipo', 'unknown'),
-                        'tour_tasks_completed': 0,
-                        'tour_total_tasks': 0,
-                        'current_item': 'N/A',
-                        'carga': datos.get('cargo_volume', 0),
-                        'capacidad': capacidad_real  # Usar capacidad real desde config.json
-                    }
-                }
+            self.replay_buffer.add_event(self._replay_evento(self.env.now, tipo, datos))
+
+    def _replay_evento(self, timestamp, tipo: str, datos: Dict[str, Any]) -> Dict[str, Any]:
+        """Forma de replay de un evento registrado (PERF-10: tambien la usa
+        UnifiedEventLog al volcar)."""
+        # Convertir formato para replay (tipo -> type)
+        if tipo == 'estado_agente':
+            # FIX REPLAY VIEWER: Usar estructura compatible con replay viewer
+            # Estructura: {type, timestamp, agent_id, data: {...}}
+            agent_id = datos.get('agent_id', 'unknown')
+            
+            # Calcular coordenadas pixel desde position (grid coordinates)
+            position = datos.get('position', [0, 0])
+            pixel_x, pixel_y = self._pixel_de(position)
+
+            # Capacidad real del operario (PERF-9: tabla precalculada)
+            capacidad_real = self._capacidad_por_tipo.get(
+                datos.get('agent_type', 'Unknown'), 150)
+
+            status = datos.get('status', 'idle')
+            cargo_volume = datos.get('cargo_volume', 0)
+            data = {
+                'x': pixel_x,  # CRITICAL: Coordenadas pixel para replay viewer
+                'y': pixel_y,  # CRITICAL: Coordenadas pixel para replay viewer
+                'tipo': datos.get('tipo', 'unknown'),
+                'position': position,
+                'status': status,
+                'current_task': datos.get('current_task'),
+                'current_work_area': datos.get('current_work_area'),
+                'cargo_volume': cargo_volume,
+            }
+            if self._replay_compact_estado:
+                # PERF-9: sin campos legacy constantes/redundantes
+                data['capacidad'] = capacidad_real
             else:
-                # Para otros tipos de eventos, mantener estructura original
-                replay_evento = {
-                    'type': tipo,
-                    'timestamp': self.env.now,
-                    **datos
-                }
-            self.replay_buffer.add_event(replay_evento)
+                # Campos adicionales para compatibilidad
+                data['accion'] = f"Estado: {status}"
+                data['tareas_completadas'] = 0
+                data['direccion_x'] = 0
+                data['direccion_y'] = 0
+                data['type'] = data['tipo']
+                data['tour_tasks_completed'] = 0
+                data['tour_total_tasks'] = 0
+                data['current_item'] = 'N/A'
+                data['carga'] = cargo_volume
+                data['capacidad'] = capacidad_real  # Usar capacidad real desde config.json
+
+            replay_evento = {
+                'type': tipo,
+                'timestamp': timestamp,
+                'agent_id': agent_id,
+                'data': data
+            }
+        else:
+            if tipo == 'work_order_update' and self.wo_delta_encoder is not None:
+                datos = self.wo_delta_encoder.encode(datos)  # PERF-23
+            # Para otros tipos de eventos, mantener estructura original
+            replay_evento = {
+                'type': tipo,
+                'timestamp': timestamp,
+                **datos
+            }
+        return replay_evento
 
     def __repr__(self):
         return (f"AlmacenMejorado(ordenes={self.total_ordenes}, "
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""
+PERF-14: dobles livianos del almacen/dispatcher para ejercitar los drivers
+de la corrida de EventGenerator (_ejecutar_por_tramos / _ejecutar_run_unico)
+sin layout ni almacen real. Los comparten tests/unit/test_run_loop.py y
+scripts/bench_run_loop.py.
+"""
+import simpy
+
+from engines.event_generator import EventGenerator
+
+
+class FakeDespacho:
+    """Lo que leen los drivers: WOs totales/completadas y operarios activos."""
+
+    def __init__(self, total):
+        self.lista_maestra_work_orders = list(range(total))
+        self.work_orders_completados = []
+        self.operadores_activos = {}
+
+    def obtener_estadisticas(self):
+        return {"completados": len(self.work_orders_completados),
+                "total": len(self.lista_maestra_work_orders)}
+
+
+class FakeAlmacen:
+    def __init__(self, total):
+        self.dispatcher = FakeDespacho(total)
+
+    def simulacion_ha_terminado(self):
+        d = self.dispatcher
+        return (len(d.work_orders_completados) >= len(d.lista_maestra_work_orders)
+                and not d.operadores_activos)
+
+
+def fake_generator(total):
+    """EventGenerator minimo (sin __init__) sobre un env nuevo y FakeAlmacen."""
+    gen = EventGenerator.__new__(EventGenerator)
+    gen.env, gen.almacen = simpy.Environment(), FakeAlmacen(total)
+    return gen
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+PERF-15 / BA-xx: asignacion por lote (Hungaro) de la primera WO.
+Contrato: distance_vector == _calculate_distance elemento a elemento (con y
+sin oraculo); optimal_assignment minimiza la suma (fuerza bruta) y el lote del
+dispatcher reparte primeras WOs DISTINTAS entre los ociosos del instante
+(batch_window 0) o entre los que pidieron dentro de la ventana (BA04).
+"""
+import itertools
+import random
+
+import pytest
+import simpy
+
+from subsystems.simulation.assignment_calculator import AssignmentCostCalculator
+from subsystems.simulation.distance_oracle import DistanceOracle
+from subsystems.simulation.pathfinder import Pathfinder
+
+
+class _Op:
+    def __init__(self, op_id, pos, prios=None, capacity=150):
+        self.type, self.id, self.status = "GroundOperator", op_id, "idle"
+        self.current_position = pos
+        self.capacity = capacity
+        self.work_area_priorities = prios or {"Area_Ground": 1}
+
+    def get_priority_for_work_area(self, area):
+        return self.work_area_priorities.get(area, 999)
+
+    def can_handle_work_area(self, area):
+        return area in self.work_area_priorities
+
+
+def test_ba01_distance_vector_igual_al_escalar():
+    w, h = 9, 6
+    m = [[True] * w for _ in range(h)]
+    for y in range(0, 5):
+        m[y][4] = False
+    calc = AssignmentCostCalculator(None)
+    rng = random.Random(5)
+    destinos = [(rng.randint(-1, w), rng.randint(0, h - 1)) for _ in range(40)]
+    for oraculo in (None, DistanceOracle(m, destinos[:20] + [(0, 0)], pathfinder=Pathfinder(m))):
+        calc.distance_oracle = oraculo
+        for origen in [(0, 0), (8, 0), (4, 2), (3, 3)] + destinos[:3]:
+            esperado = [calc._calculate_distance(origen, d) for d in destinos]
+            assert calc.distance_vector(origen, destinos).tolist() == esperado
+
+
+def test_ba02_optimo_igual_a_fuerza_bruta(make_wo):
+    calc = AssignmentCostCalculator(None)
+    rng = random.Random(11)
+    for _ in range(30):
+        ops = [_Op("GO-%d" % i, (rng.randint(0, 30), rng.randint(0, 30)),
+                   {"A": 1, "B": rng.choice([1, 20])}) for i in range(rng.randint(2, 4))]
+        wos = [make_wo(work_area=rng.choice("AB"),
+                       ubicacion=(rng.randint(0, 30), rng.randint(0, 30)))
+               for _ in range(rng.randint(2, 6))]
+        cands = [[wo for wo in wos if rng.random() < 0.8] for _ in ops]
+        pos = [op.current_position for op in ops]
+        res = calc.optimal_assignment(ops, cands, pos)
+        assert len(set(map(id, res.values()))) == len(res)
+        assert all(res[i] in cands[i] for i in res)
+
+        def coste(i, wo):
+            return calc.calculate_cost(ops[i], wo, pos[i]).total_cost
+        mejor = None
+        for perm in itertools.permutations(wos + [None] * len(ops), len(ops)):
+            pares = [(i, wo) for i, wo in enumerate(perm) if wo is not None and wo in cands[i]]
+            clave = (-len(pares), sum(coste(i, wo) for i, wo in pares))
+            mejor = clave if mejor is None or clave < mejor else mejor
+        assert -len(res) == mejor[0]
+        assert sum(coste(i, wo) for i, wo in res.items()) == pytest.approx(mejor[1])
+
+
+def test_ba03_lote_del_dispatcher_reparte_primeras(make_dispatcher, make_wo):
+    disp = make_dispatcher({"dispatch_strategy": "Optimizacion Global",
+                            "performance": {"batch_assignment": True, "batch_window": 0}})
+    disp.assignment_calculator = AssignmentCostCalculator(None)
+    a, b = _Op("GO-1", (0, 0)), _Op("GO-2", (2, 0))
+    disp.operadores_disponibles = [a, b]
+    cerca, lejos = make_wo(ubicacion=(1, 0)), make_wo(ubicacion=(10, 0))
+    disp.work_orders_pendientes = [lejos, cerca]
+    # greedy: ambos elegirian `cerca`; el lote minimiza 1 + 8 (no 1 + 10).
+    assert disp._encontrar_mejor_primera_wo(b, [lejos, cerca]) is cerca
+    assert disp._primera_wo_por_lote(a, [lejos, cerca]) is cerca
+    assert disp._reservadas_por_otros(a) == {lejos}
+    assert disp._primera_wo_por_lote(b, [lejos, cerca]) is lejos
+    assert disp.total_lotes_asignacion == 1
+    # un solo ocioso => None (camino greedy historico)
+    disp._lote_t = None
+    disp.operadores_disponibles = [a]
+    assert disp._primera_wo_por_lote(a, [lejos, cerca]) is None
+
+
+def test_ba04_ventana_junta_pedidos_de_instantes_distintos(make_dispatcher, make_wo):
+    env = simpy.Environment()
+    disp = make_dispatcher({"dispatch_strategy": "Optimizacion Global",
+                            "performance": {"batch_assignment": True, "batch_window": 1.0}},
+                           env=env)
+    disp.assignment_calculator = AssignmentCostCalculator(None)
+    a, b = _Op("GO-1", (0, 0)), _Op("GO-2", (2, 0))
+    disp.operadores_disponibles = [a, b]
+    cerca, lejos = make_wo(ubicacion=(1, 0)), make_wo(ubicacion=(10, 0))
+    disp.work_orders_pendientes = [lejos, cerca]
+    cands = [lejos, cerca]
+
+    env.run(until=0.2)
+    assert disp._diferir_al_lote(a)            # abre la ventana (cierra en 1.2)
+    env.run(until=0.7)
+    assert disp._diferir_al_lote(b) and disp._esperando_lote(b)
+    despertar = disp.esperar_trabajo()         # modo event: duermen hasta el cierre
+    # Greedy en orden de llegada: los dos quieren `cerca` (1 + 10 en vez de 1 + 8).
+    assert disp._encontrar_mejor_primera_wo(a, cands) is cerca
+    assert disp._encontrar_mejor_primera_wo(b, cands) is cerca
+    env.run(until=1.5)
+    assert despertar.triggered and disp.total_lotes_asignacion == 1
+    assert not disp._esperando_lote(a) and not disp._esperando_lote(b)
+    # El lote (Hungaro) no depende de quien vuelve primero a pedir.
+    assert not disp._diferir_al_lote(b)
+    assert disp._primera_wo_por_lote(b, cands) is lejos
+    assert disp._reservadas_por_otros(b) == {cerca}
+    assert not disp._diferir_al_lote(a)
+    assert disp._primera_wo_por_lote(a, cands) is cerca
+
+    # Solo en la ventana => al cierre queda liberado al greedy (sin lote).
+    assert disp._diferir_al_lote(a)
+    env.run(until=3.0)
+    assert disp.total_lotes_asignacion == 1
+    assert not disp._diferir_al_lote(a)
+    assert disp._primera_wo_por_lote(a, cands) is None
+    assert disp._diferir_al_lote(a)            # el proximo pedido vuelve a esperar
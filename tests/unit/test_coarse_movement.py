@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+PERF-22 / CM-xx: movimiento grueso (performance.coarse_movement).
+Contrato: sin capa de congestion, el tramo avanza con UN env.timeout (mas
+un paso por celda al final en los empates de redondeo), llega en el MISMO
+instante que el lazo por celda, bit a bit, emite los mismos eventos que el
+tramo compacto (PERF-21) y current_position, leida por otro proceso a mitad
+de camino, es la celda que tendria el lazo por celda. Tramos que piden
+eventos por celda (sin segment_event) siguen paso a paso.
+
+Operario sin layout (object.__new__) y almacen de juguete.
+"""
+import random
+
+import simpy
+
+from subsystems.simulation.operators import GroundOperator
+
+CAMINO = [(0, 0)] + [(x, 0) for x in range(1, 8)] + [(7, y) for y in range(1, 6)]
+
+
+class _Almacen:
+    def __init__(self, grueso, segmentos=True):
+        self.congestion_manager = None
+        self.coarse_movement = grueso
+        self.movement_segments = segmentos
+        self.eventos = []
+
+    def registrar_evento(self, tipo, datos):
+        self.eventos.append((tipo, dict(datos)))
+
+
+def _correr(grueso, con_segmento=True):
+    env = simpy.Environment()
+    op = object.__new__(GroundOperator)
+    op.env, op.almacen = env, _Almacen(grueso)
+    op.id, op.type, op.status, op.cargo_volume = "GO-1", "GroundOperator", "moving", 0
+    op.vc_enabled = False
+    op.current_position = CAMINO[0]
+    pasos, vistas = [], []
+
+    def _on_before(i, celda):
+        op.almacen.registrar_evento("estado_agente", {"position": op.current_position})
+
+    def _tramo(env):
+        yield env.timeout(0.3)
+        yield from op._recorrer_tramo(
+            CAMINO, 1.0, on_before=_on_before,
+            on_after=lambda i, c: pasos.append(i), time_per_cell=0.1,
+            segment_event=op._campos_segmento("WO-1") if con_segmento else None)
+        vistas.append(("fin", env.now, op.current_position))
+
+    def _observador(env):
+        for k in range(40):
+            yield env.timeout(0.05 if k else 0.325)
+            vistas.append((round(env.now, 6), op.current_position))
+
+    env.process(_tramo(env))
+    env.process(_observador(env))
+    env.run()
+    return env, op, pasos, vistas
+
+
+def test_cm01_un_timeout_misma_trayectoria():
+    env_c, op_c, pasos_c, vistas_c = _correr(grueso=False)
+    env_g, op_g, pasos_g, vistas_g = _correr(grueso=True)
+    assert vistas_g == vistas_c                 # mismas celdas en cada instante
+    assert op_g.almacen.eventos == op_c.almacen.eventos
+    assert [t for t, _ in op_g.almacen.eventos] == ["estado_agente", "segment_started"]
+    assert pasos_c == list(range(1, len(CAMINO))) and pasos_g == [len(CAMINO) - 1]
+    assert op_g.current_position == CAMINO[-1] and op_g._tramo_grueso is None
+
+
+def test_cm02_eventos_por_celda_siguen_paso_a_paso():
+    _, op_c, pasos_c, _ = _correr(grueso=False, con_segmento=False)
+    _, op_g, pasos_g, _ = _correr(grueso=True, con_segmento=False)
+    assert pasos_g == pasos_c
+    assert len(op_g.almacen.eventos) == len(CAMINO) - 1
+    assert op_g.almacen.eventos == op_c.almacen.eventos
+
+
+def test_cm03_llegada_exacta_bit_a_bit():
+    # t0 chicos y dt arbitrarios: timeout(t - t0) erraba el ultimo bit (~5%)
+    rng = random.Random(4)
+    for _ in range(400):
+        arranque, dt, n = rng.uniform(0.0, 2.0), rng.uniform(0.01, 1.0), rng.randint(2, 40)
+        camino = [(x, 0) for x in range(n + 1)]
+        fines = []
+        for grueso in (False, True):
+            env = simpy.Environment()
+            op = object.__new__(GroundOperator)
+            op.env, op.almacen = env, _Almacen(grueso)
+            op.id, op.type, op.status, op.cargo_volume = "GO-1", "GroundOperator", "moving", 0
+            op.vc_enabled = False
+            op.current_position = camino[0]
+
+            def _tramo(env, op=op):
+                yield env.timeout(arranque)
+                yield from op._recorrer_tramo(camino, 1.0, time_per_cell=dt,
+                                              segment_event=op._campos_segmento("WO-1"))
+
+            env.process(_tramo(env))
+            env.run()
+            fines.append((env.now, op.current_position))
+        assert fines[1] == fines[0]
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+PERF-16 / CV-xx: AssignmentCostCalculator.calculate_cost_vector.
+Contrato: el vector es IGUAL (float exacto) a calculate_cost(...).total_cost
+por candidata, con y sin oraculo, y las caches se invalidan si cambia el
+oraculo. find_best_assignment devuelve el mismo par que el barrido escalar.
+"""
+import random
+
+from subsystems.simulation.assignment_calculator import AssignmentCostCalculator
+from subsystems.simulation.distance_oracle import DistanceOracle
+
+PRIORIDADES = {"A": 1, "B": 20}  # "C" => 999 (incompatible)
+
+
+class _Op:
+    def __init__(self, op_id, pos):
+        self.id, self.current_position = op_id, pos
+
+    def get_priority_for_work_area(self, area):
+        return PRIORIDADES.get(area, 999)
+
+
+def _grid(w=12, h=8, pared=5):
+    m = [[True] * w for _ in range(h)]
+    for y in range(h - 1):
+        m[y][pared] = False
+    return m
+
+
+def _wos(make_wo, n, seed, w=12, h=8):
+    rng = random.Random(seed)
+    return [make_wo(work_area=rng.choice("ABC"), ubicacion=(rng.randrange(w), rng.randrange(h)))
+            for _ in range(n)]
+
+
+def test_cv01_vector_igual_a_calculate_cost(make_wo):
+    calc = AssignmentCostCalculator(None)
+    wos = _wos(make_wo, 60, 2)
+    oraculos = [None, DistanceOracle(_grid(), [wo.ubicacion for wo in wos[:40]]),
+                DistanceOracle(_grid(pared=3), [(0, 0)])]
+    for oraculo in oraculos:
+        calc.distance_oracle = oraculo
+        for pos in [(0, 0), (11, 0), (5, 7), wos[0].ubicacion, (5, 2)]:
+            op = _Op("GO-1", pos)
+            esperado = [calc.calculate_cost(op, wo).total_cost for wo in wos]
+            for _ in range(2):  # segunda pasada: caches calientes
+                v = calc.calculate_cost_vector(op, [wo.ubicacion for wo in wos],
+                                               [wo.work_area for wo in wos])
+                assert v.tolist() == esperado
+    assert len(calc._column_cache) <= calc.ORIGIN_COLUMN_CACHE
+
+
+def test_cv02_find_best_assignment_igual_al_barrido(make_wo):
+    calc = AssignmentCostCalculator(None)
+    wos = _wos(make_wo, 30, 9)
+    for wo in wos[::4]:
+        wo.status = "assigned"
+    calc.distance_oracle = DistanceOracle(_grid(), [wo.ubicacion for wo in wos])
+    ops = [_Op("GO-%d" % i, (i * 3, i)) for i in range(4)]
+    mejor, par = float("inf"), None
+    for op in ops:
+        for wo in wos:
+            if getattr(wo, "status", "released") == "released":
+                c = calc.calculate_cost(op, wo).total_cost
+                if c < mejor:
+                    mejor, par = c, (op, wo)
+    op, wo, res = calc.find_best_assignment(ops, wos)
+    assert (op, wo) == par and res.total_cost == mejor
+    assert res.breakdown["work_order_id"] == wo.id
+    assert calc.find_best_assignment(ops, []) is None
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+PERF-1 / DO-xx: oraculo de distancias precalculadas (distance_oracle.py).
+Contrato: misma metrica que el A* del Pathfinder (coste octile del camino
+optimo), O(1) con una fuente en el par, fallback A* para celdas arbitrarias,
+y el calculador de costos sin oraculo queda en Manhattan (historico).
+
+Grilla de juguete (sin TMX, sin SimPy), salvo DO08: arma la simulacion
+canonica con outbound on (sin correrla) para verificar el orden de armado.
+"""
+import numpy as np
+import pytest
+
+from subsystems.simulation.pathfinder import Pathfinder
+from subsystems.simulation.route_calculator import RouteCalculator
+from subsystems.simulation.distance_oracle import DistanceOracle
+from subsystems.simulation.assignment_calculator import AssignmentCostCalculator
+from core.config_schema import validate_config_schema
+
+
+def _grid():
+    """7x5 con una pared vertical en x=3 (hueco solo en y=4)."""
+    w, h = 7, 5
+    m = [[True] * w for _ in range(h)]
+    for y in range(0, 4):
+        m[y][3] = False
+    return m
+
+
+def _path_cost(rc, path):
+    return rc.calculate_path_distance(path)
+
+
+class _Op:
+    id = "OP-1"
+    current_position = (0, 0)
+
+    def get_priority_for_work_area(self, area):
+        return 1
+
+
+class _WO:
+    id = "WO-1"
+    work_area = "Area_Ground"
+
+    def __init__(self, ubicacion):
+        self.ubicacion = ubicacion
+
+
+def test_do01_distancias_iguales_al_astar():
+    m = _grid()
+    pf = Pathfinder(m)
+    rc = RouteCalculator(pf)
+    sources = [(0, 0), (6, 0)]
+    oracle = DistanceOracle(m, sources, pathfinder=pf)
+    for src in sources:
+        for y in range(5):
+            for x in range(7):
+                if not m[y][x] or (x, y) == src:
+                    continue
+                esperado = _path_cost(rc, pf.find_path(src, (x, y)))
+                assert oracle.lookup(src, (x, y)) == pytest.approx(esperado, abs=1e-4)
+                # simetria: la fuente como destino
+                assert oracle.lookup((x, y), src) == pytest.approx(esperado, abs=1e-4)
+
+
+def test_do02_fallback_astar_solo_para_celdas_arbitrarias():
+    m = _grid()
+    pf = Pathfinder(m)
+    oracle = DistanceOracle(m, [(0, 0)], pathfinder=pf)
+    assert oracle.lookup((1, 1), (5, 1)) is None
+    d = oracle.distance((1, 1), (5, 1))
+    assert d is not None and d > 4.0  # rodea la pared
+    assert oracle.fallbacks == 1
+    oracle.distance((0, 0), (6, 4))
+    assert oracle.fallbacks == 1  # par con fuente: sin A*
+
+
+def test_do03_inalcanzable_devuelve_none():
+    m = _grid()
+    m[4][3] = False  # cierra el hueco
+    oracle = DistanceOracle(m, [(0, 0)])
+    assert oracle.distance((0, 0), (6, 0)) is None
+
+
+def test_do04_calculador_usa_oraculo_y_sin_el_manhattan():
+    m = _grid()
+    pf = Pathfinder(m)
+    calc = AssignmentCostCalculator(None)
+    wo = _WO((6, 0))
+    assert calc.calculate_cost(_Op(), wo).breakdown['distance'] == 6.0
+    calc.distance_oracle = DistanceOracle(m, [(6, 0)], pathfinder=pf)
+    d = calc.calculate_cost(_Op(), wo).breakdown['distance']
+    assert d > 6.0  # la pared obliga a bajar hasta y=4
+
+
+def test_do05_greedy_nn_con_oraculo_usa_distancia_real():
+    m = _grid()
+    pf = Pathfinder(m)
+    cerca_euclidea = _WO((4, 0))  # al otro lado de la pared
+    cerca_real = _WO((0, 3))
+    rc = RouteCalculator(pf)
+    assert rc.calculate_greedy_nearest_neighbor((2, 0), [cerca_real, cerca_euclidea])[0] \
+        is cerca_euclidea
+    rc.distance_oracle = DistanceOracle(m, [(4, 0), (0, 3)], pathfinder=pf)
+    assert rc.calculate_greedy_nearest_neighbor((2, 0), [cerca_real, cerca_euclidea])[0] \
+        is cerca_real
+
+
+def test_do06_clave_performance_registrada_en_esquema():
+    errors, warnings = validate_config_schema({"performance": {"distance_oracle": True}})
+    assert errors == [] and warnings == []
+    errors, warnings = validate_config_schema({"performance": {"distance_oraculo": True}})
+    assert any("performance.distance_oraculo" in w for w in warnings)
+
+
+def test_do07_fallback_sin_scipy_da_la_misma_matriz(monkeypatch):
+    import sys
+    m = _grid()
+    sources = [(0, 0), (6, 4), (2, 2)]
+    con_scipy = DistanceOracle(m, sources).dist
+    monkeypatch.setitem(sys.modules, "scipy.sparse.csgraph", None)
+    sin_scipy = DistanceOracle(m, sources).dist
+    # assert_allclose trata inf == inf (celdas inalcanzables) como iguales.
+    np.testing.assert_allclose(sin_scipy, con_scipy, atol=1e-4)
+
+
+def test_do08_oraculo_sobre_la_grilla_final_con_outbound(tmp_path, monkeypatch):
+    # F2.d (outbound on) bloquea el staging al crear AlmacenMejorado: el
+    # oraculo debe calcularse DESPUES, sobre la grilla que ve el pathfinder.
+    import json
+    import os
+    from engines.event_generator import EventGenerator
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+    monkeypatch.chdir(root)
+    with open(os.path.join(root, "config.json"), encoding="utf-8") as f:
+        cfg = json.load(f)
+    cfg["outbound"]["enabled"] = True
+    cfg.setdefault("performance", {})["distance_oracle"] = True
+    ruta = tmp_path / "config.json"
+    ruta.write_text(json.dumps(cfg), encoding="utf-8")
+
+    gen = EventGenerator(config_path=str(ruta))
+    assert gen.crear_simulacion()
+    final = [list(row) for row in gen.layout_manager.collision_matrix]
+    bloqueadas = [s.cell for z in gen.almacen.staging_zones.values() for s in z.slots]
+    assert bloqueadas and not any(final[y][x] for x, y in bloqueadas)
+    esperado = DistanceOracle(final, list(gen.distance_oracle.index))
+    np.testing.assert_array_equal(gen.distance_oracle.dist, esperado.dist)
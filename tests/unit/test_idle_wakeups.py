@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""
+PERF-13 / IW-xx: despertar por evento de operarios ociosos (DispatcherV11).
+Contrato: en modo "event" un ocioso en esperar_trabajo() despierta en el
+mismo instante en que llegan WOs, se libera una ola o termina un tour; en
+modo "poll" (default) nadie crea el evento y notificar es no-op.
+"""
+import simpy
+
+
+def _ocioso(env, disp, despertares):
+    while len(despertares) < 3:
+        yield disp.esperar_trabajo()
+        despertares.append(env.now)
+
+
+def test_iw01_despierta_en_altas_olas_y_fin_de_tour(make_dispatcher, make_wo, make_operator):
+    env = simpy.Environment()
+    disp = make_dispatcher({"performance": {"idle_wakeups": "event"},
+                            "waves": {"enabled": True, "release_times": {"1": 40, "2": 0}}},
+                           env=env)
+    despertares = []
+    env.process(_ocioso(env, disp, despertares))
+    env.process(disp.dispatcher_process([]))
+
+    def productor(env):
+        yield env.timeout(5)
+        disp.agregar_work_orders([make_wo(wave_id=1)])
+        yield env.timeout(60)
+        op = make_operator()
+        op.type, op.id = "GroundOperator", "GO-1"
+        disp.finalizar_tour(op)
+    env.process(productor(env))
+    env.run(until=100)
+    assert despertares == [5, 40, 65]
+    assert disp.total_despertares == 3
+
+
+def test_iw02_poll_por_defecto(make_dispatcher, make_wo):
+    disp = make_dispatcher()
+    assert disp.idle_wakeups == "poll" and not disp.despertar_por_evento
+    disp.agregar_work_orders([make_wo()])
+    assert disp._evento_trabajo is None and disp.total_despertares == 0
+    assert make_dispatcher({"performance": {"idle_wakeups": "otro"}}).idle_wakeups == "poll"
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+PERF-20 / BS-xx: reservas e inventario base en bloque (DataManager).
+Contrato: commit_reservations y restore_inventory_baseline con
+bulk_inventory_sql dejan la tabla inventory IDENTICA al SQL historico
+(reset previo incluido, ubicaciones desconocidas ignoradas).
+
+DB SQLite de juguete en tmp_path (no toca warehouse.db).
+"""
+import sqlite3
+
+from subsystems.simulation.data_manager import DataManager
+
+
+def _db(path):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE inventory (location_id TEXT PRIMARY KEY, sku_code TEXT, "
+                 "qty_available INTEGER, qty_reserved INTEGER, last_updated REAL)")
+    conn.executemany("INSERT INTO inventory VALUES (?, 'SKU', ?, ?, NULL)",
+                     [("L-%02d" % i, 10 + i, i % 3) for i in range(12)])
+    conn.commit()
+    conn.close()
+    return str(path)
+
+
+def _dm(path, bulk):
+    dm = DataManager.__new__(DataManager)
+    dm.db_path, dm.inventory_ledger, dm.bulk_inventory_sql = path, None, bulk
+    return dm
+
+
+def _tabla(path):
+    conn = sqlite3.connect(path)
+    filas = conn.execute("SELECT * FROM inventory ORDER BY location_id").fetchall()
+    conn.close()
+    return filas
+
+
+def test_bs01_bulk_igual_al_sql_historico(tmp_path):
+    a, b = _db(tmp_path / "a.db"), _db(tmp_path / "b.db")
+    viejo, nuevo = _dm(a, False), _dm(b, True)
+    pasos = [{"L-01": 4, "L-07": 2, "NOPE": 9, "L-03": 0},
+             {"L-02": 1},
+             {}]
+    for reservas in pasos:
+        assert viejo.commit_reservations(reservas) and nuevo.commit_reservations(reservas)
+        assert _tabla(b) == _tabla(a)
+    viejo.consume_stock("L-05", 3, sim_now=1.0)
+    nuevo.consume_stock("L-05", 3, sim_now=1.0)
+    for dm in (viejo, nuevo):
+        assert dm.commit_reservations({"L-05": 2}) and dm.restore_inventory_baseline()
+    assert _tabla(b) == _tabla(a)
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+PERF-19 / IL-xx: inventario en memoria con escritura diferida.
+Contrato: la misma secuencia de consume_stock/add_stock deja la tabla
+inventory IDENTICA por el camino SQLite por llamada y por el ledger (tras
+flush_inventory), con los mismos retornos; sin flush el ledger no escribe,
+con flush_every vuelca por checkpoints, y el SQL masivo (restore/commit de
+reservas) ve los movimientos pendientes.
+
+DB SQLite de juguete en tmp_path (no toca warehouse.db).
+"""
+import random
+import sqlite3
+
+from subsystems.simulation.data_manager import DataManager
+
+LOCS = ["L-%02d" % i for i in range(8)]
+
+
+def _db(path):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE inventory (location_id TEXT PRIMARY KEY, sku_code TEXT, "
+                 "qty_available INTEGER, qty_reserved INTEGER, last_updated REAL)")
+    conn.executemany("INSERT INTO inventory VALUES (?, 'SKU', ?, ?, NULL)",
+                     [(loc, 20 + i, 5) for i, loc in enumerate(LOCS)])
+    conn.commit()
+    conn.close()
+    return str(path)
+
+
+def _dm(path, ledger=False, flush_every=0):
+    dm = DataManager.__new__(DataManager)
+    dm.db_path = path
+    dm.inventory_ledger = None
+    dm.bulk_inventory_sql = False
+    if ledger:
+        assert dm.enable_inventory_ledger(flush_every)
+    return dm
+
+
+def _tabla(path):
+    conn = sqlite3.connect(path)
+    filas = conn.execute("SELECT location_id, qty_available, qty_reserved, last_updated "
+                         "FROM inventory ORDER BY location_id").fetchall()
+    conn.close()
+    return filas
+
+
+def _movimientos(seed=1, n=120):
+    rng = random.Random(seed)
+    return [(rng.choice(("consume", "add")), rng.choice(LOCS + ["NOPE"]),
+             rng.randint(1, 9), float(t)) for t in range(n)]
+
+
+def test_il01_misma_tabla_que_sqlite_por_llamada(tmp_path):
+    a, b = _db(tmp_path / "a.db"), _db(tmp_path / "b.db")
+    viejo, nuevo = _dm(a), _dm(b, ledger=True)
+    for op, loc, qty, t in _movimientos():
+        r_viejo = getattr(viejo, op + "_stock")(loc, qty, sim_now=t)
+        assert getattr(nuevo, op + "_stock")(loc, qty, sim_now=t) == r_viejo
+    # sin flush: la DB del ledger sigue intacta
+    assert _tabla(b) == _tabla(_db(tmp_path / "c.db"))
+    assert nuevo.flush_inventory() == len(LOCS)
+    assert _tabla(b) == _tabla(a)
+    assert nuevo.flush_inventory() == 0
+
+
+def test_il02_checkpoints_y_sql_masivo(tmp_path):
+    a, b = _db(tmp_path / "a.db"), _db(tmp_path / "b.db")
+    viejo, nuevo = _dm(a), _dm(b, ledger=True, flush_every=10)
+    movs = _movimientos(seed=7, n=35)
+    for op, loc, qty, t in movs:
+        getattr(viejo, op + "_stock")(loc, qty, sim_now=t)
+        getattr(nuevo, op + "_stock")(loc, qty, sim_now=t)
+    validos = sum(1 for m in movs if m[1] != "NOPE")
+    assert nuevo.inventory_ledger.flushes == validos // 10
+    # commit_reservations vuelca lo pendiente antes de su UPDATE masivo
+    reservas = {"L-01": 3, "L-04": 2}
+    assert viejo.commit_reservations(reservas) and nuevo.commit_reservations(reservas)
+    assert _tabla(b) == _tabla(a)
+    # y el ledger recarga despues: el siguiente pick parte de la DB nueva
+    assert nuevo.consume_stock("L-01", 1, sim_now=99.0) == \
+        viejo.consume_stock("L-01", 1, sim_now=99.0)
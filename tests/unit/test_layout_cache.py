@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+PERF-2 / LC-xx: cache persistente por layout (layout_cache.py).
+Contrato: clave = contenido del TMX (otro mapa => otra cache), la replica
+N+1 reusa matriz/picking/oraculo/caminos y obtiene EXACTAMENTE lo mismo que
+construyendo desde cero.
+
+Usa una copia de layouts/WH1.tmx en tmp_path (no ensucia layouts/).
+"""
+import os
+import shutil
+
+import numpy as np
+
+from subsystems.simulation.layout_cache import LayoutCache, compute_layout_key, grid_digest
+from subsystems.simulation.layout_manager import LayoutManager
+from subsystems.simulation.pathfinder import Pathfinder
+from subsystems.simulation.distance_oracle import build_distance_oracle
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+
+def _tmx(tmp_path):
+    dst = tmp_path / "WH1.tmx"
+    shutil.copy(os.path.join(PROJECT_ROOT, "layouts", "WH1.tmx"), dst)
+    return str(dst)
+
+
+def test_lc01_clave_cambia_con_el_contenido(tmp_path):
+    tmx = _tmx(tmp_path)
+    k1 = compute_layout_key(tmx)
+    assert compute_layout_key(tmx) == k1
+    with open(tmx, "ab") as f:
+        f.write(b"\n<!-- editado -->\n")
+    assert compute_layout_key(tmx) != k1
+
+
+def test_lc02_layout_desde_cache_identico(tmp_path):
+    tmx = _tmx(tmp_path)
+    frio = LayoutManager(tmx, headless=True, layout_cache=LayoutCache(tmx))
+    cache = LayoutCache(tmx)
+    assert cache.load_layout() is not None
+    caliente = LayoutManager(tmx, headless=True, layout_cache=cache)
+    assert caliente.collision_matrix == frio.collision_matrix
+    assert caliente.picking_points == frio.picking_points
+    assert os.path.dirname(cache.dir) == str(tmp_path / ".layout_cache")
+
+
+def test_lc03_caminos_persistidos_sin_astar(tmp_path):
+    tmx = _tmx(tmp_path)
+    lm = LayoutManager(tmx, headless=True)
+    cache = LayoutCache(tmx)
+    pf = Pathfinder(lm.collision_matrix)
+    pf.path_cache = cache.load_paths(pf.width, lm.collision_matrix)
+    a, b = lm.picking_points[0]["grid_position"], lm.picking_points[-1]["grid_position"]
+    ref = pf.find_path(a, b)
+    assert cache.save_paths() is True
+    assert cache.save_paths() is True  # sigue dirty: misma store en memoria
+
+    pf2 = Pathfinder(lm.collision_matrix)
+    pf2.path_cache = LayoutCache(tmx).load_paths(pf2.width, lm.collision_matrix)
+    assert len(pf2.path_cache) == 1
+    assert pf2.find_path(a, b) == [tuple(p) for p in ref]
+    assert pf2.path_cache.hits == 1
+    # Una replica sin caminos nuevos no reescribe nada.
+    assert LayoutCache(tmx).save_paths(pf2.path_cache) is False
+
+
+def test_lc04_oraculo_reusado_solo_con_las_mismas_fuentes(tmp_path):
+    tmx = _tmx(tmp_path)
+    lm = LayoutManager(tmx, headless=True)
+    frio = build_distance_oracle(lm, layout_cache=LayoutCache(tmx))
+    caliente = build_distance_oracle(lm, layout_cache=LayoutCache(tmx))
+    assert isinstance(caliente.dist, np.memmap)
+    np.testing.assert_array_equal(np.asarray(caliente.dist), frio.dist)
+
+    lm.picking_points = lm.picking_points[:3]
+    otro = build_distance_oracle(lm, layout_cache=LayoutCache(tmx))
+    assert not isinstance(otro.dist, np.memmap)
+    assert otro.dist.shape[0] == 3
+
+
+def test_lc05_caminos_de_otro_escritor_no_se_mezclan(tmp_path):
+    tmx = _tmx(tmp_path)
+    lm = LayoutManager(tmx, headless=True)
+    pts = [p["grid_position"] for p in lm.picking_points]
+    caches = []
+    for a, b in ((pts[0], pts[-1]), (pts[1], pts[-2])):   # dos trials paralelos
+        cache = LayoutCache(tmx)
+        pf = Pathfinder(lm.collision_matrix)
+        pf.path_cache = cache.load_paths(pf.width, lm.collision_matrix)
+        pf.find_path(a, b)
+        caches.append(cache)
+    for cache in caches:
+        cache.save_paths()
+    assert sorted(os.listdir(caches[0].dir)) == [
+        "meta.json", "paths_%s.npz" % grid_digest(lm.collision_matrix)]
+    store = LayoutCache(tmx).load_paths(len(lm.collision_matrix[0]), lm.collision_matrix)
+    assert len(store) == 1 and store.get(pts[1], pts[-2]) is not None
+
+    # Extremos incoherentes (archivo ajeno/corrupto): se ignora el camino.
+    keys, offs, cells = store.to_arrays()
+    store.load_arrays(keys, offs, cells[::-1].copy())
+    assert store.get(pts[1], pts[-2]) is None
+    assert store.rejected == 1
+
+
+def test_lc06_grilla_final_distinta_no_reusa_caminos_ni_oraculo(tmp_path):
+    # Outbound on: F2.d bloquea celdas DESPUES de leer el TMX (misma clave de
+    # layout). Lo cacheado con la grilla original no debe servir a la nueva.
+    tmx = _tmx(tmp_path)
+    lm = LayoutManager(tmx, headless=True)
+    a, b = lm.picking_points[0]["grid_position"], lm.picking_points[-1]["grid_position"]
+    cache = LayoutCache(tmx)
+    pf = Pathfinder(lm.collision_matrix)
+    pf.path_cache = cache.load_paths(pf.width, lm.collision_matrix)
+    original = pf.find_path(a, b)
+    cache.save_paths()
+    frio = build_distance_oracle(lm, layout_cache=LayoutCache(tmx))
+
+    x, y = original[len(original) // 2]
+    lm.collision_matrix[y][x] = False
+    store = LayoutCache(tmx).load_paths(pf.width, lm.collision_matrix)
+    assert len(store) == 0 and store.get(a, b) is None
+    otro = build_distance_oracle(lm, layout_cache=LayoutCache(tmx))
+    assert not isinstance(otro.dist, np.memmap)
+    assert otro.dist.shape == frio.dist.shape
+
+    lm.collision_matrix[y][x] = True   # misma grilla => vuelve a reusar
+    assert LayoutCache(tmx).load_paths(pf.width, lm.collision_matrix).get(a, b) == original
+    assert isinstance(build_distance_oracle(lm, layout_cache=LayoutCache(tmx)).dist, np.memmap)
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+PERF-21 / ME-xx: tramos de movimiento compactos (core/replay_movement.py).
+Contrato: el camino RLE (con duraciones por run del plan time-window)
+decodifica a las mismas celdas e instantes, y ReplayData.state_at con
+segment_started ubica a cada agente en la MISMA celda que la expansion
+per_cell (un estado_agente por paso), sin exponer la clave interna.
+"""
+import random
+
+from core.replay_movement import (
+    SEGMENT_EVENT, cell_times, decode_path, encode_path, encode_segment,
+    encode_timed_segment, position_at)
+from web_prototype.app_state import ReplayData
+
+
+def _camino(rng, n):
+    x, y = 5, 5
+    camino = [(x, y)]
+    for _ in range(n):
+        dx, dy = rng.choice([(1, 0), (-1, 0), (0, 1), (0, -1), (0, 0)])
+        x, y = x + dx, y + dy
+        camino.append((x, y))
+    return camino
+
+
+def test_me01_rle_ida_y_vuelta():
+    rng = random.Random(2)
+    camino = [(0, 0), (1, 0), (2, 0), (3, 0), (3, 1), (3, 2)]
+    assert encode_path(camino) == [[1, 0, 3], [0, 1, 2]]
+    for _ in range(20):
+        camino = _camino(rng, rng.randint(1, 40))
+        assert decode_path(camino[0], encode_path(camino)) == camino
+    # plan time-window: esperas de otra duracion quedan en su propio run
+    plan = [((0, 0), 10.0), ((1, 0), 10.2), ((2, 0), 10.4), ((2, 0), 10.5),
+            ((2, 0), 10.6), ((2, 1), 10.8)]
+    datos = encode_timed_segment(plan, 0.2, agent_id="GO-1")
+    assert datos["steps"] == [[1, 0, 2], [0, 0, 2, 0.1], [0, 1, 1]]
+    assert datos["n_cells"] == 5 and datos["agent_id"] == "GO-1"
+    celdas = decode_path(datos["origin"], datos["steps"])
+    instantes = cell_times(datos["steps"], datos["time_per_cell"], 10.0)
+    assert [round(t, 6) for t in instantes] == [t for _, t in plan[:-1]]
+    assert position_at(celdas, instantes, 9.0) == (1, 0)
+    assert position_at(celdas, instantes, 10.45) == (2, 0)
+    assert position_at(celdas, instantes, 99.0) == (2, 1)
+
+
+def _eventos(compacto, seed=4):
+    """Dos agentes con tramos intercalados; per_cell o segment_started."""
+    rng = random.Random(seed)
+    eventos = []
+    for a in range(2):
+        t = 0.3 * a
+        for _ in range(6):
+            camino = _camino(rng, rng.randint(1, 25))
+            dt = rng.choice([0.1, 0.25])
+            agente = {"agent_id": "GO-%d" % a, "agent_type": "GroundOperator",
+                      "status": "moving"}
+            for i, celda in enumerate(camino[1:], 1):
+                if i == 1 or not compacto:
+                    eventos.append(dict(agente, type="estado_agente", timestamp=t,
+                                        position=list(celda)))
+                if compacto and i == 1 and len(camino) > 2:
+                    eventos.append(dict(encode_segment(camino, dt, **agente),
+                                        type=SEGMENT_EVENT, timestamp=t))
+                t += dt
+            eventos.append(dict(agente, type="estado_agente", timestamp=t,
+                                position=list(camino[-1]), status="picking"))
+            t += rng.uniform(0.5, 3.0)
+    eventos.sort(key=lambda e: e["timestamp"])
+    return eventos
+
+
+def _replay(eventos):
+    rd = ReplayData()
+    rd.events = eventos
+    rd.max_time = eventos[-1]["timestamp"]
+    rd.precompute_snapshots()
+    return rd
+
+
+def test_me02_state_at_igual_a_per_cell():
+    per_cell, segment = _eventos(False), _eventos(True)
+    assert len(segment) < len(per_cell) / 2
+    a, b = _replay(per_cell), _replay(segment)
+    rng = random.Random(7)
+    instantes = [rng.uniform(0, a.max_time) for _ in range(400)]
+    for t in instantes + sorted(instantes):
+        ea, eb = a.state_at(t), b.state_at(t)
+        assert eb["agents"] == ea["agents"], t
+        assert all("_segment" not in ag for ag in eb["agents"].values())
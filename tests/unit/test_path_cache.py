@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+PERF-18 / PC-xx: cache LRU de caminos por tramo (path_cache.py).
+Contrato: con la cache colgada del pathfinder los caminos son IGUALES a los
+del A* sin cache (y listas nuevas en cada get), la capacidad se respeta
+desalojando el menos reciente, y un store de respaldo (PERF-2) recibe los
+caminos nuevos y sirve los fallos.
+
+Grilla de juguete (sin TMX, sin SimPy).
+"""
+import random
+
+from subsystems.simulation.layout_cache import SegmentPathStore
+from subsystems.simulation.path_cache import SegmentPathLRU
+from subsystems.simulation.pathfinder import Pathfinder
+from subsystems.simulation.pathfinder_engines import ArrayPathfinder
+
+
+def _grid(w=10, h=7):
+    m = [[True] * w for _ in range(h)]
+    for y in range(h - 2):
+        m[y][4] = False
+    return m
+
+
+def test_pc01_mismos_caminos_que_sin_cache():
+    m = _grid()
+    rng = random.Random(4)
+    libres = [(x, y) for y in range(7) for x in range(10) if m[y][x]]
+    pares = [(rng.choice(libres), rng.choice(libres)) for _ in range(30)] * 3
+    for cls in (Pathfinder, ArrayPathfinder):
+        ref = cls(m)
+        pf = cls(m)
+        pf.path_cache = SegmentPathLRU(pf.width, 1000)
+        for a, b in pares:
+            camino = pf.find_path(a, b)
+            assert camino == ref.find_path(a, b)
+            camino.append((-1, -1))  # mutar la copia no ensucia la cache
+        pc = pf.path_cache
+        assert pc.hits > 0 and pc.hits + pc.misses == sum(1 for a, b in pares if a != b)
+        assert pc.report()["entries"] == len(pc)
+
+
+def test_pc02_lru_acotada_y_respaldo():
+    pc = SegmentPathLRU(10, 2, backing=SegmentPathStore(10))
+    tramos = {((0, 0), (1, 0)): [(0, 0), (1, 0)],
+              ((0, 0), (0, 2)): [(0, 0), (0, 1), (0, 2)],
+              ((3, 3), (5, 5)): [(3, 3), (4, 4), (5, 5)]}
+    for (a, b), camino in tramos.items():
+        assert pc.get(a, b) is None
+        pc.put(a, b, camino)
+    assert len(pc) == 2 and pc.evictions == 1
+    # el desalojado vuelve desde el respaldo (y cuenta como fallo de la LRU)
+    assert pc.get((0, 0), (1, 0)) == [(0, 0), (1, 0)]
+    assert pc.backing_hits == 1 and pc.misses == 4 and pc.hits == 0
+    assert pc.get((0, 0), (1, 0)) == [(0, 0), (1, 0)] and pc.hits == 1
+    assert len(pc.backing) == 3
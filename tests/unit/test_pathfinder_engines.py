@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+PERF-3 / PE-xx: motor A* array-backed (pathfinder_engines.py).
+Contrato: caminos IDENTICOS celda por celda al Pathfinder historico (mismo
+orden de expansion y desempate), buffers reusables entre consultas, y la
+fabrica cae al historico ante un motor desconocido.
+PERF-4: JPS con el MISMO coste optimo que A*; con tie_break "astar" los
+caminos ejecutados son los del A*.
+"""
+import math
+import os
+import random
+
+from subsystems.simulation.pathfinder import Pathfinder
+from subsystems.simulation.pathfinder_engines import (
+    ArrayPathfinder, JPSPathfinder, create_pathfinder)
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+
+def _grid_aleatoria(w, h, densidad, seed):
+    rng = random.Random(seed)
+    return [[rng.random() > densidad for _ in range(w)] for _ in range(h)]
+
+
+def _pares(matrix, n, seed):
+    rng = random.Random(seed)
+    libres = [(x, y) for y, row in enumerate(matrix) for x, v in enumerate(row) if v]
+    return [(rng.choice(libres), rng.choice(libres)) for _ in range(n)]
+
+
+def test_pe01_caminos_identicos_en_grillas_aleatorias():
+    for seed in range(6):
+        m = _grid_aleatoria(25, 18, 0.3, seed)
+        ref, arr = Pathfinder(m), ArrayPathfinder(m)
+        for a, b in _pares(m, 60, seed):
+            assert arr.find_path(a, b) == ref.find_path(a, b), (seed, a, b)
+
+
+def test_pe02_caminos_identicos_en_wh1():
+    from subsystems.simulation.layout_manager import LayoutManager
+    lm = LayoutManager(os.path.join(PROJECT_ROOT, "layouts", "WH1.tmx"), headless=True)
+    ref = Pathfinder(lm.collision_matrix)
+    arr = ArrayPathfinder(lm.collision_matrix)
+    puntos = [p["grid_position"] for p in lm.picking_points]
+    rng = random.Random(42)
+    for _ in range(150):
+        a, b = rng.choice(puntos), rng.choice(puntos)
+        assert arr.find_path(a, b) == ref.find_path(a, b)
+
+
+def test_pe03_bordes_igual_que_el_historico():
+    m = [[True, False, True],
+         [True, False, True],
+         [True, False, True]]
+    arr = ArrayPathfinder(m)
+    assert arr.find_path((0, 0), (0, 0)) == [(0, 0)]
+    assert arr.find_path((1, 0), (0, 2)) is None      # start bloqueado
+    assert arr.find_path((0, 0), (5, 5)) is None      # goal fuera de grilla
+    assert arr.find_path((0, 0), (2, 2)) is None      # regiones desconectadas
+    # la consulta fallida no contamina la siguiente (generacion nueva)
+    assert arr.find_path((0, 0), (0, 2)) == [(0, 0), (0, 1), (0, 2)]
+
+
+def test_pe04_fabrica():
+    m = [[True] * 4 for _ in range(4)]
+    assert type(create_pathfinder(m)) is Pathfinder
+    assert type(create_pathfinder(m, "astar")) is Pathfinder
+    assert isinstance(create_pathfinder(m, "astar_array"), ArrayPathfinder)
+    assert type(create_pathfinder(m, "a_estrella_turbo")) is Pathfinder
+    jps = create_pathfinder(m, "jps")
+    assert isinstance(jps, JPSPathfinder) and jps.tie_break == "astar"
+    assert create_pathfinder(m, "jps", "jps").tie_break == "jps"
+    assert create_pathfinder(m, "jps", "otro").tie_break == "astar"
+
+
+def _coste(path):
+    return sum(math.hypot(x2 - x1, y2 - y1)
+               for (x1, y1), (x2, y2) in zip(path, path[1:]))
+
+
+def test_pe05_jps_mismo_coste_optimo_que_astar():
+    for seed in range(6):
+        m = _grid_aleatoria(30, 20, 0.25, seed)
+        ref = Pathfinder(m)
+        jps = JPSPathfinder(m, tie_break="jps")
+        for a, b in _pares(m, 60, seed):
+            esperado = ref.find_path(a, b)
+            camino = jps.find_path(a, b)
+            if esperado is None:
+                assert camino is None and jps.path_cost(a, b) is None
+                continue
+            assert camino[0] == a and camino[-1] == b
+            # Pasos 8-conexos sobre celdas caminables.
+            for (x1, y1), (x2, y2) in zip(camino, camino[1:]):
+                assert max(abs(x2 - x1), abs(y2 - y1)) == 1
+                assert m[y2][x2]
+            assert math.isclose(_coste(camino), _coste(esperado), abs_tol=1e-9)
+            assert math.isclose(jps.path_cost(a, b), _coste(esperado), abs_tol=1e-9)
+
+
+def test_pe06_jps_tie_break_astar_conserva_los_caminos():
+    m = _grid_aleatoria(25, 18, 0.3, 7)
+    ref = Pathfinder(m)
+    jps = JPSPathfinder(m)
+    for a, b in _pares(m, 60, 7):
+        assert jps.find_path(a, b) == ref.find_path(a, b)
+
+
+def test_pe07_jps_expande_menos_en_pasillo_abierto():
+    m = [[True] * 40 for _ in range(12)]
+    arr = ArrayPathfinder(m)
+    jps = JPSPathfinder(m, tie_break="jps")
+    arr.find_path((0, 0), (39, 11))
+    jps.find_path((0, 0), (39, 11))
+    assert jps.last_expansions < arr.last_expansions
+
+
+def _bloquear(m, seed, n=40):
+    """Bloquea celdas DESPUES de crear los motores (como F2.d con el staging)."""
+    rng = random.Random(seed)
+    libres = [(x, y) for y, row in enumerate(m) for x, v in enumerate(row) if v]
+    for x, y in rng.sample(libres, n):
+        m[y][x] = False
+
+
+def test_pe08_refresh_walkability_tras_mutar_la_grilla():
+    # 7x5 abierto con un muro: sin refresh el motor array lo atravesaba
+    m = [[True] * 7 for _ in range(5)]
+    ref, arr = Pathfinder(m), ArrayPathfinder(m)
+    for y in range(4):
+        m[y][3] = False
+    arr.refresh_walkability()
+    ref.refresh_walkability()  # no-op: lee la grilla en vivo
+    assert arr.find_path((0, 0), (6, 0)) == ref.find_path((0, 0), (6, 0))
+    assert all(m[y][x] for x, y in arr.find_path((0, 0), (6, 0)))
+    for seed in range(4):
+        m = _grid_aleatoria(25, 18, 0.2, seed)
+        ref, arr = Pathfinder(m), ArrayPathfinder(m)
+        _bloquear(m, seed)
+        arr.refresh_walkability()
+        for a, b in _pares(m, 60, seed):
+            assert arr.find_path(a, b) == ref.find_path(a, b), (seed, a, b)
+
+
+def test_pe09_jps_refresh_walkability_tras_mutar_la_grilla():
+    for seed in range(4):
+        m = _grid_aleatoria(30, 20, 0.15, seed)
+        ref = Pathfinder(m)
+        jps_a, jps_j = JPSPathfinder(m), JPSPathfinder(m, tie_break="jps")
+        _bloquear(m, seed, n=60)
+        jps_a.refresh_walkability()
+        jps_j.refresh_walkability()
+        for a, b in _pares(m, 60, seed):
+            esperado = ref.find_path(a, b)
+            assert jps_a.find_path(a, b) == esperado, (seed, a, b)
+            camino = jps_j.find_path(a, b)
+            if esperado is None:
+                assert camino is None and jps_j.path_cost(a, b) is None
+                continue
+            assert all(m[y][x] for x, y in camino)
+            assert math.isclose(jps_j.path_cost(a, b), _coste(esperado), abs_tol=1e-9)
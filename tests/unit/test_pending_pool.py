@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+PERF-11 / PP-xx: pool indexado de WOs pendientes (pending_pool.py).
+Contrato: las consultas indexadas devuelven EXACTAMENTE lo mismo que los
+filtros historicos sobre la lista plana (orden de llegada incluido), bajo
+cualquier secuencia de altas y bajas.
+"""
+import math
+import random
+
+import pytest
+
+from subsystems.simulation.pending_pool import PendingWorkOrderPool
+
+AREAS = ["Area_Ground", "Area_High", "Area_Special", "Area_Piso"]
+
+
+def _wos(make_wo, n, seed):
+    rng = random.Random(seed)
+    return [make_wo(work_area=rng.choice(AREAS), pick_sequence=rng.randint(1, 15),
+                    wave_id=rng.choice([None, 1, "2"])) for _ in range(n)]
+
+
+def test_pp01_consultas_iguales_a_la_lista(make_wo):
+    rng = random.Random(7)
+    pool, lista = PendingWorkOrderPool(), []
+    for wo in _wos(make_wo, 400, 1):
+        pool.append(wo)
+        lista.append(wo)
+        if rng.random() < 0.4:
+            victima = rng.choice(lista)
+            lista.remove(victima)
+            pool.remove(victima)
+        areas = rng.sample(AREAS, rng.randint(1, len(AREAS)))
+        esperado = [w for w in lista if w.work_area in areas]
+        assert pool.en_areas(areas) == esperado
+        assert pool.primera_por_pick_sequence(areas) == (
+            min(esperado, key=lambda w: w.pick_sequence) if esperado else None)
+    assert list(pool) == lista and len(pool) == len(lista)
+    assert set(pool.olas()) == {None if w.wave_id is None else str(w.wave_id) for w in lista}
+    with pytest.raises(ValueError):
+        pool.remove(make_wo())
+
+
+def test_pp02_candidatos_del_dispatcher_con_olas(make_dispatcher, make_wo, make_operator, fake_env):
+    disp = make_dispatcher({"waves": {"enabled": True, "release_times": {"1": 50, "2": 0}}})
+    wos = _wos(make_wo, 200, 3)
+    disp.work_orders_pendientes = wos
+    op = make_operator(areas=("Area_Ground", "Area_Special"))
+    for now in (0.0, 49.0, 50.0):
+        fake_env.now = now
+        esperado = [wo for wo in wos if op.can_handle_work_area(wo.work_area)
+                    and disp._wo_elegible_por_ola(wo)]
+        assert disp._candidatos_compatibles(op) == esperado
+    for wo in wos[::3]:
+        disp.work_orders_pendientes.discard(wo)
+    assert list(disp.work_orders_pendientes) == [wo for i, wo in enumerate(wos) if i % 3]
+
+
+def test_pp03_radio_igual_al_barrido(make_wo):
+    """PERF-12: en_radio == filtro sqrt historico, con el indice espacial
+    construido a mitad de la secuencia y mantenido en altas/bajas."""
+    rng = random.Random(13)
+    pool, lista = PendingWorkOrderPool(celda_espacial=4), []
+    for i in range(300):
+        wo = make_wo(work_area=rng.choice(AREAS), ubicacion=(rng.randint(0, 60), rng.randint(0, 40)))
+        pool.append(wo)
+        lista.append(wo)
+        if rng.random() < 0.3:
+            victima = rng.choice(lista)
+            lista.remove(victima)
+            pool.remove(victima)
+        if i < 50:
+            continue
+        areas = rng.sample(AREAS, rng.randint(1, 3))
+        cx, cy = rng.randint(-5, 65), rng.randint(-5, 45)
+        radio = rng.choice([0, 1, 3.5, 7, 20, 100])
+        esperado = [w for w in lista if w.work_area in areas and
+                    math.sqrt((w.ubicacion[0] - cx)**2 + (w.ubicacion[1] - cy)**2) <= radio]
+        assert pool.en_radio(areas, (cx, cy), radio) == esperado
+
+
+def test_pp04_heap_de_secuencia_con_bajas_perezosas(make_wo):
+    # Re-alta de la misma WO (entrada vieja muerta) y heap acotado: las bajas
+    # no desplazan listas, dejan entradas muertas que se purgan solas.
+    pool = PendingWorkOrderPool()
+    wos = [make_wo(work_area="A", pick_sequence=i % 50) for i in range(3000)]
+    pool.extend(wos)
+    for wo in wos[:2900]:
+        pool.remove(wo)
+        assert len(pool._seq_heap["A"]) <= 2 * len(pool._por_area["A"]) + 64
+    vivas = wos[2900:]
+    assert pool.primera_por_pick_sequence(["A"]) is min(vivas, key=lambda w: w.pick_sequence)
+    primera = pool.primera_por_pick_sequence(["A"])
+    pool.remove(primera)
+    pool.append(primera)   # vuelve al final: pierde el desempate por llegada
+    empatadas = [w for w in vivas if w.pick_sequence == primera.pick_sequence]
+    esperado = empatadas[1] if len(empatadas) > 1 else primera
+    assert pool.primera_por_pick_sequence(["A"]) is esperado
+    for wo in vivas:
+        pool.remove(wo)
+    assert pool.primera_por_pick_sequence(["A"]) is None and "A" not in pool._seq_heap
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+PERF-9 / RE-xx: hot path de AlmacenMejorado.registrar_evento.
+Contrato: la tabla de capacidades y la cache grid->pixel producen EXACTAMENTE
+el mismo estado_agente que el barrido original; el modo compacto
+(performance.replay_compact_estado) solo omite los campos legacy.
+PERF-10: en modo single-log (UnifiedEventLog) event_log y el .jsonl son
+IGUALES a los del modo doble.
+"""
+import simpy
+
+from core.replay_utils import volcar_replay_a_archivo
+from simulation_buffer import ReplayBuffer, UnifiedEventLog
+from subsystems.simulation.warehouse import AlmacenMejorado
+
+AGENT_TYPES = [{"type": "GroundOperator", "capacity": 100},
+               {"type": "Forklift", "capacity": 900},
+               {"type": "GroundOperator", "capacity": 7}]  # ignorado: primer match gana
+
+
+class _Layout:
+    def __init__(self):
+        self.llamadas = 0
+
+    def grid_to_pixel(self, x, y):
+        self.llamadas += 1
+        if x < 0:
+            raise ValueError("fuera del mapa")
+        return (x * 32 + 16, y * 32 + 16)
+
+
+def _almacen(buffer=None, **perf):
+    config = {"agent_types": AGENT_TYPES, "performance": perf}
+    return AlmacenMejorado(simpy.Environment(), config, layout_manager=_Layout(),
+                           replay_buffer=buffer if buffer is not None else ReplayBuffer())
+
+
+def _estado(agent_type, position):
+    return {"agent_id": "GO-1", "agent_type": agent_type, "tipo": agent_type,
+            "position": position, "status": "moving", "current_task": "WO-1",
+            "current_work_area": "Area_Ground", "cargo_volume": 12}
+
+
+def test_re01_estado_agente_identico_al_original():
+    alm = _almacen()
+    for _ in range(3):
+        alm.registrar_evento("estado_agente", _estado("GroundOperator", [3, 4]))
+    alm.registrar_evento("estado_agente", _estado("Desconocido", [-1, 2]))
+    eventos = alm.replay_buffer.get_events()
+    assert alm.layout_manager.llamadas == 2  # una por celda distinta
+    assert eventos[0]["data"] == {
+        "x": 112, "y": 144, "tipo": "GroundOperator", "position": [3, 4],
+        "status": "moving", "current_task": "WO-1", "current_work_area": "Area_Ground",
+        "cargo_volume": 12, "accion": "Estado: moving", "tareas_completadas": 0,
+        "direccion_x": 0, "direccion_y": 0, "type": "GroundOperator",
+        "tour_tasks_completed": 0, "tour_total_tasks": 0, "current_item": "N/A",
+        "carga": 12, "capacidad": 100}
+    assert list(eventos[0]["data"])[-1] == "capacidad"
+    assert (eventos[3]["data"]["x"], eventos[3]["data"]["y"]) == (-32, 64)  # fallback
+    assert eventos[3]["data"]["capacidad"] == 150
+    assert len(alm.event_log) == 4
+
+
+def test_re02_modo_compacto():
+    alm = _almacen(replay_compact_estado=True)
+    alm.registrar_evento("estado_agente", _estado("Forklift", [1, 1]))
+    alm.registrar_evento("work_order_update", {"id": "WO-1", "status": "assigned"})
+    est, wo = alm.replay_buffer.get_events()
+    assert est["data"] == {
+        "x": 48, "y": 48, "tipo": "Forklift", "position": [1, 1], "status": "moving",
+        "current_task": "WO-1", "current_work_area": "Area_Ground", "cargo_volume": 12,
+        "capacidad": 900}
+    assert wo == {"type": "work_order_update", "timestamp": 0, "id": "WO-1",
+                  "status": "assigned"}
+
+
+def _corrida(alm):
+    def proceso(env):
+        for i in range(6):
+            alm.registrar_evento("estado_agente", _estado("GroundOperator", [i, 2]))
+            alm.registrar_evento("work_order_update", {"id": "WO-%d" % i, "status": "assigned",
+                                                       "location": [i, 3]})
+            yield env.timeout(1.5)
+        alm.replay_buffer.add_event({"type": "marca", "timestamp": env.now})
+    alm.env.process(proceso(alm.env))
+    alm.env.run()
+    return alm
+
+
+def test_re03_single_log_mismas_vistas():
+    doble = _corrida(_almacen())
+    unico = _corrida(_almacen(UnifiedEventLog()))
+    assert unico.replay_buffer.get_events() == doble.replay_buffer.get_events()
+    assert list(unico.event_log) == doble.event_log
+    assert len(unico.event_log) == 12 and len(unico.replay_buffer) == 13
+    assert unico.replay_buffer.count_by_type("estado_agente") == 6
+
+
+def test_re04_single_log_volcado_identico(tmp_path):
+    salidas = []
+    for buffer in (None, UnifiedEventLog()):
+        alm = _corrida(_almacen(buffer))
+        out = str(tmp_path / ("r%d.jsonl" % len(salidas)))
+        assert volcar_replay_a_archivo(alm.replay_buffer, out, {}) is True
+        with open(out, "rb") as f:
+            salidas.append(f.read())
+    assert salidas[0] == salidas[1]
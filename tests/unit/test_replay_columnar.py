@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+PERF-7 / RC-xx: formato de replay columnar (core/replay_columnar.py).
+Contrato: .jsonl -> .replaycol -> lineas .jsonl es BYTE-IDENTICO (mismas
+claves, orden y tipos) y el visor web carga el .replaycol con el mismo
+resultado que el .jsonl.
+"""
+import json
+
+import pytest
+
+from core.replay_columnar import (
+    columnar_to_jsonl_lines, convert_jsonl_to_columnar, read_columnar_replay,
+    read_columnar_times, write_columnar_replay)
+
+HEADER = {"event_type": "SIMULATION_START", "timestamp": 0, "config": {"a": [1, 2]},
+          "initial_work_orders": [{"id": "WO-1", "status": "released", "ubicacion": [1, 2]}]}
+REGISTROS = [
+    {"type": "estado_agente", "timestamp": 0, "agent_id": "GO-1",
+     "data": {"x": 112, "y": 944, "position": [3, 29], "status": "idle",
+              "current_task": None, "cargo_volume": 0, "carga": 0.5}},
+    {"type": "estado_agente", "timestamp": 1.25, "agent_id": "GO-1",
+     "data": {"x": 113, "y": 944, "position": [3, 29], "status": "moving",
+              "current_task": "WO-1", "cargo_volume": 2, "carga": 1}},
+    {"type": "work_order_update", "timestamp": 1.25, "id": "WO-1", "status": "assigned",
+     "assigned_agent_id": "GroundOperator_GO-1", "is_partial": False,
+     "location": [1, 2], "tiempo_fin": None, "qty": 2 ** 60, "extra": {}},
+    {"type": "work_order_update", "timestamp": 2.5, "id": "WO-1", "status": "staged",
+     "assigned_agent_id": None, "is_partial": True,
+     "location": [1, 2], "tiempo_fin": 2.5, "qty": 3, "extra": {}},
+    {"type": "marca", "timestamp": 3, "valor": "ñandú", "lista": [{"k": None}]},
+    {"event_type": "SIMULATION_END", "timestamp": 3},
+]
+
+
+def _jsonl(tmp_path):
+    p = tmp_path / "replay_x.jsonl"
+    with open(p, "w", encoding="utf-8") as f:
+        for rec in [HEADER] + REGISTROS:
+            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    return str(p)
+
+
+def test_rc01_round_trip_byte_identico(tmp_path):
+    src = _jsonl(tmp_path)
+    for compress in (False, True):
+        dst = convert_jsonl_to_columnar(src, str(tmp_path / ("c%d.replaycol" % compress)),
+                                        compress=compress)
+        with open(src, encoding="utf-8") as f:
+            assert "".join(columnar_to_jsonl_lines(dst)) == f.read()
+        header, registros = read_columnar_replay(dst)
+        assert header == HEADER and registros == REGISTROS
+        # int vs float se conserva (0 vs 0.0, 1 vs 1.0)
+        assert type(registros[0]["timestamp"]) is int
+        assert type(registros[1]["data"]["carga"]) is int
+        assert list(read_columnar_times(dst)) == [0.0, 1.25, 1.25, 2.5, 3.0, 3.0]
+
+
+def test_rc02_sin_header_ni_registros(tmp_path):
+    dst = str(tmp_path / "vacio.replaycol")
+    assert write_columnar_replay(dst, None, []) == 0
+    assert read_columnar_replay(dst) == (None, [])
+
+
+def test_rc03_visor_carga_igual_que_jsonl(tmp_path, monkeypatch):
+    import web_prototype.app_state as app_state
+    src = _jsonl(tmp_path)
+    dst = convert_jsonl_to_columnar(src)
+    assert dst.endswith(".replaycol")
+
+    resultados = []
+    for path in (src, dst):
+        monkeypatch.setattr(app_state, "REPLAY_FILE", path)
+        rd = app_state.ReplayData()
+        resultados.append((rd.events, rd.max_time, rd.state_at(2.0)))
+    assert resultados[0] == resultados[1]
+
+
+def test_rc04_version_desconocida(tmp_path):
+    import zipfile
+    dst = str(tmp_path / "x.replaycol")
+    with zipfile.ZipFile(dst, "w") as zf:
+        zf.writestr("meta.json", json.dumps({"format": "replaycol", "version": 99}))
+    with pytest.raises(ValueError):
+        read_columnar_replay(dst)
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+PERF-5 / RS-xx: seek incremental del visor web (app_state.ReplayData.state_at).
+Contrato: el estado en t es EXACTAMENTE el de aplicar todos los eventos con
+timestamp <= t (en cualquier orden de consultas: adelante, atras, saltos) y
+las respuestas no comparten estado mutable con el cursor ni los checkpoints
+(work_orders se entrega como vista de solo lectura del historial de WOs).
+PERF-6: los indices incrementales (WOs por agente, conteos por status)
+coinciden con el barrido completo historico.
+"""
+import random
+
+import pytest
+
+from web_prototype.app_state import (
+    ReplayData, agent_status_count, agent_type_count, assigned_work_orders,
+    wo_status_counts)
+
+
+def _eventos(n, seed):
+    rng = random.Random(seed)
+    eventos = []
+    t = 0.0
+    for i in range(n):
+        if i > 20:
+            t += rng.choice([0.0, 0.5, 1.0, 3.0, 7.5])
+        r = rng.random()
+        if r < 0.5:
+            eventos.append({"type": "estado_agente", "timestamp": t,
+                            "agent_id": "GO-%d" % rng.randint(1, 4),
+                            "position": [rng.randint(0, 30), rng.randint(0, 30)],
+                            "status": rng.choice(["idle", "moving", "picking"])})
+        elif r < 0.9:
+            wo = {"id": "WO-%d" % rng.randint(1, 40),
+                  "status": rng.choice(["assigned", "in_progress", "picked", "staged"]),
+                  "pick_sequence": rng.randint(0, 3)}
+            if rng.random() < 0.8:
+                wo["assigned_agent_id"] = "GroundOperator_GO-%d" % rng.randint(1, 4)
+            eventos.append({"type": "work_order_update", "timestamp": t, "data": wo})
+        else:
+            eventos.append({"type": "pallet_shipped", "timestamp": t})
+    return eventos
+
+
+def _replay(eventos):
+    rd = ReplayData()
+    rd.events = eventos
+    rd.max_time = eventos[-1]["timestamp"]
+    rd.precompute_snapshots()
+    return rd
+
+
+def _referencia(rd, t):
+    estado = {"agents": {}, "work_orders": {}}
+    for e in rd.events:
+        if e.get("timestamp", 0) <= t:
+            rd._apply_event_to_state(e, estado)
+    return estado
+
+
+def test_rs01_seek_exacto_en_cualquier_orden():
+    rd = _replay(_eventos(1500, 3))
+    assert len(rd.snapshots) > 3
+    rng = random.Random(5)
+    adelante = [i * 7.3 for i in range(int(rd.max_time // 7.3) + 2)]
+    saltos = [rng.uniform(-5, rd.max_time + 5) for _ in range(60)]
+    for t in adelante + saltos + list(reversed(adelante)):
+        estado, ref = rd.state_at(t), _referencia(rd, t)
+        assert estado == ref, t
+        assert list(estado["work_orders"]) == list(ref["work_orders"])  # mismo orden
+
+
+def test_rs02_respuesta_no_contamina_el_cursor():
+    rd = _replay(_eventos(400, 9))
+    t = rd.max_time / 2
+    esperado = _referencia(rd, t)
+    estado = rd.state_at(t)
+    for agente in estado["agents"].values():
+        agente["work_orders_asignadas"] = ["basura"]
+        agente["cargo_volume"] = 999
+    # PERF-5: work_orders es una vista de solo lectura (sin copia por request).
+    with pytest.raises(TypeError):
+        estado["work_orders"]["WO-1"] = {}
+    assert rd.state_at(t) == esperado
+    assert rd.state_at(t + 1.0) == _referencia(rd, t + 1.0)
+    # Los checkpoints tampoco se tocaron.
+    assert rd.state_at(0.0) == _referencia(rd, 0.0)
+
+
+def test_rs03_replay_vacio():
+    rd = ReplayData()
+    rd.precompute_snapshots()
+    assert rd.state_at(10.0) == {"agents": {}, "work_orders": {}}
+
+
+def _asignadas_barrido(estado, agent_id):
+    """Barrido O(WOs) historico de get_snapshot (referencia)."""
+    out = []
+    for wo_id, wo in estado["work_orders"].items():
+        wo_agent = wo.get("assigned_agent_id") or wo.get("agent_id")
+        corto = wo_agent.split("_")[-1] if wo_agent and "_" in wo_agent else wo_agent
+        status = wo.get("status", "released")
+        if corto == agent_id and status in ["assigned", "in_progress"]:
+            out.append({"id": wo_id, "location": wo.get("location") or wo.get("ubicacion", [0, 0]),
+                        "status": status, "pick_sequence": wo.get("pick_sequence", 0)})
+    out.sort(key=lambda x: x["pick_sequence"])
+    return out
+
+
+def test_rs04_indices_iguales_al_barrido():
+    rd = _replay(_eventos(1200, 11))
+    for t in [0.0, rd.max_time / 3, rd.max_time / 2, rd.max_time, rd.max_time / 4]:
+        estado = rd.state_at(t)
+        wos = list(estado["work_orders"].values())
+        agentes = list(estado["agents"].values())
+        for agent_id in estado["agents"]:
+            assert assigned_work_orders(estado, agent_id) == _asignadas_barrido(estado, agent_id)
+        st = lambda wo: wo.get("status", "released")
+        assert wo_status_counts(estado) == {
+            "total": len(wos),
+            "staged": sum(1 for wo in wos if st(wo) == "staged"),
+            "picked": sum(1 for wo in wos if st(wo) == "picked"),
+            "in_progress": sum(1 for wo in wos if st(wo) == "in_progress"),
+            "assigned": sum(1 for wo in wos if st(wo) == "assigned" and wo.get("assigned_agent_id")),
+            "released": sum(1 for wo in wos if st(wo) == "released" or
+                            (st(wo) == "assigned" and not wo.get("assigned_agent_id"))),
+        }
+        assert agent_status_count(estado, ["moving", "picking"]) == \
+            sum(1 for a in agentes if a["status"] in ["moving", "picking"])
+        assert agent_type_count(estado, "Unknown") == len(agentes)
+
+
+def test_rs05_agregados_sin_clonar_iguales_a_state_at():
+    rd = _replay(_eventos(1200, 13))
+    for t in [rd.max_time, 0.0, rd.max_time / 2, rd.max_time / 3, -1.0]:
+        agregados = rd.aggregates_at(t)
+        estado = rd.state_at(t)
+        assert agregados["wo_counts"] == wo_status_counts(estado)
+        assert agregados["agent_total"] == len(estado["agents"])
+        for statuses in (["moving", "picking"], ["idle"]):
+            assert agent_status_count(agregados, statuses) == agent_status_count(estado, statuses)
+        assert agent_type_count(agregados, "Unknown") == agent_type_count(estado, "Unknown")
+    vacio = ReplayData()
+    vacio.precompute_snapshots()
+    assert vacio.aggregates_at(5.0)["wo_counts"]["total"] == 0
+    assert vacio.state_at(5.0) == {"agents": {}, "work_orders": {}}
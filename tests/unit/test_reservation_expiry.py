@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+PERF-25 / RE-xx: indice inverso por agente + heap de vencimientos.
+Contrato: con expiry_index=True release_agent / purge_before dejan la tabla
+EXACTAMENTE igual que los barridos completos (solos o con el indice PERF-24),
+el heap no crece sin cota en corridas largas (pallets liberados con
+t_out = now + 1e9) y un purge_horizon mayor no cambia los planes.
+"""
+import random
+
+from subsystems.simulation.reservation_table import ReservationTable
+from subsystems.simulation.spacetime_planner import SpaceTimePlanner
+
+from tests.unit.test_reservation_index import _consultas, _poblar
+from tests.unit.test_spacetime_dwell import FakeGridPathfinder
+
+
+def _inverso(tabla):
+    """Indice inverso recalculado desde las listas (para comparar)."""
+    esperado = {}
+    for kind, dic in ((0, tabla.reservations), (1, tabla.edges)):
+        for key, ivs in dic.items():
+            for iv in ivs:
+                claves = esperado.setdefault(iv[2], {})
+                claves[(kind, key)] = claves.get((kind, key), 0) + 1
+    return esperado
+
+
+def test_re01_mismo_estado_que_los_barridos():
+    for seed in range(5):
+        tablas = [ReservationTable(0.05), ReservationTable(0.05, expiry_index=True),
+                  ReservationTable(0.05, indexed=True, expiry_index=True)]
+        rng = random.Random(seed)
+        for ronda in range(6):
+            _poblar(tablas, rng, 120)
+            agente = rng.choice(["A", "B", "C", "PALLET:1", "X"])
+            t = rng.uniform(0, 100)   # no monotono a proposito
+            for tabla in tablas:
+                tabla.release_agent(agente)
+                tabla.purge_before(t)
+            for tabla in tablas[1:]:
+                assert tabla.reservations == tablas[0].reservations
+                assert tabla.edges == tablas[0].edges
+                assert tabla._por_agente == _inverso(tabla)
+                assert tabla._vivos == tabla.total_intervals() + sum(
+                    len(v) for v in tabla.edges.values())
+        respuestas = [_consultas(tabla, random.Random(3)) for tabla in tablas]
+        assert respuestas[1] == respuestas[0] and respuestas[2] == respuestas[0]
+
+
+def test_re02_memoria_acotada_en_corrida_larga():
+    tabla = ReservationTable(0.0, expiry_index=True)
+    for i in range(5000):
+        t = i * 0.5
+        tabla.reserve((i % 40, 0), t, t + 0.4, "AG-%d" % (i % 8))
+        tabla.reserve_move(((i + 1) % 40, 0), (i % 40, 0), t, t + 0.4, "AG-%d" % (i % 8))
+        if i % 10 == 0:
+            pallet = "PALLET:%d" % i
+            tabla.reserve((i % 40, 1), t, t + 1e9, pallet)
+            tabla.release_agent(pallet)
+        tabla.purge_before(t - tabla.purge_horizon)
+    assert tabla.total_intervals() < 10
+    assert len(tabla._vencimientos) <= 2 * tabla._vivos + 64
+    assert set(tabla._por_agente) <= {"AG-%d" % k for k in range(8)}
+
+
+def test_re03_horizonte_mayor_mismos_planes():
+    planes = []
+    for expiry, horizonte in ((False, None), (True, None), (True, 30.0)):
+        tabla = ReservationTable(clearance=0.0, expiry_index=expiry, purge_horizon=horizonte)
+        planner = SpaceTimePlanner(
+            pathfinder=FakeGridPathfinder(12, 4), reservation_table=tabla,
+            time_per_cell=0.1, dt_wait=0.1, max_expansions=20000, allow_diagonal=False)
+        rng = random.Random(11)
+        for i in range(40):
+            a = (rng.randrange(12), rng.randrange(4))
+            b = (rng.randrange(12), rng.randrange(4))
+            planes.append(planner.plan_and_reserve(a, b, t0=i * 1.3, agent_id="AG-%d" % (i % 5),
+                                                   speed=1.0, goal_dwell=rng.choice([0, 4.0])))
+    assert planes[:40] == planes[40:80] == planes[80:]
+
+
+def test_re04_horizonte_por_defecto_intacto_sin_opt_in():
+    # clearance > 1.0 solo sube el horizonte si PERF-25 esta activo
+    assert ReservationTable(2.5).purge_horizon == 1.0
+    assert ReservationTable(2.5, indexed=True).purge_horizon == 1.0
+    assert ReservationTable(2.5, expiry_index=True).purge_horizon == 2.5
+    assert ReservationTable(2.5, purge_horizon=0.5).purge_horizon == 2.5
+    assert ReservationTable(0.05, purge_horizon=3.0).purge_horizon == 3.0
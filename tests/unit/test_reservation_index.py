@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+PERF-24 / RI-xx: ReservationTable indexada (bisect).
+Contrato: con indexed=True is_free / earliest_free / can_swap / interval_id
+responden EXACTAMENTE lo mismo que el barrido lineal, tambien despues de
+release_agent y purge_before, y el planner SIPP devuelve el mismo plan.
+"""
+import random
+
+from subsystems.simulation.reservation_table import ReservationTable
+from subsystems.simulation.spacetime_planner import SpaceTimePlanner
+
+from tests.unit.test_spacetime_dwell import FakeGridPathfinder
+
+CELDAS = [(x, 0) for x in range(4)]
+AGENTES = ["A", "B", "C", "PALLET:1"]
+
+
+def _poblar(tablas, rng, n):
+    for _ in range(n):
+        cell = rng.choice(CELDAS)
+        t_in = round(rng.uniform(0, 100), 3)
+        t_out = t_in + rng.choice([0.0, 0.1, 0.1, 0.5, 30.0])
+        agente = rng.choice(AGENTES)
+        ignorar = {"A"} if agente == "PALLET:1" else None
+        otra = rng.choice(CELDAS)
+        for tabla in tablas:
+            if tabla.is_free(cell, t_in, t_out, ignore_agent=agente, ignore_agents=ignorar):
+                tabla.reserve(cell, t_in, t_out, agente, ignore_agents=ignorar)
+                tabla.reserve_move(otra, cell, t_in, t_out, agente)
+
+
+def _consultas(tabla, rng):
+    out = []
+    for _ in range(300):
+        cell, otra = rng.choice(CELDAS), rng.choice(CELDAS)
+        t = rng.uniform(-5, 110)
+        d = rng.choice([0.0, 0.1, 2.0, 40.0])
+        agente = rng.choice(AGENTES + [None])
+        out.append((tabla.is_free(cell, t, t + d, ignore_agent=agente),
+                    tabla.is_free(cell, t, t + d, ignore_agent=agente, ignore_agents={"B"}),
+                    tabla.earliest_free(cell, t, d, ignore_agent=agente),
+                    tabla.can_swap(otra, cell, t, t + d, agente or "Z"),
+                    tabla.interval_id(cell, t, agente or "Z")))
+    return out
+
+
+def test_ri01_mismas_respuestas_que_el_barrido():
+    for seed in range(5):
+        lineal, indexada = ReservationTable(0.05), ReservationTable(0.05, indexed=True)
+        _poblar([lineal, indexada], random.Random(seed), 400)
+        assert lineal.reservations == indexada.reservations
+        assert lineal.edges == indexada.edges
+        assert _consultas(lineal, random.Random(99)) == _consultas(indexada, random.Random(99))
+        for tabla in (lineal, indexada):
+            tabla.release_agent("B")
+            tabla.purge_before(40.0)
+        assert lineal.reservations == indexada.reservations
+        assert _consultas(lineal, random.Random(7)) == _consultas(indexada, random.Random(7))
+
+
+def test_ri02_planner_mismo_plan():
+    planes = []
+    for indexed in (False, True):
+        tabla = ReservationTable(clearance=0.0, indexed=indexed)
+        planner = SpaceTimePlanner(
+            pathfinder=FakeGridPathfinder(12, 4), reservation_table=tabla,
+            time_per_cell=0.1, dt_wait=0.1, max_expansions=20000, allow_diagonal=False)
+        rng = random.Random(5)
+        for i in range(30):
+            a = (rng.randrange(12), rng.randrange(4))
+            b = (rng.randrange(12), rng.randrange(4))
+            agente = "AG-%d" % (i % 6)
+            planes.append(planner.plan_and_reserve(a, b, t0=i * 0.7, agent_id=agente,
+                                                   speed=1.0, goal_dwell=rng.choice([0, 5.0])))
+    assert planes[:30] == planes[30:]
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+PERF-14 / RL-xx: driver de la corrida (EventGenerator).
+Contrato: run_mode "single" (avance evento a evento con env.peek/env.step,
+chequeo en cada segundo entero) corta en el MISMO instante y con la MISMA
+traza de eventos que el bucle historico por tramos de 1 s, tanto al terminar
+como al saltar el watchdog de no-progreso.
+"""
+from tests.run_loop_fakes import fake_generator
+
+
+def _generador(cierres, total, traza):
+    gen = fake_generator(total)
+    env = gen.env
+    gen.stalls = []
+    gen._diagnosticar_stall = gen.stalls.append
+    d = gen.almacen.dispatcher
+
+    def agente(env):
+        for t in cierres:
+            d.operadores_activos["A"] = True
+            yield env.timeout(t - env.now)
+            d.work_orders_completados.append(t)
+            traza.append(("cierre", env.now))
+            del d.operadores_activos["A"]
+
+    def ocioso(env):
+        while True:
+            traza.append(("poll", env.now))
+            yield env.timeout(0.5)
+    env.process(agente(env))
+    env.process(ocioso(env))
+    return gen
+
+
+def _correr(modo, cierres, total, stall_limit=7200.0):
+    traza = []
+    gen = _generador(cierres, total, traza)
+    if modo == "single":
+        gen._ejecutar_run_unico(stall_limit, progreso_s=0.0)
+    else:
+        gen._ejecutar_por_tramos(stall_limit)
+    return gen.env.now, traza, gen.stalls
+
+
+def test_rl01_single_igual_a_tramos_al_terminar():
+    cierres = [0.5, 2.0, 2.0, 3.25, 7.0]
+    assert _correr("single", cierres, 5) == _correr("sliced", cierres, 5)
+    fin, traza, stalls = _correr("single", cierres, 5)
+    # el chequeo de t=7 corre ANTES del cierre de t=7 (URGENT): corta en t=8
+    assert fin == 8.0 and ("cierre", 7.0) in traza and not stalls
+
+
+def test_rl02_single_igual_a_tramos_en_stall():
+    res = _correr("single", [1.5], 2, stall_limit=10.0)
+    assert res == _correr("sliced", [1.5], 2, stall_limit=10.0)
+    fin, _, stalls = res
+    assert fin == 13.0 and stalls == [10.0]
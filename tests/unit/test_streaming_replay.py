@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+PERF-8 / SR-xx: replay en streaming (simulation_buffer.StreamingReplayBuffer).
+Contrato: memoria acotada (nunca mas de batch_size lineas pendientes) y el
+.jsonl final es BYTE-IDENTICO al del ReplayBuffer en memoria.
+"""
+import os
+
+from core.replay_columnar import read_columnar_replay
+from core.replay_utils import volcar_replay_a_archivo
+from simulation_buffer import ReplayBuffer, StreamingReplayBuffer
+
+
+def _eventos(n):
+    out = []
+    for i in range(n):
+        if i % 3:
+            out.append({"type": "estado_agente", "timestamp": i * 0.5, "agent_id": "GO-1",
+                        "data": {"position": [i, 1], "status": "moving", "accion": "ñ"}})
+        else:
+            out.append({"type": "work_order_update", "timestamp": i * 0.5,
+                        "id": "WO-%d" % i, "status": "assigned"})
+    return out
+
+
+def test_sr01_lotes_acotados(tmp_path):
+    buf = StreamingReplayBuffer(str(tmp_path / "sub" / "r.jsonl.part"), batch_size=4)
+    for e in _eventos(10):
+        buf.add_event(e)
+        assert len(buf._pending) < 4
+    assert len(buf) == 10 and buf.flushes == 2
+    assert buf.count_by_type("work_order_update") == 4
+    assert buf.last_timestamp == 4.5
+    assert buf.get_events() == _eventos(10)
+    buf.close()
+    assert not os.path.exists(buf.body_path)
+
+
+def test_sr02_volcado_identico_al_buffer_en_memoria(tmp_path):
+    config = {"performance": {"replay_streaming": True}}
+    salidas = []
+    for streaming in (False, True):
+        if streaming:
+            buf = StreamingReplayBuffer(str(tmp_path / "r.jsonl.part"), batch_size=7)
+        else:
+            buf = ReplayBuffer()
+        for e in _eventos(50):
+            buf.add_event(e)
+        out = str(tmp_path / ("r%d.jsonl" % streaming))
+        col = str(tmp_path / ("r%d.replaycol" % streaming))
+        assert volcar_replay_a_archivo(buf, out, config, archivo_columnar=col) is True
+        with open(out, "rb") as f:
+            salidas.append((f.read(), read_columnar_replay(col)))
+        if streaming:
+            buf.close()
+    assert salidas[0] == salidas[1]
+
+
+def test_sr03_sin_eventos(tmp_path):
+    buf = StreamingReplayBuffer(str(tmp_path / "vacio.part"))
+    out = str(tmp_path / "vacio.jsonl")
+    assert volcar_replay_a_archivo(buf, out, {}) is True
+    with open(out, encoding="utf-8") as f:
+        lineas = f.read().splitlines()
+    assert len(lineas) == 2 and '"SIMULATION_END"' in lineas[1]
+    assert not os.path.exists(buf.body_path)
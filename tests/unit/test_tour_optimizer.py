@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+PERF-17 / TO-xx: motor de ruta del tour (tour_optimizer.py).
+Contrato: improve devuelve una permutacion de las paradas que nunca es mas
+larga que la de entrada, respeta fixed_first y deshace cruces; el
+presupuesto es de movimientos evaluados (mismo orden sin importar el reloj);
+RouteCalculator.distance_matrix coincide con estimate_distance (oraculo o
+euclidea) y calculate_route aplica el orden mejorado antes del A*.
+"""
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+from core.config_schema import validate_config_schema
+from subsystems.simulation.distance_oracle import DistanceOracle
+from subsystems.simulation.pathfinder import Pathfinder
+from subsystems.simulation.route_calculator import RouteCalculator
+from subsystems.simulation.tour_optimizer import TourOptimizer, crear_tour_optimizer
+
+
+def _euclidea(puntos):
+    p = np.array(puntos, dtype=float)
+    return np.sqrt(((p[:, None, :] - p[None, :, :]) ** 2).sum(axis=2))
+
+
+def _largo(d, orden, closed):
+    seq = [0] + [i + 1 for i in orden] + ([0] if closed else [])
+    return sum(d[a, b] for a, b in zip(seq, seq[1:]))
+
+
+def _grid(w=12, h=8):
+    m = [[True] * w for _ in range(h)]
+    for y in range(h - 2):
+        m[y][6] = False
+    return m
+
+
+def test_to01_permutacion_nunca_peor_y_fixed_first():
+    rng = random.Random(3)
+    opt = TourOptimizer(time_budget_ms=1000.0)
+    for _ in range(60):
+        n = rng.randint(1, 12)
+        d = _euclidea([(rng.randint(0, 50), rng.randint(0, 50)) for _ in range(n + 1)])
+        for fixed, closed in itertools.product((False, True), repeat=2):
+            orden = opt.improve(d, fixed_first=fixed, closed=closed)
+            assert sorted(orden) == list(range(n))
+            assert _largo(d, orden, closed) <= _largo(d, list(range(n)), closed) + 1e-9
+            if fixed and n:
+                assert orden[0] == 0
+
+
+def test_to02_deshace_cruce_y_alcanza_optimo_pequeno():
+    # cuadrado recorrido en diagonal (cruzado): 2-opt lo descruza
+    d = _euclidea([(0, 0), (10, 0), (0, 10), (10, 10)])
+    opt = TourOptimizer(time_budget_ms=1000.0)
+    orden = opt.improve(d, closed=True)
+    assert _largo(d, orden, True) == pytest.approx(40.0)
+    assert opt.tours_mejorados == 1 and opt.distancia_ahorrada > 0
+    # paradas colineales: el optimo local coincide con el exacto
+    rng = random.Random(8)
+    for _ in range(20):
+        d = _euclidea([(rng.randint(0, 30), 0) for _ in range(7)])  # sobre una recta
+        mejor = min(_largo(d, list(p), False) for p in itertools.permutations(range(6)))
+        assert _largo(d, opt.improve(d, closed=False), False) == pytest.approx(mejor)
+
+
+def test_to03_distance_matrix_igual_a_estimate_distance():
+    m = _grid()
+    pf = Pathfinder(m)
+    rc = RouteCalculator(pf)
+    puntos = [(0, 0), (11, 0), (3, 5), (9, 7), (8, 2)]
+    for oraculo in (None, DistanceOracle(m, puntos[1:4], pathfinder=pf)):
+        rc.distance_oracle = oraculo
+        d = rc.distance_matrix(puntos)
+        for i, j in itertools.product(range(len(puntos)), repeat=2):
+            esperado = (rc.estimate_distance(puntos[i], puntos[j])
+                        + rc.estimate_distance(puntos[j], puntos[i])) / 2.0
+            assert d[i, j] == pytest.approx(esperado, abs=1e-4)
+
+
+class _WO:
+    def __init__(self, i, ubicacion):
+        self.id, self.ubicacion, self.pick_sequence = "WO-%d" % i, ubicacion, i
+
+
+def test_to04_calculate_route_con_motor_y_config():
+    rc = RouteCalculator(Pathfinder(_grid(w=30, h=4)))
+    # pick_sequence en zig-zag: el motor lo ordena a lo largo del pasillo
+    wos = [_WO(i, (x, 3)) for i, x in enumerate([20, 2, 25, 5, 15, 10])]
+    base = rc.calculate_route((0, 3), wos)
+    mejor = rc.calculate_route((0, 3), wos, optimizer=TourOptimizer(1000.0))
+    assert mejor["total_distance"] < base["total_distance"]
+    assert sorted(w.id for w in mejor["visit_sequence"]) == sorted(w.id for w in wos)
+
+    assert crear_tour_optimizer({}, "Cercania") is None
+    cfg = {"performance": {"route_engine": {"Cercania": "local_search", "*": "sequence"},
+                           "route_engine_budget_ms": 2}}
+    assert crear_tour_optimizer(cfg, "FIFO Estricto") is None
+    assert crear_tour_optimizer(cfg, "Cercania").time_budget_s == pytest.approx(0.002)
+    assert validate_config_schema(cfg) == ([], [])
+
+
+def test_to05_presupuesto_determinista(monkeypatch):
+    rng = random.Random(21)
+    casos = [_euclidea([(rng.randint(0, 80), rng.randint(0, 80)) for _ in range(16)])
+             for _ in range(10)]
+    ref = [TourOptimizer().improve(d) for d in casos]
+    # Reloj que salta 1 s por lectura (maquina lenta): sin tope de pared el
+    # resultado no cambia.
+    reloj = iter(range(10 ** 6))
+    monkeypatch.setattr("subsystems.simulation.tour_optimizer.time.perf_counter",
+                        lambda: float(next(reloj)))
+    lento = TourOptimizer()
+    assert [lento.improve(d) for d in casos] == ref and lento.sin_presupuesto == 0
+    # Con tope de movimientos: corta, pero siempre en el mismo punto.
+    chico = [TourOptimizer(max_moves=40).improve(d) for d in casos]
+    assert chico == [TourOptimizer(max_moves=40).improve(d) for d in casos]
+    assert chico != ref
+    assert TourOptimizer(max_moves=0).improve(casos[0]) == list(range(15))
+    cfg = {"performance": {"route_engine": "local_search", "route_engine_max_moves": 500}}
+    opt = crear_tour_optimizer(cfg, "Cercania")
+    assert opt.max_moves == 500 and opt.time_budget_s == 0.0
+    assert validate_config_schema(cfg) == ([], [])
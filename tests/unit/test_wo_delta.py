@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+PERF-23 / WD-xx: work_order_update en delta (core/replay_wo_delta.py).
+Contrato: el decoder reconstruye EXACTAMENTE cada update completo (campos que
+aparecen, cambian y desaparecen), los estaticos viajan una sola vez en el
+header, y ReplayData carga un replay v2 con los mismos eventos que el v1.
+"""
+import json
+import random
+
+import web_prototype.app_state as app_state
+from core.replay_wo_delta import (
+    STATIC_FIELDS, UNSET_KEY, WorkOrderDeltaDecoder, WorkOrderDeltaEncoder)
+
+
+def _updates(n=300, seed=3):
+    rng = random.Random(seed)
+    out = []
+    for t in range(n):
+        wo = "WO-%02d" % rng.randint(1, 25)
+        datos = {"id": wo, "order_id": "ORD-" + wo, "sku_id": "SKU-1", "product": "P",
+                 "location": [3, int(wo[-2:])], "staging": 1, "work_area": "A",
+                 "qty_requested": 4, "status": rng.choice(["assigned", "in_progress", "staged"]),
+                 "qty_picked": rng.randint(0, 4), "progress": rng.random()}
+        if rng.random() < 0.5:
+            datos["pick_sequence"] = rng.randint(1, 9)  # campo que va y viene
+        out.append((float(t), datos))
+    return out
+
+
+def test_wd01_roundtrip_exacto():
+    enc = WorkOrderDeltaEncoder()
+    deltas = [(t, enc.encode(d)) for t, d in _updates()]
+    assert any(UNSET_KEY in d for _, d in deltas)
+    assert all(k not in d for _, d in deltas for k in STATIC_FIELDS)
+    # por JSON, como el .jsonl
+    static = json.loads(json.dumps(enc.header()))["work_order_static"]
+    dec = WorkOrderDeltaDecoder(static)
+    for (t, completo), (_, delta) in zip(_updates(), deltas):
+        evento = json.loads(json.dumps(dict(delta, type="work_order_update", timestamp=t)))
+        esperado = json.loads(json.dumps(dict(completo, type="work_order_update", timestamp=t)))
+        assert dec.decode(evento) == esperado
+    assert enc.campos_omitidos > 0
+
+
+def _jsonl(path, delta):
+    enc = WorkOrderDeltaEncoder() if delta else None
+    lineas = []
+    for t, datos in _updates(120, 8):
+        if enc is not None:
+            datos = enc.encode(datos)
+        lineas.append(dict(datos, type="work_order_update", timestamp=t))
+    header = {"event_type": "SIMULATION_START", "timestamp": 0,
+              "initial_work_orders": [{"id": "WO-%02d" % i} for i in range(1, 26)]}
+    if enc is not None:
+        header.update(enc.header())
+    with open(path, "w", encoding="utf-8") as f:
+        for registro in [header] + lineas:
+            f.write(json.dumps(registro) + "\n")
+    return str(path)
+
+
+def test_wd02_replaydata_v2_igual_a_v1(tmp_path, monkeypatch):
+    eventos = {}
+    for nombre, delta in (("v1", False), ("v2", True)):
+        monkeypatch.setattr(app_state, "REPLAY_FILE", _jsonl(tmp_path / (nombre + ".jsonl"), delta))
+        rd = app_state.ReplayData()
+        eventos[nombre] = [e for e in rd.events if "event_type" not in e]
+        assert rd.state_at(rd.max_time)["work_orders"]
+    assert eventos["v2"] == eventos["v1"]
@@ -5,8 +5,12 @@ monolito server.py, ver docs/CHANGELOG.md). Aca viven las instancias unicas
 que comparten los routers: config_manager y replay_data (+ constantes de
 paths). Los endpoints viven en web_prototype/routers/.
 """
+import bisect
 import json
 import os
+import threading
+from collections.abc import Mapping
+from itertools import islice
 
 from web_prototype.config_manager import WebConfigurationManager
 
@@ -23,12 +27,312 @@ TMX_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "data",
 # un replay (Importar en el visor o POST /api/load_replay).
 REPLAY_FILE = None
 
+# PERF-7: extensiones de replay que acepta el visor (.jsonl canonico +
+# columnar binario de core/replay_columnar.py).
+REPLAY_EXTENSIONS = ('.jsonl', '.replaycol')
+
+
+def _iter_replay_records(path):
+    """Registros del replay en orden de archivo (header incluido)."""
+    if path.endswith('.replaycol'):
+        import sys
+        src = os.path.join(PROJECT_ROOT, "src")
+        if src not in sys.path:
+            sys.path.insert(0, src)
+        from core.replay_columnar import read_columnar_replay
+        header, records = read_columnar_replay(path)
+        if header is not None:
+            yield header
+        yield from records
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def _new_state():
+    return {"agents": {}, "work_orders": {}}
+
+
+def _core_module(nombre):
+    """core.<nombre> con import perezoso (src/ al path, como el columnar)."""
+    import importlib
+    import sys
+    src = os.path.join(PROJECT_ROOT, "src")
+    if src not in sys.path:
+        sys.path.insert(0, src)
+    return importlib.import_module("core." + nombre)
+
+
+def resolve_segments(state, t):
+    """
+    PERF-21: ubica en t a los agentes que estan dentro de un tramo
+    segment_started (agent['_segment'] = (celdas, instantes)) y quita la clave
+    interna. Muta `state`: usar sobre la copia de clone_state.
+    """
+    position_at = None
+    for agent in state["agents"].values():
+        seg = agent.pop('_segment', None)
+        if seg is None:
+            continue
+        if position_at is None:
+            position_at = _core_module('replay_movement').position_at
+        x, y = position_at(seg[0], seg[1], t)
+        agent['position'] = [x, y]
+    return state
+
+
+def _wo_update(event):
+    """(wo_id, dict guardado en work_orders) de un work_order_update, o None."""
+    etype = event.get('event_type') or event.get('tipo') or event.get('type')
+    if etype != 'work_order_update':
+        return None
+    data = event.get('data', {})
+    wo_id = data.get('id') or event.get('id')
+    if not wo_id:
+        return None
+    # Use data if it has content, otherwise use the entire event (for synthetic events)
+    return wo_id, (data if data else event)
+
+
+class WorkOrderHistory:
+    """
+    PERF-5: historial INMUTABLE de versiones de cada WO, armado una vez en
+    precompute_snapshots. La vista en `count` (eventos aplicados) es un
+    Mapping de solo lectura que se crea en O(1): las respuestas ya no copian
+    el dict de WOs (miles) por request y el cursor puede seguir avanzando sin
+    tocarlas. Los dicts de WO nunca se mutan (_apply_event_to_state los
+    reemplaza), asi que cada version se comparte tal cual.
+    """
+
+    def __init__(self):
+        self.order = {}   # {wo_id: orden de primera aparicion}
+        self._ids = []    # wo_ids en orden de primera aparicion
+        self._first = []  # count de la primera aparicion (creciente)
+        self._counts = {}  # {wo_id: [count de cada version]}
+        self._versions = {}  # {wo_id: [dict de cada version]}
+
+    def record(self, count, wo_id, wo):
+        counts = self._counts.get(wo_id)
+        if counts is None:
+            self.order[wo_id] = len(self._ids)
+            self._ids.append(wo_id)
+            self._first.append(count)
+            counts = self._counts[wo_id] = []
+            self._versions[wo_id] = []
+        counts.append(count)
+        self._versions[wo_id].append(wo)
+
+    def work_orders_at(self, count):
+        return WorkOrdersView(self, count)
+
+    def order_at(self, count):
+        return WorkOrderOrderView(self, count)
+
+
+class WorkOrdersView(Mapping):
+    """{wo_id: wo} tras aplicar events[:count] (solo lectura, ver WorkOrderHistory)."""
+    __slots__ = ("_history", "_count", "_n")
+
+    def __init__(self, history, count):
+        self._history = history
+        self._count = count
+        self._n = bisect.bisect_right(history._first, count)
+
+    def __getitem__(self, wo_id):
+        counts = self._history._counts.get(wo_id)
+        i = bisect.bisect_right(counts, self._count) - 1 if counts else -1
+        if i < 0:
+            raise KeyError(wo_id)
+        return self._history._versions[wo_id][i]
+
+    def __iter__(self):
+        return islice(self._history._ids, self._n)
+
+    def __len__(self):
+        return self._n
+
+
+class WorkOrderOrderView(WorkOrdersView):
+    """index['wo_order'] tras aplicar events[:count] (solo lectura)."""
+    __slots__ = ()
+
+    def __getitem__(self, wo_id):
+        n = self._history.order[wo_id]
+        if n >= self._n:
+            raise KeyError(wo_id)
+        return n
+
+
+def clone_state(state, history=None, count=None):
+    """
+    PERF-5: copia con estructura COMPARTIDA.
+
+    _apply_event_to_state REEMPLAZA los dicts de work order (nunca los muta) y
+    muta in-place los de agente y 'outbound'. Por eso basta con copiar los
+    contenedores + los dicts de agente (decenas); los dicts de WO (miles) se
+    comparten entre el cursor, los checkpoints y las respuestas.
+    Sustituye a copy.deepcopy (O(estado completo) por request).
+
+    Con `history` (respuestas de state_at) work_orders e index['wo_order'] son
+    vistas de solo lectura en `count` (O(1)) en vez de copias O(WOs); solo se
+    copian los agentes y los indices chicos (conteos y WOs pendientes).
+    """
+    out = {
+        "agents": {aid: dict(a) for aid, a in state["agents"].items()},
+        "work_orders": (dict(state["work_orders"]) if history is None
+                        else history.work_orders_at(count)),
+    }
+    if "outbound" in state:
+        out["outbound"] = dict(state["outbound"])
+    index = state.get("index")
+    if index is not None:
+        out["index"] = {
+            "wo_order": (dict(index["wo_order"]) if history is None
+                         else history.order_at(count)),
+            "wo_counts": dict(index["wo_counts"]),
+            "wo_by_agent": {a: dict(w) for a, w in index["wo_by_agent"].items()},
+            "agent_status": dict(index["agent_status"]),
+            "agent_type": dict(index["agent_type"]),
+        }
+    return out
+
+
+# PERF-6: indices incrementales del estado (state['index']), mantenidos por
+# _apply_event_to_state. Evitan el barrido O(agentes x WOs) de
+# work_orders_asignadas y las pasadas completas de conteo por request:
+#   wo_order     {wo_id: orden de primera insercion en work_orders}
+#   wo_counts    {(status, tiene_assigned_agent_id): n}
+#   wo_by_agent  {agente_corto: {wo_id: None}} solo WOs pendientes del agente
+#   agent_status {status: n}    agent_type {type: n}
+PENDING_WO_STATUSES = ('assigned', 'in_progress')
+
+
+def _new_index():
+    return {
+        "wo_order": {}, "wo_counts": {}, "wo_by_agent": {},
+        "agent_status": {}, "agent_type": {},
+    }
+
+
+def _state_index(state):
+    index = state.get("index")
+    if index is None:
+        index = state["index"] = _new_index()
+    return index
+
+
+def _bump(counts, key, delta):
+    n = counts.get(key, 0) + delta
+    if n:
+        counts[key] = n
+    else:
+        counts.pop(key, None)
+
+
+def _wo_agent_short(wo):
+    """'Forklift_Forklift-01' -> 'Forklift-01' (ids de agente del estado)."""
+    wo_agent = wo.get('assigned_agent_id') or wo.get('agent_id')
+    if not wo_agent:
+        return None
+    return wo_agent.split('_')[-1] if '_' in wo_agent else wo_agent
+
+
+def _index_wo(index, wo_id, wo, delta):
+    status = wo.get('status', 'released')
+    _bump(index["wo_counts"], (status, bool(wo.get('assigned_agent_id'))), delta)
+    agent = _wo_agent_short(wo)
+    if agent and status in PENDING_WO_STATUSES:
+        bucket = index["wo_by_agent"].setdefault(agent, {})
+        if delta > 0:
+            bucket[wo_id] = None
+        else:
+            bucket.pop(wo_id, None)
+            if not bucket:
+                del index["wo_by_agent"][agent]
+
+
+def _index_agent(index, agent, delta):
+    if 'status' in agent:
+        _bump(index["agent_status"], agent['status'], delta)
+        _bump(index["agent_type"], agent.get('type', ''), delta)
+
+
+def assigned_work_orders(state, agent_id):
+    """
+    work_orders_asignadas de un agente (WOs assigned/in_progress) ordenadas
+    por pick_sequence; empates en el orden de work_orders (igual que el
+    barrido historico). O(WOs pendientes del agente).
+    """
+    index = _state_index(state)
+    wo_ids = index["wo_by_agent"].get(agent_id)
+    if not wo_ids:
+        return []
+    work_orders = state['work_orders']
+    order = index["wo_order"]
+    out = []
+    for wo_id in sorted(wo_ids, key=order.__getitem__):
+        wo = work_orders[wo_id]
+        out.append({
+            'id': wo_id,
+            'location': wo.get('location') or wo.get('ubicacion', [0, 0]),
+            'status': wo.get('status', 'released'),
+            'pick_sequence': wo.get('pick_sequence', 0)
+        })
+    out.sort(key=lambda x: x['pick_sequence'])
+    return out
+
+
+def wo_status_counts(state):
+    """Conteos de WOs por categoria del dashboard, leidos del indice."""
+    counts = _state_index(state)["wo_counts"]
+    by_status = {}
+    for (status, _has_agent), n in counts.items():
+        by_status[status] = by_status.get(status, 0) + n
+    return {
+        "total": len(state['work_orders']),
+        "staged": by_status.get('staged', 0),
+        "picked": by_status.get('picked', 0),
+        "in_progress": by_status.get('in_progress', 0),
+        # assigned CON agente; sin agente cuenta como released (dashboard Python)
+        "assigned": counts.get(('assigned', True), 0),
+        "released": by_status.get('released', 0) + counts.get(('assigned', False), 0),
+    }
+
+
+def agent_status_count(state, statuses):
+    """Agentes cuyo status esta en `statuses` (leido del indice)."""
+    counts = _state_index(state)["agent_status"]
+    return sum(counts.get(st, 0) for st in statuses)
+
+
+def agent_type_count(state, fragment):
+    """Agentes cuyo type contiene `fragment` ('Ground', 'Forklift')."""
+    return sum(n for ty, n in _state_index(state)["agent_type"].items() if fragment in ty)
+
+
 class ReplayData:
     def __init__(self):
         self.events = []
         self.max_time = 0
         self.snapshots = {}  # {timestamp: state_dict}
         self.snapshot_interval = 60.0  # Create a snapshot every 60 seconds
+        # PERF-5: motor de seek. _timeline[i] = timestamp de events[i] (events
+        # ya viene ordenado); _checkpoints = [(n_eventos_aplicados, estado)]
+        # creciente; el cursor es el estado tras aplicar events[:_cursor_idx].
+        self._timeline = []
+        self._checkpoints = []
+        self._checkpoint_counts = []
+        self._cursor_idx = 0
+        self._cursor_state = _new_state()
+        self._wo_history = WorkOrderHistory()
+        self._seek_lock = threading.Lock()
         self.service_level = None  # INIT-5: resumen de nivel de servicio (backorders)
         self.sla_summary = None  # INIT-4b: resumen de cumplimiento de SLA (due_time)
         self.bottleneck_summary = None  # MEJ-BOTTLENECK: cuellos de botella de la corrida
@@ -45,6 +349,7 @@ class ReplayData:
         - 30min+: 15s intervals
         """
         print(f"Pre-computing progressive snapshots...")
+        self._reset_seek()
         if not self.events:
             return
 
@@ -68,22 +373,25 @@ class ReplayData:
         prev_time = None
         
         # We need to process events sequentially to build state
-        for event in self.events:
+        for i, event in enumerate(self.events):
             t = event.get('timestamp', 0)
             
             # Apply event to current_state
             self._apply_event_to_state(event, current_state)
+            upd = _wo_update(event)
+            if upd is not None:
+                self._wo_history.record(i + 1, *upd)  # PERF-5: vistas de WOs
             
             # Check if we just finished processing all t=0 events
             if prev_time == 0 and t > 0 and 0.0 not in self.snapshots:
-                import copy
-                self.snapshots[0.0] = copy.deepcopy(current_state)
+                self.snapshots[0.0] = self._add_checkpoint(i + 1, current_state)
             
             # If we passed a snapshot boundary, save current state
             while t >= next_snapshot_time and next_snapshot_time <= self.max_time:
-                # Deep copy current state for the snapshot
-                import copy
-                self.snapshots[next_snapshot_time] = copy.deepcopy(current_state)
+                # PERF-5: copia con estructura compartida (antes deepcopy)
+                if not self._checkpoint_counts or self._checkpoint_counts[-1] != i + 1:
+                    self._add_checkpoint(i + 1, current_state)
+                self.snapshots[next_snapshot_time] = self._checkpoints[-1][1]
                 print(f"  Snapshot at t={next_snapshot_time}s")
                 
                 # Calculate next interval based on current position
@@ -94,11 +402,82 @@ class ReplayData:
         
         # Save t=0 snapshot if we never exceeded t=0 (all events at t=0)
         if 0.0 not in self.snapshots:
-            import copy
-            self.snapshots[0.0] = copy.deepcopy(current_state)
+            self.snapshots[0.0] = self._add_checkpoint(len(self.events), current_state)
             
         print(f"Created {len(self.snapshots)} progressive snapshots.")
 
+    # ------------------------------------------------------------------
+    # PERF-5: seek incremental (bisect sobre la linea de tiempo + cursor)
+    # ------------------------------------------------------------------
+    def _reset_seek(self):
+        self._timeline = [e.get('timestamp', 0) for e in self.events]
+        self._checkpoints = []
+        self._checkpoint_counts = []
+        self._cursor_idx = 0
+        self._cursor_state = _new_state()
+        self._wo_history = WorkOrderHistory()
+
+    def _add_checkpoint(self, count, state):
+        """Checkpoint = estado tras aplicar events[:count] (no se muta nunca)."""
+        snap = clone_state(state)
+        self._checkpoints.append((count, snap))
+        self._checkpoint_counts.append(count)
+        return snap
+
+    def state_at(self, t):
+        """
+        Estado tras aplicar TODOS los eventos con timestamp <= t.
+
+        Reproduccion hacia adelante (el caso del visor a 10x): aplica solo los
+        eventos nuevos desde el cursor => O(eventos nuevos). Salto hacia atras
+        o mas lejos que un checkpoint: restaura el checkpoint mas cercano
+        (bisect) y avanza desde ahi. Devuelve una copia con estructura
+        compartida (clone_state): el llamador puede agregar claves a los
+        agentes sin tocar el cursor; work_orders es una vista de solo lectura
+        del historial (WorkOrdersView), sin copia O(WOs) por request.
+        """
+        with self._seek_lock:
+            state = self._advance(t)
+            return resolve_segments(
+                clone_state(state, self._wo_history, self._cursor_idx), t)
+
+    def aggregates_at(self, t):
+        """
+        PERF-6: solo los agregados del estado en t (conteos de WOs por status,
+        agentes por status/tipo), leidos de los indices bajo el lock y SIN
+        clonar el estado. El dict devuelto sirve para wo_status_counts,
+        agent_status_count y agent_type_count. Para /api/metrics.
+        """
+        with self._seek_lock:
+            state = self._advance(t)
+            index = state.get("index") or _new_index()
+            vista = {"work_orders": state["work_orders"], "index": index}
+            return {
+                "agent_total": len(state["agents"]),
+                "wo_counts": wo_status_counts(vista),
+                "index": {"agent_status": dict(index["agent_status"]),
+                          "agent_type": dict(index["agent_type"])},
+            }
+
+    def _advance(self, t):
+        """Lleva el cursor a t (llamar con _seek_lock tomado); devuelve su estado."""
+        target = bisect.bisect_right(self._timeline, t)
+        k = bisect.bisect_right(self._checkpoint_counts, target) - 1
+        if target < self._cursor_idx or (k >= 0 and self._checkpoint_counts[k] > self._cursor_idx):
+            if k >= 0:
+                count, snap = self._checkpoints[k]
+                self._cursor_state = clone_state(snap)
+                self._cursor_idx = count
+            else:
+                self._cursor_state = _new_state()
+                self._cursor_idx = 0
+        state = self._cursor_state
+        apply = self._apply_event_to_state
+        for event in self.events[self._cursor_idx:target]:
+            apply(event, state)
+        self._cursor_idx = target
+        return state
+
 
     def _apply_event_to_state(self, event, state):
         """Helper to apply a single event to a state dict."""
@@ -110,25 +489,54 @@ class ReplayData:
             if agent_id:
                 if agent_id not in state['agents']:
                     state['agents'][agent_id] = {}
+                index = _state_index(state)  # PERF-6
+                _index_agent(index, state['agents'][agent_id], -1)
                 pos = data.get('position') or [data.get('x', 0), data.get('y', 0)]
                 state['agents'][agent_id]['position'] = pos
                 state['agents'][agent_id]['type'] = data.get('agent_type', 'Unknown')
                 state['agents'][agent_id]['status'] = data.get('status', 'idle')
+                state['agents'][agent_id].pop('_segment', None)  # PERF-21
+                _index_agent(index, state['agents'][agent_id], +1)
                 
         elif etype == 'estado_agente':
             if agent_id:
                 if agent_id not in state['agents']:
                     state['agents'][agent_id] = {}
+                index = _state_index(state)  # PERF-6
+                _index_agent(index, state['agents'][agent_id], -1)
                 pos = event.get('position') or data.get('position') or [0, 0]
                 state['agents'][agent_id]['position'] = pos
                 state['agents'][agent_id]['type'] = event.get('agent_type') or data.get('agent_type', 'Unknown')
                 state['agents'][agent_id]['status'] = event.get('status') or data.get('status', 'idle')
+                state['agents'][agent_id].pop('_segment', None)  # PERF-21
+                _index_agent(index, state['agents'][agent_id], +1)
+
+        elif etype == 'segment_started':
+            # PERF-21: tramo completo en un evento (performance.movement_events
+            # = "segment"). Se guarda decodificado; state_at interpola la
+            # celda (resolve_segments). Sin cambio de status/type/position:
+            # el estado_agente del primer paso ya los fijo.
+            if agent_id:
+                agent = state['agents'].setdefault(agent_id, {})
+                movement = _core_module('replay_movement')
+                agent['_segment'] = (
+                    movement.decode_path(event['origin'], event['steps']),
+                    movement.cell_times(event['steps'], event.get('time_per_cell', 0.0),
+                                        event.get('timestamp', 0)))
                 
         elif etype == 'work_order_update':
-            wo_id = data.get('id') or event.get('id')
-            if wo_id:
-                # Use data if it has content, otherwise use the entire event (for synthetic events)
-                state['work_orders'][wo_id] = data if data else event
+            upd = _wo_update(event)
+            if upd is not None:
+                wo_id, wo = upd
+                # PERF-6: sacar la version previa de los indices, meter la nueva
+                index = _state_index(state)
+                previous = state['work_orders'].get(wo_id)
+                if previous is not None:
+                    _index_wo(index, wo_id, previous, -1)
+                else:
+                    index["wo_order"][wo_id] = len(index["wo_order"])
+                state['work_orders'][wo_id] = wo
+                _index_wo(index, wo_id, wo, +1)
 
         # F2.c: handlers de eventos de camion (outbound). Acumulan contadores en
         # state['outbound'] para que los snapshots y /api/snapshot los expongan.
@@ -162,48 +570,47 @@ class ReplayData:
             self.sla_summary = None
             self.bottleneck_summary = None
             self.inbound_summary = None
-            with open(REPLAY_FILE, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        event = json.loads(line)
-                        
-                        # Handle SIMULATION_START to extract initial WOs
-                        if event.get('type') == 'SIMULATION_START' or event.get('event_type') == 'SIMULATION_START':
-                            # INIT-5: resumen de nivel de servicio (backorders) desde la metadata.
-                            self.service_level = event.get('service_level')
-                            # INIT-4b: resumen de cumplimiento de SLA desde la metadata.
-                            self.sla_summary = event.get('sla_summary')
-                            # MEJ-BOTTLENECK: cuellos de botella desde la metadata.
-                            self.bottleneck_summary = event.get('bottleneck_summary')
-                            # INIT-7 F4: KPIs de recepcion/putaway desde la metadata.
-                            self.inbound_summary = event.get('inbound_summary')
-                            # Extract initial WOs directly from event
-                            initial_wos = event.get('initial_work_orders', [])
-                            print(f"Found {len(initial_wos)} initial WOs in SIMULATION_START")
-                            
-                            # Create synthetic update events for these initial WOs so they appear in the timeline
-                            timestamp = event.get('timestamp', 0.0)
-                            for wo in initial_wos:
-                                # Create a synthetic update event
-                                synthetic_event = wo.copy()
-                                synthetic_event['type'] = 'work_order_update'
-                                synthetic_event['timestamp'] = timestamp
-                                # Ensure status defaults to 'released' if missing
-                                if 'status' not in synthetic_event:
-                                    synthetic_event['status'] = 'released'
-                                self.events.append(synthetic_event)
-                            
-                            # Also add the start event itself just in case
-                            self.events.append(event)
-                        else:
-                            # Normal event
-                            self.events.append(event)
-                            
-                    except json.JSONDecodeError:
-                        continue
+            # PERF-23: replay v2 => work_order_update en delta; se reconstruye
+            # el update completo en orden de archivo (antes del sort).
+            wo_delta = None
+            # PERF-7: .jsonl o .replaycol (mismos registros, ver _iter_replay_records)
+            for event in _iter_replay_records(REPLAY_FILE):
+                # Handle SIMULATION_START to extract initial WOs
+                if event.get('type') == 'SIMULATION_START' or event.get('event_type') == 'SIMULATION_START':
+                    # INIT-5: resumen de nivel de servicio (backorders) desde la metadata.
+                    self.service_level = event.get('service_level')
+                    # INIT-4b: resumen de cumplimiento de SLA desde la metadata.
+                    self.sla_summary = event.get('sla_summary')
+                    # MEJ-BOTTLENECK: cuellos de botella desde la metadata.
+                    self.bottleneck_summary = event.get('bottleneck_summary')
+                    # INIT-7 F4: KPIs de recepcion/putaway desde la metadata.
+                    self.inbound_summary = event.get('inbound_summary')
+                    if event.get('wo_update_schema') == 2:
+                        wo_delta = _core_module('replay_wo_delta').WorkOrderDeltaDecoder(
+                            event.get('work_order_static'))
+                    # Extract initial WOs directly from event
+                    initial_wos = event.get('initial_work_orders', [])
+                    print(f"Found {len(initial_wos)} initial WOs in SIMULATION_START")
+                
+                    # Create synthetic update events for these initial WOs so they appear in the timeline
+                    timestamp = event.get('timestamp', 0.0)
+                    for wo in initial_wos:
+                        # Create a synthetic update event
+                        synthetic_event = wo.copy()
+                        synthetic_event['type'] = 'work_order_update'
+                        synthetic_event['timestamp'] = timestamp
+                        # Ensure status defaults to 'released' if missing
+                        if 'status' not in synthetic_event:
+                            synthetic_event['status'] = 'released'
+                        self.events.append(synthetic_event)
+                
+                    # Also add the start event itself just in case
+                    self.events.append(event)
+                else:
+                    # Normal event
+                    if wo_delta is not None and event.get('type') == 'work_order_update':
+                        event = wo_delta.decode(event)
+                    self.events.append(event)
             
             # Sort events by timestamp
             self.events.sort(key=lambda x: x.get('timestamp', 0))
@@ -8,7 +8,9 @@ import shutil
 import pytmx
 from fastapi import APIRouter, File, HTTPException, UploadFile
 
-from web_prototype.app_state import PROJECT_ROOT, TMX_PATH, config_manager, replay_data
+from web_prototype.app_state import (
+    PROJECT_ROOT, REPLAY_EXTENSIONS, TMX_PATH, agent_status_count, agent_type_count,
+    assigned_work_orders, config_manager, replay_data, wo_status_counts)
 
 router = APIRouter()
 
@@ -71,78 +73,33 @@ def get_snapshot(t: float):
     UNIFIED ENDPOINT: Returns both state and metrics in a single request.
     This reduces HTTP traffic by 50% compared to separate /api/state + /api/metrics calls.
     """
-    # OPTIMIZATION: Use nearest snapshot
-    snapshot_times = [st for st in replay_data.snapshots.keys() if st <= t]
-    
-    if snapshot_times:
-        base_time = max(snapshot_times)
-        # Deep copy to avoid modifying the snapshot
-        import copy
-        current_state = copy.deepcopy(replay_data.snapshots[base_time])
-        # Only process events AFTER the snapshot
-        relevant_events = [e for e in replay_data.events if base_time < e.get('timestamp', 0) <= t]
-    else:
-        current_state = {
-            "agents": {},
-            "work_orders": {}
-        }
-        relevant_events = [e for e in replay_data.events if e.get('timestamp', 0) <= t]
-    
-    for event in relevant_events:
-        replay_data._apply_event_to_state(event, current_state)
+    # PERF-5: seek incremental (bisect + cursor; sin deepcopy ni barrido de
+    # todos los eventos por request). Ver ReplayData.state_at.
+    current_state = replay_data.state_at(t)
     
     # Compute work_orders_asignadas for each agent
     # Based on desktop implementation in replay_engine.py
+    # PERF-6: WOs pendientes (assigned/in_progress) por agente desde el indice
+    # incremental del estado (antes: barrido de TODAS las WOs por agente).
     for agent_id in current_state['agents']:
-        assigned_wos = []
-        for wo_id, wo in current_state['work_orders'].items():
-            # Check if WO is assigned to this agent
-            wo_agent = wo.get('assigned_agent_id') or wo.get('agent_id')
-            wo_status = wo.get('status', 'released')
-            
-            # Normalize agent ID matching - WO agents are like "Forklift_Forklift-01" 
-            # but state agents are "Forklift-01"
-            # Extract the last part after underscore if present
-            if wo_agent:
-                if '_' in wo_agent:
-                    wo_agent_short = wo_agent.split('_')[-1]
-                else:
-                    wo_agent_short = wo_agent
-            else:
-                wo_agent_short = None
-            
-            # Only include WOs that are PENDING (not picked or staged)
-            # picked = completed picking, staged = delivered to staging
-            pending_statuses = ['assigned', 'in_progress']
-            if wo_agent_short == agent_id and wo_status in pending_statuses:
-                assigned_wos.append({
-                    'id': wo_id,
-                    'location': wo.get('location') or wo.get('ubicacion', [0, 0]),
-                    'status': wo_status,
-                    'pick_sequence': wo.get('pick_sequence', 0)
-                })
-        
-        # Sort by pick_sequence to maintain tour order
-        assigned_wos.sort(key=lambda x: x['pick_sequence'])
-        current_state['agents'][agent_id]['work_orders_asignadas'] = assigned_wos
+        current_state['agents'][agent_id]['work_orders_asignadas'] = \
+            assigned_work_orders(current_state, agent_id)
 
     # Compute metrics (integrated from get_metrics)
-    work_orders = current_state['work_orders']
     agents = current_state['agents']
     
-    # Helper lambdas for status checks
-    get_status = lambda wo: wo.get('status', 'released')
-    is_released = lambda wo: get_status(wo) == 'released' or (get_status(wo) == 'assigned' and not wo.get('assigned_agent_id'))
-    is_assigned = lambda wo: get_status(wo) == 'assigned' and wo.get('assigned_agent_id')
+    # PERF-6: conteos leidos de los indices incrementales (sin pasadas
+    # completas sobre work_orders/agents por request).
+    wo_counts = wo_status_counts(current_state)
     
     # Count work orders by status
-    wo_total = len(work_orders)
-    wo_completed = sum(1 for wo in work_orders.values() if wo.get('status') == 'staged')
+    wo_total = wo_counts['total']
+    wo_completed = wo_counts['staged']
     
     # Count agents by status
     agent_total = len(agents)
-    agent_active = sum(1 for agent in agents.values() if agent.get('status') in ['moving', 'picking', 'unloading'])
-    agent_idle = sum(1 for agent in agents.values() if agent.get('status') == 'idle')
+    agent_active = agent_status_count(current_state, ['moving', 'picking', 'unloading'])
+    agent_idle = agent_status_count(current_state, ['idle'])
     
     # Calculate throughput (WOs per minute)
     if t > 0:
@@ -151,14 +108,14 @@ def get_snapshot(t: float):
         throughput = 0.0
     
     # Count by agent type
-    ground_operators = sum(1 for agent in agents.values() if 'Ground' in agent.get('type', ''))
-    forklifts = sum(1 for agent in agents.values() if 'Forklift' in agent.get('type', ''))
+    ground_operators = agent_type_count(current_state, 'Ground')
+    forklifts = agent_type_count(current_state, 'Forklift')
     
     # === NEW: Dashboard de Agentes Metrics ===
     # Calculate utilizacion_promedio (% of agents not idle)
-    operarios_working = sum(1 for agent in agents.values() if agent.get('status') in ['working', 'picking', 'lifting', 'unloading'])
-    operarios_traveling = sum(1 for agent in agents.values() if agent.get('status') in ['moving', 'traveling'])
-    operarios_idle = sum(1 for agent in agents.values() if agent.get('status') in ['idle', 'Esperando tour'])
+    operarios_working = agent_status_count(current_state, ['working', 'picking', 'lifting', 'unloading'])
+    operarios_traveling = agent_status_count(current_state, ['moving', 'traveling'])
+    operarios_idle = agent_status_count(current_state, ['idle', 'Esperando tour'])
     
     if agent_total > 0:
         utilizacion_promedio = ((operarios_working + operarios_traveling) / agent_total) * 100.0
@@ -216,10 +173,10 @@ def get_snapshot(t: float):
             "work_orders": {
                 "total": wo_total,
                 "staged": wo_completed,
-                "picked": sum(1 for wo in work_orders.values() if get_status(wo) == 'picked'),
-                "in_progress": sum(1 for wo in work_orders.values() if get_status(wo) == 'in_progress'),
-                "assigned": sum(1 for wo in work_orders.values() if is_assigned(wo)),
-                "released": sum(1 for wo in work_orders.values() if is_released(wo)),
+                "picked": wo_counts['picked'],
+                "in_progress": wo_counts['in_progress'],
+                "assigned": wo_counts['assigned'],
+                "released": wo_counts['released'],
                 "completion_rate": (wo_completed / wo_total * 100) if wo_total > 0 else 0
             },
             "agents": {
@@ -249,63 +206,17 @@ def get_snapshot(t: float):
 @router.get("/api/state")
 def get_state(t: float):
     """Returns the state of the world at timestamp t."""
-    # Naive implementation: Replay all events from 0 to t
-    # In production, we would use snapshots/keyframes for performance
-    
-    # OPTIMIZATION: Use nearest snapshot
-    snapshot_times = [st for st in replay_data.snapshots.keys() if st <= t]
-    
-    if snapshot_times:
-        base_time = max(snapshot_times)
-        # Deep copy to avoid modifying the snapshot
-        import copy
-        current_state = copy.deepcopy(replay_data.snapshots[base_time])
-        # Only process events AFTER the snapshot
-        relevant_events = [e for e in replay_data.events if base_time < e.get('timestamp', 0) <= t]
-    else:
-        current_state = {
-            "agents": {},
-            "work_orders": {}
-        }
-        relevant_events = [e for e in replay_data.events if e.get('timestamp', 0) <= t]
-    
-    for event in relevant_events:
-        replay_data._apply_event_to_state(event, current_state)
+    # PERF-5: seek incremental (bisect + cursor; sin deepcopy ni barrido de
+    # todos los eventos por request). Ver ReplayData.state_at.
+    current_state = replay_data.state_at(t)
     
     # Compute work_orders_asignadas for each agent
     # Based on desktop implementation in replay_engine.py
+    # PERF-6: WOs pendientes (assigned/in_progress) por agente desde el indice
+    # incremental del estado (antes: barrido de TODAS las WOs por agente).
     for agent_id in current_state['agents']:
-        assigned_wos = []
-        for wo_id, wo in current_state['work_orders'].items():
-            # Check if WO is assigned to this agent
-            wo_agent = wo.get('assigned_agent_id') or wo.get('agent_id')
-            wo_status = wo.get('status', 'released')
-            
-            # Normalize agent ID matching - WO agents are like "Forklift_Forklift-01" 
-            # but state agents are "Forklift-01"
-            # Extract the last part after underscore if present
-            if wo_agent:
-                if '_' in wo_agent:
-                    wo_agent_short = wo_agent.split('_')[-1]
-                else:
-                    wo_agent_short = wo_agent
-            else:
-                wo_agent_short = None
-            
-            # Only include WOs that are PENDING (not picked or staged)
-            # picked = completed picking, staged = delivered to staging
-            pending_statuses = ['assigned', 'in_progress']
-            if wo_agent_short == agent_id and wo_status in pending_statuses:
-                assigned_wos.append({
-                    'id': wo_id,
-                    'location': wo.get('location') or wo.get('ubicacion', [0, 0]),
-                    'status': wo_status,
-                    'pick_sequence': wo.get('pick_sequence', 0)
-                })
-        
-        # Sort by pick_sequence to maintain tour order
-        assigned_wos.sort(key=lambda x: x['pick_sequence'])
-        current_state['agents'][agent_id]['work_orders_asignadas'] = assigned_wos
+        current_state['agents'][agent_id]['work_orders_asignadas'] = \
+            assigned_work_orders(current_state, agent_id)
 
     return {
         "timestamp": t,
@@ -321,11 +232,11 @@ def get_state(t: float):
 @router.get("/api/metrics")
 def get_metrics(t: float):
     """Returns comprehensive metrics at timestamp t."""
-    # Reuse state calculation
-    state_data = get_state(t)
-    
-    work_orders = state_data['work_orders']
-    agents = state_data['agents']
+    # PERF-6: metricas desde los indices incrementales del estado (antes
+    # reconstruia get_state completo, work_orders_asignadas incluidas, y
+    # contaba con pasadas completas sobre work_orders/agents). Solo los
+    # agregados, sin clonar el estado (ReplayData.aggregates_at).
+    aggregates = replay_data.aggregates_at(t)
     
     # Count work orders by status
     # ACTUAL statuses in log: 'assigned', 'in_progress', 'picked', 'staged'
@@ -333,15 +244,15 @@ def get_metrics(t: float):
     # 'picked' = picking done, awaiting staging
     # 'in_progress' = actively being picked
     # 'assigned' = pending
-    wo_total = len(work_orders)
-    wo_completed = sum(1 for wo in work_orders.values() if wo.get('status') == 'staged')
-    wo_in_progress = sum(1 for wo in work_orders.values() if wo.get('status') in ['in_progress', 'picked'])
-    wo_pending = sum(1 for wo in work_orders.values() if wo.get('status') == 'assigned')
+    # MATCH PYTHON DASHBOARD LOGIC: Status defaults to 'released' if missing
+    wo_counts = aggregates['wo_counts']
+    wo_total = wo_counts['total']
+    wo_completed = wo_counts['staged']
     
     # Count agents by status
-    agent_total = len(agents)
-    agent_active = sum(1 for agent in agents.values() if agent.get('status') in ['moving', 'picking', 'unloading'])
-    agent_idle = sum(1 for agent in agents.values() if agent.get('status') == 'idle')
+    agent_total = aggregates['agent_total']
+    agent_active = agent_status_count(aggregates, ['moving', 'picking', 'unloading'])
+    agent_idle = agent_status_count(aggregates, ['idle'])
     
     # Calculate throughput (WOs per minute)
     if t > 0:
@@ -350,15 +261,8 @@ def get_metrics(t: float):
         throughput = 0.0
     
     # Count by agent type
-    ground_operators = sum(1 for agent in agents.values() if 'Ground' in agent.get('type', ''))
-    forklifts = sum(1 for agent in agents.values() if 'Forklift' in agent.get('type', ''))
-    
-    # Helper lambdas for status checks
-    # MATCH PYTHON DASHBOARD LOGIC: Status defaults to 'released' if missing
-    get_status = lambda wo: wo.get('status', 'released')
-    
-    is_released = lambda wo: get_status(wo) == 'released' or (get_status(wo) == 'assigned' and not wo.get('assigned_agent_id'))
-    is_assigned = lambda wo: get_status(wo) == 'assigned' and wo.get('assigned_agent_id')
+    ground_operators = agent_type_count(aggregates, 'Ground')
+    forklifts = agent_type_count(aggregates, 'Forklift')
 
     return {
         "simulation_time": t,
@@ -368,10 +272,10 @@ def get_metrics(t: float):
         "work_orders": {
             "total": wo_total,
             "staged": wo_completed,
-            "picked": sum(1 for wo in work_orders.values() if get_status(wo) == 'picked'),
-            "in_progress": sum(1 for wo in work_orders.values() if get_status(wo) == 'in_progress'),
-            "assigned": sum(1 for wo in work_orders.values() if is_assigned(wo)),
-            "released": sum(1 for wo in work_orders.values() if is_released(wo)),
+            "picked": wo_counts['picked'],
+            "in_progress": wo_counts['in_progress'],
+            "assigned": wo_counts['assigned'],
+            "released": wo_counts['released'],
             "completion_rate": (wo_completed / wo_total * 100) if wo_total > 0 else 0
         },
         "agents": {
@@ -391,7 +295,7 @@ def get_metrics(t: float):
 @router.post("/api/upload_replay")
 async def upload_replay_file(file: UploadFile = File(...)):
     """
-    Upload a new JSONL replay file and reload the simulation.
+    Upload a new JSONL (or PERF-7 .replaycol) replay file and reload the simulation.
     
     Returns:
         - success: bool
@@ -400,10 +304,10 @@ async def upload_replay_file(file: UploadFile = File(...)):
     """
     try:
         # Validate file extension
-        if not file.filename.endswith('.jsonl'):
+        if not file.filename.endswith(REPLAY_EXTENSIONS):
             raise HTTPException(
                 status_code=400, 
-                detail="Solo se permiten archivos .jsonl"
+                detail="Solo se permiten archivos .jsonl o .replaycol"
             )
         
         # Create uploads directory if it doesn't exist
@@ -458,7 +362,7 @@ def validate_replay_file(file: str):
     if not os.path.exists(file_path):
         raise HTTPException(status_code=404, detail="Replay file not found")
     
-    if not file.endswith('.jsonl'):
+    if not file.endswith(REPLAY_EXTENSIONS):  # PERF-7: + .replaycol
         raise HTTPException(status_code=400, detail="Invalid file format")
     
     return {"valid": True, "path": file}
@@ -479,7 +383,7 @@ def load_replay_file(file: str):
     if not os.path.exists(file_path):
         raise HTTPException(status_code=404, detail="Replay file not found")
 
-    if not file.endswith('.jsonl'):
+    if not file.endswith(REPLAY_EXTENSIONS):  # PERF-7: + .replaycol
         raise HTTPException(status_code=400, detail="Invalid file format")
         
     try:
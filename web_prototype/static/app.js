@@ -1347,8 +1347,8 @@ const ImportModule = {
 
     async uploadFile(file) {
         // Validate file extension
-        if (!file.name.endsWith('.jsonl')) {
-            showViewerToast('Error: Solo se permiten archivos .jsonl', 'error');
+        if (!file.name.endsWith('.jsonl') && !file.name.endsWith('.replaycol')) {
+            showViewerToast('Error: Solo se permiten archivos .jsonl o .replaycol', 'error');
             return;
         }
 